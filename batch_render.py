@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+简历批量渲染工具
+将 main.py 延迟渲染模式保存的网页快照 (snapshots/<run_id>/) 并行转换为 docx，
+并按公司打包为 zip (命名规则与 main.py 相同)
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+
+from main import console, save_resume_as_docx, resolve_docx_mode, next_available_path, company_zip_path, zip_company_files
+from resume_docx import SNAPSHOT_ROOT, DOCX_MODES, load_snapshot_manifest, read_snapshot_html
+
+
+def render_snapshot(run_dir: str, entry: Dict, output_path: str, mode: str) -> Tuple[str, bool]:
+    """子进程中执行: 读取一份快照并保存为 docx"""
+    mode = resolve_docx_mode(mode, entry.get("fields"), (entry.get("fields") or {}).get("姓名", ""))
+    html = read_snapshot_html(run_dir, entry) if mode == "html" else ""
+    return output_path, save_resume_as_docx(html, output_path, mode=mode, fields=entry.get("fields"))
+
+
+def latest_snapshot_dir(root: str = SNAPSHOT_ROOT) -> Optional[str]:
+    if not os.path.isdir(root): return None
+    runs = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+    return os.path.join(root, runs[-1]) if runs else None
+
+
+def render_run(run_dir: str, resume_dir: str = 'resumes', zip_dir: str = 'zips',
+               mode: Optional[str] = None, workers: Optional[int] = None) -> int:
+    """渲染一次运行的全部快照并打包，返回成功生成的 docx 数量"""
+    entries = load_snapshot_manifest(run_dir)
+    if not entries:
+        console.print(f"[yellow]未找到任何快照: {run_dir}[/yellow]")
+        return 0
+    os.makedirs(resume_dir, exist_ok=True)
+    os.makedirs(zip_dir, exist_ok=True)
+
+    # 先在主进程中分配好不冲突的文件名，再并行渲染
+    jobs = []
+    reserved = set()
+    for entry in entries:
+        base_name = os.path.splitext(entry["docx_name"])[0]
+        output_path = next_available_path(resume_dir, base_name, ".docx", reserved)
+        reserved.add(output_path)
+        jobs.append((entry, output_path, mode or entry.get("mode", "html")))
+
+    succeeded = set()
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
+                  TextColumn("{task.completed}/{task.total}"), TimeElapsedColumn(), console=console) as progress:
+        task_id = progress.add_task(f"[cyan]渲染 {os.path.basename(run_dir)}", total=len(jobs))
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(render_snapshot, run_dir, entry, path, job_mode) for entry, path, job_mode in jobs]
+            for future in as_completed(futures):
+                try:
+                    path, ok = future.result()
+                    if ok: succeeded.add(path)
+                except Exception as e:
+                    console.print(f"[red]渲染失败: {e}[/red]")
+                progress.advance(task_id)
+
+    # 按公司打包 (保持抓取顺序)
+    companies: Dict[Tuple[str, str], List[str]] = {}
+    for entry, path, _ in jobs:
+        if path in succeeded:
+            companies.setdefault((entry["company"], entry["zip_id"]), []).append(path)
+    for (company, zip_id), paths in companies.items():
+        zip_company_files(company, paths, company_zip_path(company, len(paths), zip_id, zip_dir))
+
+    console.print(f"[bold green]渲染完成: {len(succeeded)}/{len(jobs)} 份简历[/bold green]")
+    return len(succeeded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将网页快照批量渲染为 docx 并按公司打包 zip")
+    parser.add_argument("run_dirs", nargs="*", help=f"快照目录 (默认: {SNAPSHOT_ROOT}/ 下最新的一次运行)")
+    parser.add_argument("--mode", choices=DOCX_MODES, help="覆盖抓取时选择的 Docx 模式")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数 (默认: CPU 核数)")
+    parser.add_argument("--resumes", default="resumes", help="docx 输出目录")
+    parser.add_argument("--zips", default="zips", help="zip 输出目录")
+    args = parser.parse_args()
+
+    run_dirs = args.run_dirs or [d for d in [latest_snapshot_dir()] if d]
+    if not run_dirs:
+        console.print("[red]✗ 没有找到可渲染的快照目录[/red]")
+        sys.exit(1)
+    for run_dir in run_dirs:
+        render_run(run_dir, args.resumes, args.zips, args.mode, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+AI 调用压测 (本地模拟 Ark，不消耗真实额度)
+用合成或录制的 简历/提纲 对，以不同的客户端配置 (并发数、重试次数、退避倍数、超时、是否流式) 调用
+main.is_match_volc / main.summarize_profile_volc (与主程序相同: 判断为 YES 后再总结)，
+对不同的服务端场景 (延迟分布、5xx/429 注入、并发上限) 输出每个函数的:
+吞吐、延迟 p50/p95/p99/max、成功率、重试放大 (HTTP 请求数 / 调用数)、退避耗时占比、429/5xx/超时次数、流式首字节时间
+
+    python bench/ai_load.py                                       # 默认场景 x 默认客户端
+    python bench/ai_load.py --scenario throttled --client threads-8 --client threads-8-fast-backoff
+    python bench/ai_load.py --set-server latency_sigma=1.2 --set-client max_retries=5 --pairs 100
+    python bench/ai_load.py --from-snapshots snapshots/20261019_101500 --briefing 提纲.txt
+    python bench/ai_load.py --pairs-file pairs.jsonl --json ai_load.json   # 每行 {"cv", "briefing", "company"}
+
+--time-scale (默认 0.1) 同时缩放服务端延迟与客户端退避/超时，报告中的时间已换算回真实时间；
+本地 HTTP 开销也会被同比放大，需要精确的延迟数字时使用 --time-scale 1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+SCENARIOS = {
+    "normal": {"latency_ms": 800, "latency_dist": "lognormal", "latency_sigma": 0.4},
+    "slow-tail": {"latency_ms": 1500, "latency_dist": "lognormal", "latency_sigma": 1.0},
+    "throttled": {"latency_ms": 800, "latency_dist": "lognormal", "latency_sigma": 0.4, "max_concurrency": 4},
+    "flaky": {"latency_ms": 800, "latency_dist": "lognormal", "latency_sigma": 0.4, "error_rate": 0.1, "throttle_rate": 0.05},
+}
+DEFAULT_CLIENT = {
+    "concurrency": 1,        # 同时处理的候选人数
+    "max_retries": 3,        # is_match_volc 的重试次数 (summarize_profile_volc 不重试)
+    "backoff_scale": 1.0,    # main.AI_BACKOFF_SCALE
+    "match_timeout": 30.0,   # main.AI_MATCH_TIMEOUT
+    "summary_timeout": 60.0, # main.AI_SUMMARY_TIMEOUT
+    "stream": False,         # 用流式请求代替 main 中的函数 (相同提示，评估首字节时间)
+    "workload": "pipeline",  # pipeline: 判断为 YES 后再总结；match / summary: 只调用一个函数
+}
+CLIENTS = {
+    "serial": {},
+    "threads-4": {"concurrency": 4},
+    "threads-8": {"concurrency": 8},
+    "threads-8-fast-backoff": {"concurrency": 8, "backoff_scale": 0.25},
+    "stream-4": {"concurrency": 4, "stream": True},
+}
+DEFAULT_SCENARIOS = ["normal", "throttled", "flaky"]
+DEFAULT_CLIENTS = ["serial", "threads-4", "threads-8", "stream-4"]
+WORKLOADS = ("pipeline", "match", "summary")
+DEFAULT_BRIEFING = "访谈对象需要在 __COMPANY__ 担任产品或数据相关岗位，熟悉业务规划与数据分析，工作年限 3 年以上。"
+STREAM_MODEL = "doubao-seed-1-6-lite-251015"
+
+_local = threading.local()
+
+
+# --- 工作负载 ---
+
+def synthetic_pairs(count: int, seed: int) -> List[Dict]:
+    """用模拟站点的简历详情页生成 简历文本/提纲 对 (大小 10-60 KB 不等)"""
+    from bs4 import BeautifulSoup
+    from fake_liepin import DEFAULT_SITE, CandidateStore, render_profile
+    from main import CV_TEXT_SELECTOR
+
+    rng = random.Random(seed)
+    companies = ["示例科技", "某互联网公司", "某汽车集团"]
+    store = CandidateStore({**DEFAULT_SITE, "seed": seed, "duplicate_rate": 0})
+    pairs = []
+    for index in range(count):
+        company = rng.choice(companies)
+        page = render_profile(store.candidate(company, "产品经理", 1 + index // 10, index % 10), rng.randint(10, 60))
+        node = BeautifulSoup(page, "html.parser").select_one(CV_TEXT_SELECTOR)
+        pairs.append({"cv": node.get_text() if node else "", "company": company,
+                      "briefing": DEFAULT_BRIEFING.replace("__COMPANY__", company)})
+    return pairs
+
+
+def snapshot_pairs(run_dir: str, briefing_template: str) -> List[Dict]:
+    """从延迟渲染快照中取出简历文本 (与 main.py 相同的选择器)，提纲中的 __COMPANY__ 替换为快照的公司"""
+    from bs4 import BeautifulSoup
+    from main import CV_TEXT_SELECTOR
+    from resume_docx import load_snapshot_manifest, read_snapshot_html
+
+    pairs = []
+    for entry in load_snapshot_manifest(run_dir):
+        node = BeautifulSoup(read_snapshot_html(run_dir, entry), "html.parser").select_one(CV_TEXT_SELECTOR)
+        if node is None: continue
+        company = entry.get("company", "")
+        pairs.append({"cv": node.get_text(), "company": company, "briefing": briefing_template.replace("__COMPANY__", company)})
+    return pairs
+
+
+def file_pairs(path: str) -> List[Dict]:
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            record = json.loads(line)
+            pairs.append({"cv": record["cv"], "briefing": record.get("briefing", DEFAULT_BRIEFING),
+                          "company": record.get("company", "")})
+    return pairs
+
+
+# --- 客户端计量 ---
+
+def instrument():
+    """包装 time.sleep 与 requests.post: 当前线程登记了调用记录时，累计退避时间、HTTP 请求数与状态码"""
+    import requests
+
+    real_sleep, real_post = time.sleep, requests.post
+
+    def sleep(seconds):
+        record = getattr(_local, "record", None)
+        if record is not None:
+            record["backoff"] += seconds
+        real_sleep(seconds)
+
+    def post(*args, **kwargs):
+        record = getattr(_local, "record", None)
+        if record is None:
+            return real_post(*args, **kwargs)
+        record["requests"] += 1
+        try:
+            response = real_post(*args, **kwargs)
+        except requests.exceptions.Timeout:
+            record["statuses"]["timeout"] = record["statuses"].get("timeout", 0) + 1
+            raise
+        except requests.exceptions.RequestException:
+            record["statuses"]["conn_error"] = record["statuses"].get("conn_error", 0) + 1
+            raise
+        key = str(response.status_code)
+        record["statuses"][key] = record["statuses"].get(key, 0) + 1
+        return response
+
+    time.sleep, requests.post = sleep, post
+
+
+def timed_call(function: str, call) -> Tuple[object, Dict]:
+    record = {"function": function, "requests": 0, "backoff": 0.0, "statuses": {}, "ttft": None}
+    _local.record = record
+    started = time.perf_counter()
+    try:
+        result = call(record)
+    finally:
+        record["latency"] = time.perf_counter() - started
+        _local.record = None
+    return result, record
+
+
+def stream_completion(prompt: str, timeout: float, max_retries: int, backoff_scale: float, record: Dict) -> Optional[str]:
+    """流式请求 (SSE)，重试与退避规则和 is_match_volc 相同；记录首个分片到达的时间"""
+    import main
+    import requests
+
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {main.VOLC_SECRETKEY}"}
+    payload = {"model": STREAM_MODEL, "messages": [{"role": "user", "content": prompt}], "stream": True}
+    started = time.perf_counter()
+    for attempt in range(max_retries):
+        try:
+            with requests.post(main.VOLC_API_URL, headers=headers, json=payload, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                parts = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "): continue
+                    data = line[6:]
+                    if data == "[DONE]": break
+                    if record["ttft"] is None:
+                        record["ttft"] = time.perf_counter() - started
+                    parts.append(json.loads(data)["choices"][0].get("delta", {}).get("content", ""))
+                content = "".join(parts).strip()
+                if content: return content
+        except Exception:
+            pass
+        if attempt < max_retries - 1:
+            time.sleep(backoff_scale * 2 ** attempt)
+    return None
+
+
+def process_pair(pair: Dict, client: Dict) -> List[Dict]:
+    """与主程序相同的顺序处理一个候选人，返回各次调用的记录"""
+    import main
+
+    records = []
+    matched = True
+    if client["workload"] in ("pipeline", "match"):
+        if client["stream"]:
+            answer, record = timed_call("match", lambda r: stream_completion(
+                main.build_match_prompt(pair["cv"], pair["briefing"]), client["match_timeout"], client["max_retries"],
+                client["backoff_scale"], r))
+            matched = None if answer is None else "YES" in answer.upper()
+        else:
+            matched, record = timed_call("match", lambda r: main.is_match_volc(pair["cv"], pair["briefing"], client["max_retries"]))
+        record["ok"] = matched is not None
+        records.append(record)
+    if client["workload"] in ("pipeline", "summary") and matched:
+        if client["stream"]:
+            summary, record = timed_call("summary", lambda r: stream_completion(
+                main.build_summary_prompt(pair["cv"], pair["company"]), client["summary_timeout"], 1, client["backoff_scale"], r))
+            record["ok"] = summary is not None
+        else:
+            summary, record = timed_call("summary", lambda r: main.summarize_profile_volc(pair["cv"], pair["company"]))
+            record["ok"] = not summary.startswith(("AI_ERROR", "AI_WARNING", "错误"))
+        records.append(record)
+    return records
+
+
+# --- 运行 ---
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(records: List[Dict], wall: float, scale: float) -> Dict:
+    """一个函数的汇总；时间换算回真实时间 (除以 scale)"""
+    latencies = [r["latency"] / scale for r in records]
+    ttfts = [r["ttft"] / scale for r in records if r["ttft"] is not None]
+    statuses: Dict[str, int] = {}
+    for r in records:
+        for key, count in r["statuses"].items():
+            statuses[key] = statuses.get(key, 0) + count
+    requests_total = sum(r["requests"] for r in records)
+    backoff = sum(r["backoff"] for r in records) / scale
+    ok = sum(1 for r in records if r["ok"])
+    return {
+        "calls": len(records), "ok": ok, "success_rate": ok / len(records) if records else None,
+        "throughput_per_s": ok / (wall / scale) if wall else None,
+        "p50_s": percentile(latencies, 0.5), "p95_s": percentile(latencies, 0.95),
+        "p99_s": percentile(latencies, 0.99), "max_s": max(latencies, default=None),
+        "mean_s": statistics.fmean(latencies) if latencies else None,
+        "requests": requests_total, "amplification": requests_total / len(records) if records else None,
+        "backoff_s": backoff, "backoff_share": backoff / sum(latencies) if latencies and sum(latencies) else 0.0,
+        "throttled": statuses.get("429", 0), "server_errors": sum(c for k, c in statuses.items() if k.startswith("5")),
+        "timeouts": statuses.get("timeout", 0), "statuses": statuses,
+        "ttft_p50_s": percentile(ttfts, 0.5), "ttft_p95_s": percentile(ttfts, 0.95),
+    }
+
+
+def run_combo(scenario: Dict, client: Dict, pairs: List[Dict], scale: float, seed: int) -> Dict:
+    import main
+    from mock_ark import MockArkServer
+
+    server = {**scenario, "latency_ms": scenario.get("latency_ms", 800) * scale, "seed": seed}
+    ark = MockArkServer(server).start()
+    main.VOLC_API_URL, main.VOLC_SECRETKEY = ark.url, "bench"
+    main.AI_BACKOFF_SCALE = client["backoff_scale"] * scale
+    main.AI_MATCH_TIMEOUT = client["match_timeout"] * scale
+    main.AI_SUMMARY_TIMEOUT = client["summary_timeout"] * scale
+    scaled_client = {**client, "backoff_scale": client["backoff_scale"] * scale,
+                     "match_timeout": client["match_timeout"] * scale, "summary_timeout": client["summary_timeout"] * scale}
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=client["concurrency"]) as executor:
+            results = list(executor.map(lambda pair: process_pair(pair, scaled_client), pairs))
+        wall = time.perf_counter() - started
+    finally:
+        ark.close()
+    records = [record for records in results for record in records]
+    functions = {name: summarize([r for r in records if r["function"] == name], wall, scale)
+                 for name in ("match", "summary") if any(r["function"] == name for r in records)}
+    return {"wall_s": wall / scale, "candidates": len(pairs), "candidates_per_min": len(pairs) / (wall / scale) * 60,
+            "functions": functions, "server": ark.stats}
+
+
+def fmt(value: Optional[float], spec: str = ".2f", suffix: str = "") -> str:
+    return "-" if value is None else f"{value:{spec}}{suffix}"
+
+
+def print_results(results: List[Dict], scale: float):
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"AI 调用压测 (模拟 Ark，时间缩放 {scale:g}，结果已换算回真实时间)")
+    for name, justify in [("场景", "left"), ("客户端", "left"), ("函数", "left"), ("调用", "right"), ("成功率", "right"),
+                          ("吞吐 次/s", "right"), ("候选人/分钟", "right"), ("p50 s", "right"), ("p95 s", "right"),
+                          ("p99 s", "right"), ("max s", "right"), ("重试放大", "right"), ("退避 s (占比)", "right"),
+                          ("429/5xx/超时", "right"), ("首字节 p50/p95 s", "right")]:
+        table.add_column(name, justify=justify, style="cyan" if name in ("场景", "客户端") else None)
+    for result in results:
+        first = True
+        for function, s in result["functions"].items():
+            rate_color = "green" if (s["success_rate"] or 0) >= 0.99 else "yellow" if (s["success_rate"] or 0) >= 0.9 else "red"
+            table.add_row(
+                result["scenario"] if first else "", result["client"] if first else "", function, str(s["calls"]),
+                f"[{rate_color}]{fmt(s['success_rate'], '.1%')}[/{rate_color}]", fmt(s["throughput_per_s"]),
+                fmt(result["candidates_per_min"], ".1f") if first else "",
+                fmt(s["p50_s"]), fmt(s["p95_s"]), fmt(s["p99_s"]), fmt(s["max_s"]), fmt(s["amplification"], ".2f", "x"),
+                f"{s['backoff_s']:.1f} ({s['backoff_share']:.0%})", f"{s['throttled']}/{s['server_errors']}/{s['timeouts']}",
+                "-" if s["ttft_p50_s"] is None else f"{s['ttft_p50_s']:.2f}/{s['ttft_p95_s']:.2f}")
+            first = False
+        table.add_section()
+    Console().print(table)
+
+
+def parse_overrides(items: List[str], defaults: Dict) -> Dict:
+    overrides = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        if key not in defaults:
+            raise SystemExit(f"未知配置项: {key} (可选: {', '.join(defaults)})")
+        default = defaults[key]
+        if isinstance(default, bool):
+            overrides[key] = value.lower() in ("1", "true", "y", "yes")
+        else:
+            overrides[key] = type(default)(value) if not isinstance(default, str) else value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 调用压测 (本地模拟 Ark)")
+    parser.add_argument("--scenario", action="append", default=[], help=f"服务端场景，可重复 (可选: {', '.join(SCENARIOS)})")
+    parser.add_argument("--client", action="append", default=[], help=f"客户端配置，可重复 (可选: {', '.join(CLIENTS)})")
+    parser.add_argument("--set-server", action="append", default=[], metavar="KEY=VALUE", help="覆盖所有场景的服务端配置")
+    parser.add_argument("--set-client", action="append", default=[], metavar="KEY=VALUE", help="覆盖所有客户端配置")
+    parser.add_argument("--pairs", type=int, default=40, help="合成的候选人数")
+    parser.add_argument("--pairs-file", help="录制的 简历/提纲 对 (JSONL)")
+    parser.add_argument("--from-snapshots", metavar="RUN_DIR", help="从延迟渲染快照中读取简历")
+    parser.add_argument("--briefing", help="提纲文件 (配合 --from-snapshots，支持 __COMPANY__)")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="服务端延迟与客户端退避/超时的缩放 (默认 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    scenario_names = args.scenario or DEFAULT_SCENARIOS
+    client_names = args.client or DEFAULT_CLIENTS
+    unknown = [n for n in scenario_names if n not in SCENARIOS] + [n for n in client_names if n not in CLIENTS]
+    if unknown:
+        raise SystemExit(f"未知的场景/客户端: {', '.join(unknown)}")
+    if args.time_scale <= 0:
+        raise SystemExit("--time-scale 必须大于 0")
+
+    sys.path[:0] = [REPO_DIR, BENCH_DIR]
+    import main as liepin
+    from mock_ark import DEFAULT_ARK
+    liepin.console.quiet = True
+    server_overrides = parse_overrides(args.set_server, DEFAULT_ARK)
+    client_overrides = parse_overrides(args.set_client, DEFAULT_CLIENT)
+    if client_overrides.get("workload", "pipeline") not in WORKLOADS:
+        raise SystemExit(f"workload 可选: {', '.join(WORKLOADS)}")
+
+    if args.pairs_file:
+        pairs = file_pairs(args.pairs_file)
+    elif args.from_snapshots:
+        briefing = DEFAULT_BRIEFING
+        if args.briefing:
+            with open(args.briefing, "r", encoding="utf-8") as f:
+                briefing = f.read()
+        pairs = snapshot_pairs(args.from_snapshots, briefing)
+    else:
+        pairs = synthetic_pairs(args.pairs, args.seed)
+    if not pairs:
+        raise SystemExit("没有可用的简历/提纲对")
+
+    instrument()
+    results = []
+    for scenario_name in scenario_names:
+        for client_name in client_names:
+            client = {**DEFAULT_CLIENT, **CLIENTS[client_name], **client_overrides}
+            print(f"运行 {scenario_name} / {client_name} ...", flush=True)
+            result = run_combo({**SCENARIOS[scenario_name], **server_overrides}, client, pairs, args.time_scale, args.seed)
+            result.update(scenario=scenario_name, client=client_name, client_config=client)
+            results.append(result)
+    print_results(results, args.time_scale)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
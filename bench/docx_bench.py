@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+HTML -> Docx 转换基准
+对一组合成 (以及脱敏后的真实) 简历网页，分阶段测量 main.save_resume_as_docx 的转换流程:
+- parse: clean_resume_html (BeautifulSoup 解析 + 去掉内嵌图片/style)
+- emit:  render_resume_html (ResumeHtmlToDocx 生成文档对象，含图片插入)
+- save:  doc.save 序列化为 docx
+并记录峰值内存 (tracemalloc，单独一遍)、docx / document.xml 大小；输出每份文档与汇总结果。
+语料按种子确定性生成，包含不同大小的简历、嵌套表格、长列表、大量行内标签和图片 (由本地图片服务提供)；
+bench/corpus/*.html 中的文件 (--import-snapshots 从快照脱敏导入) 也会加入语料。
+每个代码版本在独立子进程中运行，可与保存的结果或另一个 git 版本 (临时 worktree) 对比:
+
+    python bench/docx_bench.py                          # 运行并输出结果
+    python bench/docx_bench.py --save before.json       # 保存结果
+    python bench/docx_bench.py --baseline before.json   # 与保存的结果对比
+    python bench/docx_bench.py --against HEAD~3         # 同一语料在另一个 git 版本上运行并对比
+    python bench/docx_bench.py --import-snapshots snapshots/20261019_101500
+"""
+
+import io
+import os
+import gc
+import re
+import sys
+import json
+import time
+import zlib
+import html
+import random
+import shutil
+import struct
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+# 语料中的图片地址占位符，运行时替换为本地图片服务地址
+IMAGE_BASE = "__BENCH_IMAGE_BASE__"
+IMAGE_PATH_RE = re.compile(r"^/img/(\d+)x(\d+)/(\d+)\.png$")
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.15
+WORKER_TIMEOUT = 1800
+PHASES = ("parse", "emit", "save")
+
+
+# --- 本地图片服务 ---
+
+@lru_cache(maxsize=256)
+def make_png(width: int, height: int, seed: int) -> bytes:
+    """生成指定尺寸的 RGB 噪点 PNG (不依赖 Pillow)"""
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+class ImageServer:
+    """在后台线程中提供 /img/<宽>x<高>/<种子>.png"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = IMAGE_PATH_RE.match(self.path.split("?")[0])
+                if not match:
+                    body, status, content_type = b"not found", 404, "text/plain"
+                else:
+                    body, status, content_type = make_png(*map(int, match.groups())), 200, "image/png"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="bench-images", daemon=True)
+
+    def start(self) -> "ImageServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# --- 合成语料 ---
+
+SURNAMES = "王李张刘陈杨黄赵吴周"
+COMPANIES = ["某科技公司", "某互联网公司", "某咨询公司", "某汽车集团", "某银行", "某 AI 公司"]
+TITLES = ["产品经理", "高级产品经理", "数据分析师", "算法工程师", "运营总监", "后端开发工程师"]
+PHRASES = ["负责核心业务的规划与落地", "推动跨部门协作", "搭建数据指标体系", "主导 0 到 1 的产品孵化",
+           "优化推荐策略", "管理 10 人团队", "完成年度 OKR", "对接海外客户"]
+
+
+def image_tag(width: int, height: int, seed: int) -> str:
+    return f'<img src="{IMAGE_BASE}/img/{width}x{height}/{seed}.png" width="{width}" height="{height}">'
+
+
+def data_image_tag(rng: random.Random) -> str:
+    import base64
+    return f'<img src="data:image/png;base64,{base64.b64encode(make_png(8, 8, rng.randint(0, 99))).decode()}">'
+
+
+def page(title: str, body: str) -> str:
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>'
+            f'<body><div id="resume-detail-single">{body}</div></body></html>')
+
+
+def sentence(rng: random.Random) -> str:
+    return "，".join(rng.sample(PHRASES, 3)) + f"，指标提升 {rng.randint(5, 80)}%"
+
+
+def gen_resume(rng: random.Random, work_items: int, bullets: int, with_avatar: bool = True) -> str:
+    """常规简历: 基本信息 + 工作经历 (职位/时间/要点列表/信息表) + 教育经历"""
+    parts = [f'<div class="basic-cont">{image_tag(60, 60, rng.randint(0, 9)) if with_avatar else ""}'
+             f'<div class="resume-preview-name">{rng.choice(SURNAMES)}先生</div>'
+             f'<div class="sep-info">男 | {rng.randint(24, 45)}岁 | 本科</div></div><h3>工作经历</h3>']
+    for i in range(work_items):
+        year = 2024 - i * 2
+        items = "".join(f"<li>{sentence(rng)}</li>" for _ in range(bullets))
+        parts.append(f'<div class="rd-work-item"><div class="rd-work-comp"><h5>{rng.choice(COMPANIES)}</h5></div>'
+                     f'<h6 class="job-name">{rng.choice(TITLES)}</h6><span class="rd-work-time">{year - 2}.03-{year}.02</span>'
+                     f'<ul class="work-desc">{items}</ul>'
+                     f'<table class="work-table"><tr><td>汇报对象</td><td>总监</td></tr>'
+                     f'<tr><td>下属人数</td><td>{rng.randint(0, 20)}</td></tr></table></div>')
+    parts.append(f'<h3>教育经历</h3><div class="rd-edu-item"><b>某大学</b> 本科 | 计算机科学</div>{data_image_tag(rng)}')
+    return page("简历", "".join(parts))
+
+
+def gen_nested_tables(rng: random.Random, depth: int = 3, rows: int = 6, cols: int = 4) -> str:
+    def table(level: int) -> str:
+        cells = []
+        for r in range(rows):
+            row = []
+            for c in range(cols):
+                inner = table(level + 1) if level < depth and r == 1 and c == 1 else html.escape(sentence(rng)[:20])
+                tag = "th" if r == 0 else "td"
+                row.append(f"<{tag}>{inner}</{tag}>")
+            cells.append(f"<tr>{''.join(row)}</tr>")
+        return f'<table border="1">{"".join(cells)}</table>'
+    return page("嵌套表格", "".join(f"<h3>项目 {i}</h3>{table(1)}" for i in range(4)))
+
+
+def gen_long_list(rng: random.Random, items: int = 800) -> str:
+    parts = []
+    for i in range(items):
+        nested = "<ul>" + "".join(f"<li>{sentence(rng)}</li>" for _ in range(3)) + "</ul>" if i % 20 == 0 else ""
+        parts.append(f"<li>{sentence(rng)}{nested}</li>")
+    return page("长列表", f"<h3>项目经历</h3><ol>{''.join(parts)}</ol>")
+
+
+def gen_inline_spans(rng: random.Random, paragraphs: int = 150) -> str:
+    wrappers = [('<span style="color:#1F4E79;font-weight:bold">', "</span>"), ("<b>", "</b>"), ("<i>", "</i>"),
+                ("<u>", "</u>"), ("<em>", "</em>"), ("<strong>", "</strong>"), ("<code>", "</code>"),
+                ('<span class="kw">', "</span>"), ('<a href="https://example.com/p">', "</a>")]
+    parts = []
+    for _ in range(paragraphs):
+        pieces = []
+        for _ in range(15):
+            start, end = rng.choice(wrappers)
+            pieces.append(f"{start}{rng.choice(PHRASES)}{end}" if rng.random() < 0.6 else rng.choice(PHRASES))
+        parts.append(f"<p>{'，'.join(pieces)}</p>")
+    return page("行内标签", "".join(parts))
+
+
+def gen_images(rng: random.Random, count: int = 24) -> str:
+    sizes = [(60, 60), (200, 120), (400, 300), (800, 200)]
+    parts = []
+    for i in range(count):
+        width, height = rng.choice(sizes)
+        if i % 4 == 3:
+            parts.append(f"<table><tr><td>附件 {i}</td><td>{image_tag(width, height, i)}</td></tr></table>")
+        else:
+            parts.append(f"<p>作品截图 {i}</p>{image_tag(width, height, i)}")
+        if i % 6 == 0:
+            parts.append(data_image_tag(rng))
+    return page("图片", "".join(parts))
+
+
+def gen_liepin(seed: int, profile_kb: int) -> str:
+    """与 bench/fake_liepin.py 的简历详情页相同的结构"""
+    sys.path.insert(0, BENCH_DIR)
+    from fake_liepin import DEFAULT_SITE, CandidateStore, render_profile
+    store = CandidateStore({**DEFAULT_SITE, "seed": seed, "duplicate_rate": 0})
+    candidate = store.candidate("示例科技", "产品经理", 1, 0)
+    return render_profile(candidate, profile_kb).replace('src="/static/avatar.png"', f'src="{IMAGE_BASE}/img/60x60/0.png"')
+
+
+SYNTHETIC: Dict[str, Callable[[random.Random], str]] = {
+    "resume-s": lambda rng: gen_resume(rng, 2, 3),
+    "resume-m": lambda rng: gen_resume(rng, 6, 8),
+    "resume-l": lambda rng: gen_resume(rng, 30, 25),
+    "liepin-30k": lambda rng: gen_liepin(rng.randint(0, 999), 30),
+    "liepin-120k": lambda rng: gen_liepin(rng.randint(0, 999), 120),
+    "nested-tables": gen_nested_tables,
+    "long-list": gen_long_list,
+    "inline-spans": gen_inline_spans,
+    "images": gen_images,
+}
+
+
+def build_corpus(seed: int, selected: List[str]) -> Dict[str, str]:
+    """合成语料 + bench/corpus/*.html；名称 -> HTML (图片地址为占位符)"""
+    corpus = {name: generate(random.Random(f"{seed}:{name}")) for name, generate in SYNTHETIC.items()}
+    if os.path.isdir(CORPUS_DIR):
+        for file_name in sorted(os.listdir(CORPUS_DIR)):
+            if file_name.endswith(".html"):
+                with open(os.path.join(CORPUS_DIR, file_name), "r", encoding="utf-8") as f:
+                    corpus[f"corpus/{file_name[:-5]}"] = f.read()
+    return {name: doc for name, doc in corpus.items() if not selected or any(key in name for key in selected)}
+
+
+# --- 脱敏导入 ---
+
+CJK_POOL = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+TEXT_SKIP_TAGS = ("script", "style")
+
+
+def anonymize_text(text: str) -> str:
+    """保留长度、空白与标点: 汉字按哈希映射为常用字，字母 -> x/X，数字 -> 0-9 的确定性替换"""
+    out = []
+    for ch in text:
+        if "一" <= ch <= "鿿":
+            out.append(CJK_POOL[hashlib.md5(ch.encode("utf-8")).digest()[0] % len(CJK_POOL)])
+        elif ch.isascii() and ch.isalpha():
+            out.append("X" if ch.isupper() else "x")
+        elif ch.isdigit():
+            out.append(str((int(ch) * 7 + 3) % 10))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def anonymize_html(raw_html: str) -> str:
+    """脱敏: 替换所有文本、去掉脚本/链接/标题/外链，远程图片改为本地图片服务的占位图 (保留结构与标签密度)"""
+    from bs4 import BeautifulSoup, Comment, NavigableString
+    soup = BeautifulSoup(raw_html, "html.parser")
+    for tag in soup.find_all(TEXT_SKIP_TAGS):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+    for text in soup.find_all(string=True):
+        if isinstance(text, NavigableString) and text.strip():
+            text.replace_with(anonymize_text(str(text)))
+    for index, img in enumerate(soup.find_all("img")):
+        if not img.get("src", "").startswith("data:"):
+            img["src"] = f"{IMAGE_BASE}/img/60x60/{index}.png"
+    for tag in soup.find_all(True):
+        for attr in ("href", "title", "alt", "data-src", "srcset"):
+            if attr in tag.attrs:
+                tag[attr] = "#" if attr == "href" else ""
+    return str(soup)
+
+
+def import_snapshots(run_dir: str, limit: int) -> int:
+    """把延迟渲染快照 (snapshots/<run_id>/) 脱敏后写入 bench/corpus/"""
+    sys.path.insert(0, REPO_DIR)
+    import main  # noqa: F401  (把 libs/ 加入 sys.path)
+    from resume_docx import load_snapshot_manifest, read_snapshot_html
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    run_id = os.path.basename(os.path.normpath(run_dir))
+    count = 0
+    for index, entry in enumerate(load_snapshot_manifest(run_dir)[:limit], 1):
+        path = os.path.join(CORPUS_DIR, f"{run_id}-{index:03d}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(anonymize_html(read_snapshot_html(run_dir, entry)))
+        count += 1
+    return count
+
+
+# --- 测量 (子进程中执行) ---
+
+def load_pipeline(code_dir: str) -> Tuple[Callable[[str], str], Callable[[str], object]]:
+    """返回被测版本的 (parse, emit)；没有 clean_resume_html/render_resume_html 的旧版本使用等价的原始流程"""
+    sys.path.insert(0, code_dir)
+    import main  # main 会把 libs/ 追加到 sys.path 末尾
+    main.console.quiet = True
+    clean = getattr(main, "clean_resume_html", None)
+    render = getattr(main, "render_resume_html", None)
+    if clean is None:
+        from bs4 import BeautifulSoup
+
+        def clean(html_content: str) -> str:
+            soup = BeautifulSoup(html_content, 'html.parser')
+            for img in soup.find_all('img'):
+                if img.get('src', '').startswith('data:'): img.decompose()
+            for tag in soup.find_all(True):
+                if 'style' in tag.attrs: del tag.attrs['style']
+            return str(soup)
+    if render is None:
+        import docx
+        try:
+            from resume_docx import ResumeHtmlToDocx as converter
+        except ImportError:
+            from htmldocx import HtmlToDocx as converter
+
+        def render(cleaned_html: str):
+            doc = docx.Document()
+            converter().add_html_to_document(cleaned_html, doc)
+            return doc
+    return clean, render
+
+
+def convert_once(doc_html: str, clean: Callable, render: Callable) -> Tuple[Dict[str, float], bytes]:
+    timings = {}
+    start = time.perf_counter()
+    cleaned = clean(doc_html)
+    timings["parse"] = time.perf_counter() - start
+    start = time.perf_counter()
+    doc = render(cleaned)
+    timings["emit"] = time.perf_counter() - start
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    timings["save"] = time.perf_counter() - start
+    return timings, buffer.getvalue()
+
+
+def measure_document(doc_html: str, clean: Callable, render: Callable, repeat: int) -> Dict:
+    convert_once(doc_html, clean, render)  # 预热: 导入、图片下载进缓存
+    samples = {phase: [] for phase in PHASES}
+    data = b""
+    for _ in range(repeat):
+        gc.collect()
+        timings, data = convert_once(doc_html, clean, render)
+        for phase in PHASES:
+            samples[phase].append(timings[phase] * 1000)
+    # tracemalloc 会显著拖慢执行，峰值内存单独跑一遍
+    gc.collect()
+    tracemalloc.start()
+    try:
+        convert_once(doc_html, clean, render)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        xml_bytes = zf.getinfo("word/document.xml").file_size
+        images = sum(1 for name in zf.namelist() if name.startswith("word/media/"))
+    result = {f"{phase}_ms": round(statistics.median(samples[phase]), 3) for phase in PHASES}
+    result.update({"total_ms": round(sum(result[f"{phase}_ms"] for phase in PHASES), 3),
+                   "peak_kb": round(peak / 1024, 1), "html_bytes": len(doc_html.encode("utf-8")),
+                   "docx_bytes": len(data), "xml_bytes": xml_bytes, "images": images})
+    return result
+
+
+def run_worker(code_dir: str, corpus_dir: str, image_base: str, repeat: int) -> Dict:
+    clean, render = load_pipeline(code_dir)
+    documents = {}
+    for file_name in sorted(os.listdir(corpus_dir)):
+        with open(os.path.join(corpus_dir, file_name), "r", encoding="utf-8") as f:
+            doc_html = f.read().replace(IMAGE_BASE, image_base)
+        name = file_name[:-5].replace("__", "/")
+        documents[name] = measure_document(doc_html, clean, render, repeat)
+    return {"documents": documents, "aggregate": aggregate(documents)}
+
+
+def aggregate(documents: Dict[str, Dict]) -> Dict:
+    total = {f"{phase}_ms": round(sum(d[f"{phase}_ms"] for d in documents.values()), 3) for phase in PHASES}
+    total["total_ms"] = round(sum(d["total_ms"] for d in documents.values()), 3)
+    total["peak_kb"] = max((d["peak_kb"] for d in documents.values()), default=0)
+    for key in ("html_bytes", "docx_bytes", "xml_bytes", "images"):
+        total[key] = sum(d[key] for d in documents.values())
+    return total
+
+
+# --- 调度 ---
+
+def git_describe(code_dir: str) -> str:
+    try:
+        return subprocess.run(["git", "-C", code_dir, "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_version(code_dir: str, corpus_dir: str, image_base: str, repeat: int, workdir: str) -> Dict:
+    """在独立子进程 (临时工作目录、独立图片缓存) 中测量一个代码版本"""
+    os.makedirs(workdir, exist_ok=True)
+    result_path = os.path.join(workdir, "result.json")
+    env = {**os.environ, "LIEPIN_IMAGE_CACHE_DIR": os.path.join(workdir, "images"), "LIEPIN_IMAGE_POLICY": "fetch"}
+    command = [sys.executable, os.path.abspath(__file__), "--worker", code_dir, "--corpus-dir", corpus_dir,
+               "--image-base", image_base, "--repeat", str(repeat), "--result", result_path]
+    proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, timeout=WORKER_TIMEOUT)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code_dir} 测量失败:\n{proc.stderr[-3000:]}")
+    with open(result_path, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    dirty = "" if code_dir != REPO_DIR else subprocess.run(
+        ["git", "-C", code_dir, "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+    result.update({"version": git_describe(code_dir) + ("+dirty" if dirty.strip() else ""), "repeat": repeat,
+                   "python": sys.version.split()[0], "created": time.strftime("%Y-%m-%d %H:%M:%S")})
+    return result
+
+
+def add_worktree(rev: str, path: str):
+    subprocess.run(["git", "-C", REPO_DIR, "worktree", "add", "--detach", path, rev], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def remove_worktree(path: str):
+    subprocess.run(["git", "-C", REPO_DIR, "worktree", "remove", "--force", path],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+# --- 报告 ---
+
+def ratio_text(current: float, base: Optional[float], threshold: float) -> str:
+    if not base: return "-"
+    ratio = current / base
+    color = "red" if ratio > 1 + threshold else "green" if ratio < 1 - threshold else "white"
+    return f"[{color}]{ratio:.2f}x[/{color}]"
+
+
+def print_results(current: Dict, baseline: Optional[Dict] = None, threshold: float = DEFAULT_THRESHOLD):
+    from rich.console import Console
+    from rich.table import Table
+
+    base_docs = (baseline or {}).get("documents", {})
+    title = f"HTML -> Docx 转换 (版本 {current.get('version') or '当前'}，每份 {current.get('repeat')} 次取中位数)"
+    if baseline:
+        title += f"\n对比基线: 版本 {baseline.get('version') or '-'} ({baseline.get('created', '')})"
+    table = Table(title=title)
+    table.add_column("文档", style="cyan")
+    table.add_column("HTML KB", justify="right")
+    for phase in PHASES:
+        table.add_column(f"{phase} ms", justify="right")
+    table.add_column("合计 ms", justify="right")
+    table.add_column("峰值内存 KB", justify="right")
+    table.add_column("docx KB", justify="right")
+    table.add_column("图片", justify="right")
+    if baseline:
+        table.add_column("耗时对比", justify="right")
+        table.add_column("内存对比", justify="right")
+        table.add_column("体积对比", justify="right")
+
+    rows = list(current["documents"].items()) + [("[bold]汇总[/bold]", current["aggregate"])]
+    for index, (name, doc) in enumerate(rows):
+        if index == len(rows) - 1: table.add_section()
+        base = base_docs.get(name) if index < len(rows) - 1 else (baseline or {}).get("aggregate")
+        row = [name, f"{doc['html_bytes'] / 1024:,.1f}"] + [f"{doc[f'{phase}_ms']:,.1f}" for phase in PHASES]
+        row += [f"{doc['total_ms']:,.1f}", f"{doc['peak_kb']:,.0f}", f"{doc['docx_bytes'] / 1024:,.1f}", str(doc["images"])]
+        if baseline:
+            row += [ratio_text(doc["total_ms"], base and base["total_ms"], threshold),
+                    ratio_text(doc["peak_kb"], base and base["peak_kb"], threshold),
+                    ratio_text(doc["docx_bytes"], base and base["docx_bytes"], threshold)]
+        table.add_row(*row)
+    Console().print(table)
+
+
+def regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """合计耗时或峰值内存变差超过阈值的文档"""
+    found = []
+    for name, doc in list(current["documents"].items()) + [("汇总", current["aggregate"])]:
+        base = baseline.get("aggregate") if name == "汇总" else baseline.get("documents", {}).get(name)
+        if not base: continue
+        for key in ("total_ms", "peak_kb"):
+            if base[key] and doc[key] / base[key] > 1 + threshold:
+                found.append(f"{name} {key}: {base[key]:,.1f} -> {doc[key]:,.1f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML -> Docx 转换基准 (分阶段耗时、峰值内存、输出体积)")
+    parser.add_argument("-k", action="append", default=[], metavar="NAME", help="只运行名称包含 NAME 的文档，可重复")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每份文档的重复次数 (取中位数)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="把本次结果保存为 JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="与保存的结果对比")
+    parser.add_argument("--against", metavar="REV", help="在 git 版本 REV 的临时 worktree 上运行同一语料并对比")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判定回退的变差比例 (默认 0.15)")
+    parser.add_argument("--write-corpus", metavar="DIR", help="只把语料 (图片为占位地址) 写入 DIR")
+    parser.add_argument("--import-snapshots", metavar="RUN_DIR", help="把快照目录中的简历脱敏后导入 bench/corpus/")
+    parser.add_argument("--limit", type=int, default=20, help="--import-snapshots 最多导入的份数")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--image-base", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.corpus_dir, args.image_base, args.repeat)
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        return
+    if args.import_snapshots:
+        print(f"已导入 {import_snapshots(args.import_snapshots, args.limit)} 份脱敏简历到 {CORPUS_DIR}")
+        return
+
+    corpus = build_corpus(args.seed, args.k)
+    if not corpus:
+        raise SystemExit("没有匹配的文档")
+    root = tempfile.mkdtemp(prefix="liepin_docx_bench_")
+    corpus_dir = args.write_corpus or os.path.join(root, "corpus")
+    os.makedirs(corpus_dir, exist_ok=True)
+    for name, doc_html in corpus.items():
+        with open(os.path.join(corpus_dir, name.replace("/", "__") + ".html"), "w", encoding="utf-8") as f:
+            f.write(doc_html)
+    if args.write_corpus:
+        shutil.rmtree(root, ignore_errors=True)
+        print(f"已写入 {len(corpus)} 份文档到 {corpus_dir}")
+        return
+
+    images = ImageServer().start()
+    baseline = None
+    try:
+        if args.against:
+            worktree = os.path.join(root, "against")
+            add_worktree(args.against, worktree)
+            try:
+                print(f"测量 {args.against} ...", flush=True)
+                baseline = run_version(worktree, corpus_dir, images.base_url, args.repeat, os.path.join(root, "run-against"))
+            finally:
+                remove_worktree(worktree)
+        print("测量当前代码 ...", flush=True)
+        current = run_version(REPO_DIR, corpus_dir, images.base_url, args.repeat, os.path.join(root, "run-current"))
+    finally:
+        images.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(current, baseline, args.threshold)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.save}")
+    if baseline:
+        found = regressions(current, baseline, args.threshold)
+        for line in found:
+            print(f"回退: {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
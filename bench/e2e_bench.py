@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+离线端到端基准测试
+启动本地模拟猎聘站点 (fake_liepin.py) 与模拟 Ark 接口 (mock_ark.py)，用真实的 LiepinScraper.run_scraper
+跑完整流程 (浏览器、筛选、AI、docx、Excel)，对比不同配置的 候选人/分钟、各阶段耗时 (tracing) 与峰值内存；
+每个配置在独立子进程和临时目录中运行，互不影响，也不会碰到正式数据
+
+    python bench/e2e_bench.py                                  # 默认配置组
+    python bench/e2e_bench.py short-waits template --candidates 40
+    python bench/e2e_bench.py baseline --set ai_latency_ms=2000 --set profile_kb=80 --json bench.json
+    python bench/e2e_bench.py --channel chrome                 # 使用本机 Chrome (默认用 Playwright 自带 Chromium)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+DEFAULT_CONFIG = {
+    # 流程
+    "wait_scale": 1.0, "docx_mode": "html", "output_mode": "files", "deferred_render": "n",
+    "min_departure": "Present", "earliest_login": "", "company": "示例科技", "keyword": "产品经理",
+    # 模拟站点
+    "candidates": 20, "per_page": 10, "site_latency_ms": 50, "profile_kb": 30,
+    "company_match_rate": 0.9, "present_rate": 0.8, "duplicate_rate": 0.1,
+    # 模拟 Ark
+    "ai_latency_ms": 800, "ai_error_rate": 0.0, "match_rate": 0.6,
+    "seed": 0,
+}
+PRESETS = {
+    "baseline": {},
+    "short-waits": {"wait_scale": 0.2},
+    "no-waits": {"wait_scale": 0.0},
+    "template": {"wait_scale": 0.2, "docx_mode": "template"},
+    "stream": {"wait_scale": 0.2, "output_mode": "stream"},
+    "deferred": {"wait_scale": 0.2, "deferred_render": "y"},
+    "slow-ai": {"wait_scale": 0.2, "ai_latency_ms": 3000, "ai_error_rate": 0.05},
+}
+DEFAULT_PRESETS = ["baseline", "short-waits", "template", "deferred"]
+WORKER_TIMEOUT = 1800
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """本进程与已结束子进程 (浏览器驱动) 的峰值常驻内存；Windows 上没有 resource 模块时为 None"""
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "children": None}
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale}
+
+
+# --- 子进程: 在临时目录中运行一次 run_scraper ---
+
+def run_worker(config: Dict) -> Dict:
+    sys.path[:0] = [REPO_DIR, os.path.join(REPO_DIR, "libs")]
+    import main
+    from decisions import read_decisions
+    from tracing import tracer
+
+    scraper = main.LiepinScraper()
+    scraper.config = {
+        "category": "基准测试", "companies": config["company"], "positions": config["keyword"],
+        "view_phone": "n", "format_name": "n", "filename": "bench.xlsx", "zip_id": "BENCH",
+        "min_departure": config["min_departure"], "earliest_login": config["earliest_login"],
+        "deferred_render": config["deferred_render"], "output_mode": config["output_mode"], "docx_mode": config["docx_mode"],
+    }
+    scraper.target_companies_info = [{"name": config["company"], "quota": float("inf")}]
+    scraper.target_positions = [config["keyword"]] if config["keyword"] else []
+    scraper.briefing_template = "访谈对象需要在 __COMPANY__ 负责产品或数据相关工作。"
+    scraper.output_filename = os.path.join("data", "bench.xlsx")
+
+    async def run():
+        try:
+            started = time.perf_counter()
+            await scraper.session.prepare()
+            warm_up_ms = (time.perf_counter() - started) * 1000
+            scraper.startup.mark("inputs_done")
+            started = time.perf_counter()
+            await scraper.run_scraper()
+            return warm_up_ms, time.perf_counter() - started
+        finally:
+            await scraper.session.shutdown()
+
+    warm_up_ms, elapsed = asyncio.run(run())
+    reasons: Dict[str, int] = {}
+    if scraper.decision_log:
+        for record in read_decisions([scraper.decision_log.path]):
+            reasons[record["reason"]] = reasons.get(record["reason"], 0) + 1
+    processed, qualified = scraper.processed_resumes_count, scraper.qualified_resumes_count
+    return {
+        "processed": processed, "qualified": qualified, "elapsed_s": elapsed,
+        "candidates_per_min": processed / elapsed * 60 if elapsed else 0.0,
+        "qualified_per_min": qualified / elapsed * 60 if elapsed else 0.0,
+        "warm_up_ms": warm_up_ms, "ttfc_s": scraper.round_ttfc[0] if scraper.round_ttfc else None,
+        "stages": tracer.summary(), "reasons": reasons, "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# --- 父进程: 为每个配置启动模拟服务与子进程 ---
+
+def run_config(name: str, config: Dict, workdir: str, channel: str) -> Dict:
+    from fake_liepin import FakeLiepinSite
+    from mock_ark import MockArkServer
+
+    os.makedirs(workdir, exist_ok=True)
+    with open(os.path.join(workdir, "state.json"), "w", encoding="utf-8") as f:
+        json.dump({"cookies": [], "origins": []}, f)
+    pages = max(1, -(-config["candidates"] // config["per_page"]))
+    site = FakeLiepinSite({"pages": pages, "per_page": config["per_page"], "latency_ms": config["site_latency_ms"],
+                           "profile_kb": config["profile_kb"], "company_match_rate": config["company_match_rate"],
+                           "present_rate": config["present_rate"], "duplicate_rate": config["duplicate_rate"],
+                           "seed": config["seed"]}).start()
+    ark = MockArkServer({"latency_ms": config["ai_latency_ms"], "error_rate": config["ai_error_rate"],
+                         "match_rate": config["match_rate"], "seed": config["seed"]}).start()
+    env = dict(os.environ, LIEPIN_BASE_URL=site.base_url, VOLC_API_URL=ark.url, VOLC_SECRETKEY="bench",
+               LIEPIN_WAIT_SCALE=str(config["wait_scale"]), LIEPIN_BROWSER_CHANNEL=channel,
+               LIEPIN_TRACE="1", LIEPIN_CONTROL_PORT="", PYTHONIOENCODING="utf-8")
+    config_path = os.path.join(workdir, "config.json")
+    result_path = os.path.join(workdir, "result.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    try:
+        with open(os.path.join(workdir, "worker.log"), "w", encoding="utf-8") as log:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", config_path, "--result", result_path],
+                                  cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT, timeout=WORKER_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        # subprocess.run 已结束子进程；返回错误让其余配置继续，并保留工作目录中的 worker.log
+        return {"name": name, "error": f"超时 ({WORKER_TIMEOUT} 秒)，详见 {os.path.join(workdir, 'worker.log')}"}
+    finally:
+        site.close()
+        ark.close()
+    if proc.returncode != 0 or not os.path.exists(result_path):
+        return {"name": name, "error": f"子进程退出码 {proc.returncode}，详见 {os.path.join(workdir, 'worker.log')}"}
+    with open(result_path, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    result.update(name=name, config=config, ai=ark.stats, site_requests=site.requests)
+    return result
+
+
+def print_results(results: List[Dict]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="端到端基准测试")
+    for column in ["配置", "候选人", "合格", "耗时", "候选人/分钟", "合格/分钟", "TTFC", "AI 请求", "峰值内存"]:
+        table.add_column(column, justify="left" if column == "配置" else "right", style="cyan" if column == "配置" else None)
+    for r in results:
+        if "error" in r:
+            console.print(f"[red]配置 {r['name']} 运行失败: {r['error']}[/red]")
+            continue
+        rss = r["peak_rss_mb"]["self"]
+        table.add_row(r["name"], str(r["processed"]), str(r["qualified"]), f"{r['elapsed_s']:.1f} s",
+                      f"{r['candidates_per_min']:.1f}", f"{r['qualified_per_min']:.1f}",
+                      f"{r['ttfc_s']:.1f} s" if r["ttfc_s"] is not None else "-",
+                      f"{r['ai']['requests']} ({r['ai']['errors']} 错误)", f"{rss:.0f} MB" if rss else "-")
+    ok = [r for r in results if "error" not in r]
+    if not ok: return
+    console.print(table)
+    # 各阶段 p50 (ms) 对比，按第一个配置的总耗时排序
+    stage_order = [row["stage"] for row in ok[0]["stages"]]
+    for r in ok[1:]:
+        stage_order += [row["stage"] for row in r["stages"] if row["stage"] not in stage_order]
+    stages = Table(title="各阶段耗时 p50 / p95 (ms)")
+    stages.add_column("阶段", style="cyan")
+    for r in ok:
+        stages.add_column(r["name"], justify="right")
+    for stage in stage_order:
+        cells = []
+        for r in ok:
+            row = next((row for row in r["stages"] if row["stage"] == stage), None)
+            cells.append(f"{row['p50']:.0f} / {row['p95']:.0f}" if row else "-")
+        stages.add_row(stage, *cells)
+    console.print(stages)
+
+    reasons = Table(title="候选人结果")
+    reasons.add_column("结果", style="cyan")
+    for r in ok:
+        reasons.add_column(r["name"], justify="right")
+    for reason in sorted({reason for r in ok for reason in r["reasons"]}):
+        reasons.add_row(reason, *[str(r["reasons"].get(reason, 0)) for r in ok])
+    console.print(reasons)
+
+
+def parse_overrides(items: List[str]) -> Dict:
+    overrides = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        if key not in DEFAULT_CONFIG:
+            raise SystemExit(f"未知配置项: {key} (可选: {', '.join(DEFAULT_CONFIG)})")
+        default = DEFAULT_CONFIG[key]
+        overrides[key] = type(default)(value) if not isinstance(default, str) else value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线端到端基准测试 (模拟猎聘站点 + 模拟 Ark)")
+    parser.add_argument("presets", nargs="*", help=f"配置组 (可选: {', '.join(PRESETS)}；默认: {' '.join(DEFAULT_PRESETS)})")
+    parser.add_argument("--candidates", type=int, help="每个配置处理的候选人数")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="覆盖配置项，可重复")
+    parser.add_argument("--channel", default="", help="浏览器 channel (默认空 = Playwright 自带 Chromium)")
+    parser.add_argument("--workdir", help="运行目录 (默认临时目录，结束后删除)")
+    parser.add_argument("--keep", action="store_true", help="保留运行目录 (日志、Excel、trace)")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.worker, "r", encoding="utf-8") as f:
+            result = run_worker(json.load(f))
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        return
+
+    names = args.presets or DEFAULT_PRESETS
+    unknown = [name for name in names if name not in PRESETS]
+    if unknown:
+        raise SystemExit(f"未知配置组: {', '.join(unknown)} (可选: {', '.join(PRESETS)})")
+    overrides = parse_overrides(args.set)
+    if args.candidates: overrides["candidates"] = args.candidates
+
+    root = args.workdir or tempfile.mkdtemp(prefix="liepin_bench_")
+    results = []
+    try:
+        for name in names:
+            config = {**DEFAULT_CONFIG, **PRESETS[name], **overrides}
+            print(f"运行配置 {name} ...", flush=True)
+            results.append(run_config(name, config, os.path.join(root, name), args.channel))
+    finally:
+        # 出错时保留运行目录，方便查看 worker.log
+        keep = args.keep or args.workdir or any("error" in r for r in results)
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+    print_results(results)
+    if keep:
+        print(f"运行目录: {root}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+本地模拟猎聘站点 (离线基准测试用)
+按 main.py 依赖的选择器生成搜索页、结果列表 (div.new-resume-personal-name / li.ant-pagination-next)
+和简历详情页 (#resume-detail-single)；候选人数据按种子确定性生成，可调整公司匹配率、在职比例、重复比例、
+简历大小和页面延迟
+
+    python bench/fake_liepin.py [--port 8800] [--pages 3] [--per-page 10]
+    LIEPIN_BASE_URL=http://127.0.0.1:8800 LIEPIN_BROWSER_CHANNEL= python main.py
+"""
+
+import sys
+import html
+import hashlib
+import time
+import base64
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+DEFAULT_SITE = {
+    "pages": 2,                  # 每次搜索的结果页数
+    "per_page": 10,              # 每页候选人数
+    "company_match_rate": 0.9,   # 当前公司与搜索公司一致的比例
+    "present_rate": 0.8,         # 当前在职 (至今) 的比例
+    "recent_login_rate": 0.9,    # 最近 30 天内登录的比例
+    "duplicate_rate": 0.1,       # 与之前出现过的候选人 (姓名/职位/在职时间) 相同的比例
+    "profile_kb": 30,            # 简历详情页 HTML 的大致大小
+    "latency_ms": 50,            # 每个页面请求的服务端延迟
+    "seed": 0,
+}
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚"
+TITLES = ["产品经理", "高级产品经理", "数据分析师", "算法工程师", "运营总监", "后端开发工程师", "销售经理", "战略分析师"]
+OTHER_COMPANIES = ["某科技公司", "某互联网公司", "某咨询公司", "某汽车集团", "某银行"]
+SCHOOLS = ["北京大学", "复旦大学", "浙江大学", "中山大学", "武汉大学"]
+# 1x1 PNG，作为头像与简历内的外链图片
+AVATAR_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==")
+
+
+class CandidateStore:
+    """按 (公司, 关键词, 页码, 序号) 确定性生成候选人，并记住 id -> 候选人供详情页使用"""
+
+    def __init__(self, settings: Dict):
+        self.settings = settings
+        self.by_id: Dict[str, Dict] = {}
+        self.history: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def page(self, company: str, keyword: str, page: int) -> List[Dict]:
+        return [self.candidate(company, keyword, page, index) for index in range(self.settings["per_page"])]
+
+    def candidate(self, company: str, keyword: str, page: int, index: int) -> Dict:
+        cid = f"{hashlib.md5(f'{company} {keyword}'.encode('utf-8')).hexdigest()[:8]}{page:03d}{index:03d}"
+        with self._lock:
+            if cid in self.by_id: return self.by_id[cid]
+            rng = random.Random(f"{self.settings['seed']}:{cid}")
+            s = self.settings
+            if self.history and rng.random() < s["duplicate_rate"]:
+                source = rng.choice(self.history)
+                name, gender, title, start = source["name"], source["gender"], source["title"], source["start"]
+            else:
+                name = rng.choice(SURNAMES) + "*" + rng.choice(GIVEN)
+                gender = rng.choice("男女")
+                title = keyword or rng.choice(TITLES)
+                start = f"{rng.randint(2012, 2023)}.{rng.randint(1, 12):02d}"
+            present = rng.random() < s["present_rate"]
+            end = "至今" if present else f"{rng.randint(2019, 2024)}.{rng.randint(1, 12):02d}"
+            login_days = rng.randint(0, 30) if rng.random() < s["recent_login_rate"] else rng.randint(400, 900)
+            candidate = {
+                "id": cid, "name": name, "gender": gender, "title": title, "start": start, "end": end,
+                "company": company if rng.random() < s["company_match_rate"] else rng.choice(OTHER_COMPANIES),
+                "login": (datetime.now() - timedelta(days=login_days)).strftime("%Y/%m/%d"),
+                "age": rng.randint(24, 45), "school": rng.choice(SCHOOLS),
+                "previous": [(rng.choice(OTHER_COMPANIES), rng.choice(TITLES), 2008 + i * 2) for i in range(rng.randint(1, 4))],
+                "seed": rng.random(),
+            }
+            self.by_id[cid] = candidate
+            self.history.append(candidate)
+            return candidate
+
+
+def render_search(key: str, page: int, store: CandidateStore) -> str:
+    parts = [f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>搜索人才</title></head><body>
+<form action="/search/getConditionItem" method="get">
+  <input class="search-input" name="key" value="{html.escape(key)}" autocomplete="off">
+  <button type="submit" class="search-btn">搜 索</button>
+</form>"""]
+    if key:
+        company, _, keyword = key.strip().partition(" ")
+        parts.append('<div class="result-list">')
+        for c in store.page(company, keyword.strip(), page):
+            parts.append(f"""<div class="resume-card">
+  <div class="new-resume-personal-name" style="display:inline-block;cursor:pointer" onclick="window.open('/resume/{c['id']}', '_blank')">{html.escape(c['name'])}</div>
+  <span class="card-title">{html.escape(c['title'])}</span> <span class="card-company">{html.escape(c['company'])}</span>
+</div>""")
+        parts.append("</div>")
+        last = page >= store.settings["pages"]
+        next_url = f"/search/getConditionItem?key={quote(key)}&page={page + 1}"
+        parts.append(f"""<ul class="ant-pagination"><li class="ant-pagination-item-active">{page}</li>
+<li class="ant-pagination-next{' ant-pagination-disabled' if last else ''}"><button type="button" onclick="location.href='{next_url}'">下一页</button></li></ul>""")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def render_profile(c: Dict, profile_kb: int) -> str:
+    rng = random.Random(c["seed"])
+    work = [f"""<div class="rd-work-item">
+  <div class="rd-work-comp"><h5>{html.escape(c['company'])}</h5></div>
+  <h6 class="job-name">{html.escape(c['title'])}</h6>
+  <span class="rd-work-time">{c['start']}-{c['end']}</span>
+  <ul class="work-desc">{{desc}}</ul>
+</div>"""]
+    for company, title, year in c["previous"]:
+        work.append(f"""<div class="rd-work-item">
+  <div class="rd-work-comp"><h5>{html.escape(company)}</h5></div>
+  <h6 class="job-name">{html.escape(title)}</h6>
+  <span class="rd-work-time">{year}.03-{year + 2}.02</span>
+  <table class="work-table"><tr><td>汇报对象</td><td>总监</td></tr><tr><td>下属人数</td><td>{rng.randint(0, 20)}</td></tr></table>
+</div>""")
+    # 用项目描述把页面填充到指定大小
+    bullet = "<li>负责<span class=\"kw\">核心业务</span>的规划与落地，推动跨部门协作，指标提升 {}%</li>"
+    bullets, size = [], sum(len(w) for w in work)
+    while size < profile_kb * 1024:
+        item = bullet.format(rng.randint(5, 80))
+        bullets.append(item)
+        size += len(item.encode("utf-8"))
+    work[0] = work[0].replace("{desc}", "".join(bullets))
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(c['name'])} - 简历</title></head><body>
+<div id="resume-detail-single">
+  <div class="ant-tabs"><div class="ant-tabs-nav">简历详情</div><div class="ant-tabs-extra-content">最后登录 {c['login']}</div></div>
+  <div class="basic-cont">
+    <img class="avatar" src="/static/avatar.png" width="60" height="60">
+    <div class="resume-preview-name">{html.escape(c['name'])}</div>
+    <div class="sep-info">{c['gender']} | {c['age']}岁 | 本科</div>
+  </div>
+  <h3>工作经历</h3>
+  {''.join(work)}
+  <h3>教育经历</h3>
+  <div class="rd-edu-item"><b>{c['school']}</b> 本科 | 计算机科学</div>
+  <img src="data:image/png;base64,{base64.b64encode(AVATAR_PNG).decode()}">
+</div>
+</body></html>"""
+
+
+class FakeLiepinSite:
+    """在后台线程中运行的模拟站点；base_url 可直接设置为 LIEPIN_BASE_URL"""
+
+    def __init__(self, settings: Optional[Dict] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = {**DEFAULT_SITE, **(settings or {})}
+        self.store = CandidateStore(self.settings)
+        self.requests = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                time.sleep(site.settings["latency_ms"] / 1000)
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/search/getConditionItem":
+                    key = query.get("key", [""])[0]
+                    page = int(query.get("page", ["1"])[0])
+                    self._send(200, render_search(key, page, site.store).encode("utf-8"), "text/html; charset=utf-8")
+                elif url.path.startswith("/resume/"):
+                    candidate = site.store.by_id.get(url.path.rsplit("/", 1)[-1])
+                    if candidate is None:
+                        self._send(404, b"not found", "text/plain")
+                    else:
+                        self._send(200, render_profile(candidate, site.settings["profile_kb"]).encode("utf-8"), "text/html; charset=utf-8")
+                elif url.path == "/static/avatar.png":
+                    self._send(200, AVATAR_PNG, "image/png")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "max-age=3600" if content_type == "image/png" else "no-cache")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-liepin", daemon=True)
+
+    def start(self) -> "FakeLiepinSite":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟猎聘站点")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--pages", type=int, default=DEFAULT_SITE["pages"])
+    parser.add_argument("--per-page", type=int, default=DEFAULT_SITE["per_page"])
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_SITE["latency_ms"])
+    parser.add_argument("--profile-kb", type=int, default=DEFAULT_SITE["profile_kb"])
+    args = parser.parse_args()
+
+    site = FakeLiepinSite({"pages": args.pages, "per_page": args.per_page, "latency_ms": args.latency_ms,
+                           "profile_kb": args.profile_kb}, port=args.port).start()
+    print(f"模拟站点: {site.base_url}/search/getConditionItem  (Ctrl+C 退出)")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        site.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
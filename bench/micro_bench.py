@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+解析函数微基准与回归检查
+对每个候选人/每行都会调用的解析函数 (main.py 的日期/在职时间/姓名处理，dedup.py 的行解析)，
+用按种子生成的真实输入 (中英文日期写法、全角括号、异常字符串等) 测量每次调用耗时，
+与保存的基线 (bench/baselines/micro_parsing.json) 比较:
+- 耗时按校准循环归一化后比较，超过阈值 (默认慢 25%) 视为性能回退
+- 输出摘要不一致视为行为变化 (优化不应改变结果)
+
+    python bench/micro_bench.py                  # 运行并与基线比较，有回退时退出码为 1
+    python bench/micro_bench.py --save           # 更新基线
+    python bench/micro_bench.py -k work_time --threshold 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines", "micro_parsing.json")
+DEFAULT_THRESHOLD = 0.25
+INPUT_COUNT = 2000
+TARGET_SECONDS = 0.2
+REPEATS = 5
+
+
+# --- 输入生成 ---
+
+def gen_work_times(rng: random.Random, n: int) -> List[str]:
+    def ym(full=True):
+        year = rng.randint(2005, 2025)
+        return f"{year if full else str(year)[-2:]}.{rng.choice([str(rng.randint(1, 12)), f'{rng.randint(1, 12):02d}'])}"
+    shapes = [
+        lambda: f"{ym()} - {ym()}",
+        lambda: f"{ym()}-{ym()}",
+        lambda: f"（{ym()} - 至今）",
+        lambda: f"{ym()} - 至今, {rng.randint(1, 9)}年{rng.randint(1, 11)}个月",
+        lambda: f"{ym()} - To present",
+        lambda: f"{ym()}-present",
+        lambda: f"{ym()} - PRESENT",
+        lambda: f" - 至今 {ym()}",
+        lambda: f"{rng.randint(2005, 2025)}年{rng.randint(1, 12)}月 - 至今",
+        lambda: rng.choice(["", "未知", "n/a", "2019", "（）", "2019.13 - 2020.1x"]),
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def gen_departure_pairs(rng: random.Random, n: int) -> List[Tuple[str, str]]:
+    times = [f"{rng.randint(10, 25)}/{rng.randint(1, 12)}-{rng.choice(['Present', f'{rng.randint(15, 25)}/{rng.randint(1, 12)}'])}"
+             for _ in range(50)] + ["", "未知", "19/3", "abc-xyz"]
+    mins = ["Present", "present", "23/6", "24/1", " 22/12 ", ""]
+    return [(rng.choice(times), rng.choice(mins)) for _ in range(n)]
+
+
+def gen_date_values(rng: random.Random, n: int) -> List[str]:
+    pool = ["Present", "PRESENT", " present ", "23/6", "9/12", "24/01", "2023/6", "", "abc", "至今"]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def gen_login_inputs(rng: random.Random, n: int) -> List[str]:
+    # 配置值: 一次运行中取值很少，但每个候选人都会解析一次
+    pool = ["24/3", "2024/03/15", "24-3-1", "2024-3", "", "25/1/9", "bad", "2024年3月"]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def gen_names(rng: random.Random, n: int) -> List[str]:
+    surnames = "王李张刘陈杨黄赵吴周先女"
+    shapes = [
+        lambda: rng.choice(surnames) + "**",
+        lambda: rng.choice(surnames) + "先生",
+        lambda: rng.choice(surnames) + "女士",
+        lambda: "*" + rng.choice(surnames) + "*" + rng.choice(surnames),
+        lambda: " " + rng.choice(surnames) + "某某 ",
+        lambda: rng.choice(["Tom Li", "先生", "女士", "", "*", "**先生"]),
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def gen_name_gender(rng: random.Random, n: int) -> List[Tuple[str, str]]:
+    return [(name, rng.choice(["男", "女", ""])) for name in gen_names(rng, n)]
+
+
+def gen_dedup_lines(rng: random.Random, n: int) -> List[str]:
+    names = ["张先生", "李女士", "王**", "Tom"]
+    companies = ["某科技公司", "某 AI 公司", "ByteDance"]
+    titles = ["产品经理", "算法工程师", "Senior PM"]
+    shapes = [
+        lambda: "\t".join([rng.choice(names), rng.choice(companies), rng.choice(titles), "138****1234", "23/5-Present"]),
+        lambda: "  ".join([rng.choice(names), rng.choice(companies), rng.choice(titles), "139****5678"]),
+        lambda: " ".join([rng.choice(names), "公司", rng.choice(titles)]),
+        lambda: rng.choice(["分类A", "", "   ", "只有两列\t公司", "上游"]),
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def gen_dedup_content(rng: random.Random, n: int) -> List[str]:
+    return ["\n".join(gen_dedup_lines(rng, 50)) for _ in range(max(1, n // 50))]
+
+
+# --- 基准定义: (名称, 输入生成, 调用方式) ---
+
+def load_benchmarks() -> List[Tuple[str, Callable, Callable]]:
+    sys.path[:0] = [REPO_DIR, os.path.join(REPO_DIR, "libs")]
+    import main
+    import dedup
+    main.console.quiet = True  # 异常输入会打印警告
+    return [
+        ("format_work_time", gen_work_times, main.format_work_time),
+        ("convert_date_to_value", gen_date_values, main.convert_date_to_value),
+        ("is_departure_date_ok", gen_departure_pairs, lambda pair: main.is_departure_date_ok(*pair)),
+        ("parse_login_date_input", gen_login_inputs, main.parse_login_date_input),
+        ("extract_name_first_char", gen_names, main.extract_name_first_char),
+        ("format_name_to_initials", gen_name_gender, lambda pair: main.format_name_to_initials(*pair)),
+        ("dedup.parse_candidate_line", gen_dedup_lines, dedup.parse_candidate_line),
+        ("dedup.parse_content", gen_dedup_content, dedup.parse_content),
+    ]
+
+
+# --- 测量 ---
+
+def calibrate() -> float:
+    """固定的纯 Python 工作量 (每次迭代 ns)，用于在不同机器间归一化"""
+    def workload():
+        total = 0
+        for i in range(1000):
+            total += len(str(i * 7)) ^ (i & 3)
+        return total
+    return measure(workload, [None], per_input=False)
+
+
+def measure(func: Callable, inputs: List, per_input: bool = True) -> float:
+    """多次重复取最快一次，返回每次调用的纳秒数"""
+    call = (lambda: [func(x) for x in inputs]) if per_input else func
+    start = time.perf_counter()
+    call()
+    once = max(time.perf_counter() - start, 1e-6)
+    loops = max(1, int(TARGET_SECONDS / once))
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            call()
+        best = min(best, (time.perf_counter_ns() - start) / loops)
+    return best / (len(inputs) if per_input else 1)
+
+
+def output_digest(func: Callable, inputs: List) -> str:
+    return hashlib.sha1(repr([func(x) for x in inputs]).encode("utf-8")).hexdigest()[:16]
+
+
+def run(selected: List[str], seed: int) -> Dict:
+    calibration = calibrate()
+    results = {}
+    for name, generate, func in load_benchmarks():
+        if selected and not any(key in name for key in selected): continue
+        inputs = generate(random.Random(f"{seed}:{name}"), INPUT_COUNT)
+        ns = measure(func, inputs)
+        results[name] = {"ns_per_call": round(ns, 1), "normalized": round(ns / calibration, 4),
+                         "digest": output_digest(func, inputs), "inputs": len(inputs)}
+    return {"calibration_ns": round(calibration, 1), "python": platform.python_version(),
+            "machine": platform.machine(), "seed": seed, "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, str, str]]:
+    """返回 [(名称, 状态, 说明)]；状态: ok / faster / slower / changed / new"""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append((name, "new", "")); continue
+        if result["digest"] != base["digest"]:
+            rows.append((name, "changed", f"输出摘要 {base['digest']} -> {result['digest']}")); continue
+        ratio = result["normalized"] / base["normalized"]
+        status = "slower" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "ok"
+        rows.append((name, status, f"{ratio:.2f}x"))
+    return rows
+
+
+def print_report(current: Dict, baseline: Dict, rows: List[Tuple[str, str, str]]):
+    from rich.console import Console
+    from rich.table import Table
+
+    styles = {"ok": "green", "faster": "bold green", "slower": "bold red", "changed": "bold red", "new": "yellow"}
+    labels = {"ok": "持平", "faster": "更快", "slower": "回退", "changed": "结果变化", "new": "新增"}
+    table = Table(title=f"解析函数微基准 (校准 {current['calibration_ns'] / 1000:.1f} µs/次)")
+    table.add_column("函数", style="cyan")
+    table.add_column("基线 ns/次", justify="right")
+    table.add_column("当前 ns/次", justify="right")
+    table.add_column("相对基线 (归一化)", justify="right")
+    table.add_column("状态")
+    for name, status, note in rows:
+        base = baseline.get("results", {}).get(name)
+        table.add_row(name, f"{base['ns_per_call']:,.0f}" if base else "-", f"{current['results'][name]['ns_per_call']:,.0f}",
+                      note, f"[{styles[status]}]{labels[status]}[/{styles[status]}]")
+    Console().print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析函数微基准与回归检查")
+    parser.add_argument("-k", action="append", default=[], metavar="NAME", help="只运行名称包含 NAME 的基准，可重复")
+    parser.add_argument("--save", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判定回退的变慢比例 (默认 0.25)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    current = run(args.k, args.seed)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    print_report(current, baseline, rows)
+
+    if args.save:
+        if args.k and baseline:
+            baseline.setdefault("results", {}).update(current["results"])
+            current = {**baseline, "calibration_ns": current["calibration_ns"]}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+    elif any(status in ("slower", "changed") for _, status, _ in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+本地模拟火山方舟 (Ark) /api/v3/chat/completions (离线基准测试用)
+判断请求 (提示中要求只回答 YES/NO) 按简历内容的哈希确定性返回 YES/NO，其余请求返回 Profile 总结；
+可配置延迟分布 (uniform/lognormal/exponential)、5xx 与 429 注入 (随机或超过并发上限时)、
+以及 "stream": true 的 SSE 流式响应
+
+    python bench/mock_ark.py [--port 8801] [--latency-ms 800] [--latency-dist lognormal] [--error-rate 0.05]
+    VOLC_API_URL=http://127.0.0.1:8801/api/v3/chat/completions VOLC_SECRETKEY=bench python main.py
+"""
+
+import re
+import sys
+import math
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_ARK = {
+    "latency_ms": 800,       # 平均响应时间 (流式时为完整响应时间)
+    "latency_dist": "uniform",  # uniform / lognormal / exponential
+    "latency_jitter": 0.3,   # uniform: 在平均值上下均匀浮动的比例
+    "latency_sigma": 0.6,    # lognormal: 对数标准差 (越大长尾越重)
+    "error_rate": 0.0,       # 返回 5xx (500/502/503) 的概率
+    "throttle_rate": 0.0,    # 随机返回 429 的概率
+    "max_concurrency": 0,    # 同时处理的请求超过该数量时返回 429 (0 = 不限)
+    "retry_after": 1,        # 429 响应的 Retry-After 秒数
+    "ttft_ratio": 0.3,       # 流式: 首个分片在完整响应时间的多少比例处发出
+    "stream_chunk_chars": 4, # 流式: 每个分片的字符数
+    "match_rate": 0.6,       # 判断请求返回 YES 的比例
+    "seed": 0,
+}
+LATENCY_DISTS = ("uniform", "lognormal", "exponential")
+ERROR_STATUSES = (500, 502, 503)
+COMPLETIONS_PATH = "/api/v3/chat/completions"
+TARGET_COMPANY_RE = re.compile(r"【目标公司】:\s*(\S+)")
+
+
+def is_match_prompt(prompt: str) -> bool:
+    return '"YES" 或 "NO"' in prompt
+
+
+def completion(content: str, model: str) -> Dict:
+    return {
+        "id": f"mock-{time.time_ns()}", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(content), "total_tokens": len(content)},
+    }
+
+
+def completion_chunk(content: str, model: str, finish: bool = False) -> Dict:
+    return {
+        "id": "mock-stream", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": "stop" if finish else None}],
+    }
+
+
+def answer_for(prompt: str, settings: Dict) -> str:
+    if is_match_prompt(prompt):
+        digest = hashlib.md5(f"{settings['seed']}:{prompt}".encode("utf-8")).digest()
+        return "YES" if digest[0] / 256 < settings["match_rate"] else "NO"
+    match = TARGET_COMPANY_RE.search(prompt)
+    company = match.group(1) if match else "目标公司"
+    return (f"{company}的经历:\n21/3-Present {company} 产品经理\n负责核心产品规划与数据分析\n"
+            f"其他工作经历:\n18/7-21/2 某互联网公司 产品专员")
+
+
+class MockArkServer:
+    """在后台线程中运行的模拟 Ark 服务；url 可直接设置为 VOLC_API_URL"""
+
+    def __init__(self, settings: Optional[Dict] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = {**DEFAULT_ARK, **(settings or {})}
+        if self.settings["latency_dist"] not in LATENCY_DISTS:
+            raise ValueError(f"未知的延迟分布: {self.settings['latency_dist']} (可选: {', '.join(LATENCY_DISTS)})")
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "match": 0, "summary": 0, "streams": 0, "max_inflight": 0}
+        self._rng = random.Random(self.settings["seed"])
+        self._lock = threading.Lock()
+        self._inflight = 0
+        ark = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.split("?")[0] != COMPLETIONS_PATH:
+                    return self._send(404, {"error": {"message": "not found"}})
+                try:
+                    payload = json.loads(body)
+                    prompt = payload["messages"][-1]["content"]
+                except (ValueError, KeyError, IndexError):
+                    return self._send(400, {"error": {"message": "bad request"}})
+                status = ark._enter()
+                try:
+                    if status == 429:
+                        # 限流在排队前就返回，不消耗处理时间
+                        return self._send(429, {"error": {"message": "mock rate limit", "code": "TooManyRequests"}},
+                                          {"Retry-After": str(ark.settings["retry_after"])})
+                    delay, status = ark._draw()
+                    if status:
+                        time.sleep(delay)
+                        return self._send(status, {"error": {"message": "mock internal error", "code": "InternalServiceError"}})
+                    with ark._lock:
+                        ark.stats["match" if is_match_prompt(prompt) else "summary"] += 1
+                    answer = answer_for(prompt, ark.settings)
+                    if payload.get("stream"):
+                        return self._stream(answer, payload.get("model", ""), delay)
+                    time.sleep(delay)
+                    self._send(200, completion(answer, payload.get("model", "")))
+                finally:
+                    ark._leave()
+
+            def _stream(self, answer: str, model: str, delay: float):
+                """SSE: 首个分片在 ttft_ratio * delay 后发出，其余分片均匀分布在剩余时间内"""
+                size = max(1, ark.settings["stream_chunk_chars"])
+                pieces = [answer[i:i + size] for i in range(0, len(answer), size)] or [""]
+                first = delay * ark.settings["ttft_ratio"]
+                interval = (delay - first) / len(pieces)
+                with ark._lock:
+                    ark.stats["streams"] += 1
+                time.sleep(first)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for index, piece in enumerate(pieces):
+                    if index: time.sleep(interval)
+                    self._event(json.dumps(completion_chunk(piece, model), ensure_ascii=False))
+                time.sleep(interval)
+                self._event(json.dumps(completion_chunk("", model, finish=True)))
+                self._event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _event(self, data: str):
+                """每个 SSE 事件作为一个 HTTP 分块立即发出"""
+                body = f"data: {data}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}{COMPLETIONS_PATH}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-ark", daemon=True)
+
+    def _enter(self) -> Optional[int]:
+        """登记一个进行中的请求；随机限流或超过并发上限时返回 429"""
+        s = self.settings
+        with self._lock:
+            self.stats["requests"] += 1
+            self._inflight += 1
+            self.stats["max_inflight"] = max(self.stats["max_inflight"], self._inflight)
+            over_limit = s["max_concurrency"] and self._inflight > s["max_concurrency"]
+            if over_limit or self._rng.random() < s["throttle_rate"]:
+                self.stats["throttled"] += 1
+                return 429
+        return None
+
+    def _leave(self):
+        with self._lock:
+            self._inflight -= 1
+
+    def _draw(self):
+        """(延迟秒数, 错误状态码或 None)"""
+        s = self.settings
+        mean = s["latency_ms"] / 1000
+        with self._lock:
+            if s["latency_dist"] == "lognormal":
+                # 均值保持为 latency_ms
+                delay = self._rng.lognormvariate(math.log(mean or 1e-9) - s["latency_sigma"] ** 2 / 2, s["latency_sigma"]) if mean else 0.0
+            elif s["latency_dist"] == "exponential":
+                delay = self._rng.expovariate(1 / mean) if mean else 0.0
+            else:
+                delay = mean * (1 + self._rng.uniform(-s["latency_jitter"], s["latency_jitter"]))
+            status = self._rng.choice(ERROR_STATUSES) if self._rng.random() < s["error_rate"] else None
+            if status:
+                self.stats["errors"] += 1
+        return max(0.0, delay), status
+
+    def start(self) -> "MockArkServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟火山方舟 chat/completions")
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_ARK["latency_ms"])
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default=DEFAULT_ARK["latency_dist"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ARK["error_rate"])
+    parser.add_argument("--throttle-rate", type=float, default=DEFAULT_ARK["throttle_rate"])
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_ARK["max_concurrency"])
+    parser.add_argument("--match-rate", type=float, default=DEFAULT_ARK["match_rate"])
+    args = parser.parse_args()
+
+    ark = MockArkServer({"latency_ms": args.latency_ms, "latency_dist": args.latency_dist, "error_rate": args.error_rate,
+                         "throttle_rate": args.throttle_rate, "max_concurrency": args.max_concurrency,
+                         "match_rate": args.match_rate}, port=args.port).start()
+    print(f"模拟 Ark: {ark.url}  (Ctrl+C 退出)")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        ark.close()
+        print(json.dumps(ark.stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+运行控制与指标接口
+默认关闭。设置 LIEPIN_CONTROL_PORT (例如 18765) 后，在事件循环中启动一个只监听 127.0.0.1 的 HTTP 服务
+(端口被占用时 (例如同时运行多个实例) 自动改用随机端口)，无需键盘监听即可在无图形界面的服务器 / SSH 中控制任务。
+每次运行生成随机令牌，启动时与实际地址一起显示；所有请求都必须带 X-Control-Token 头，
+改变状态的命令只接受 POST (浏览器页面无法跨域伪造带自定义头的请求):
+
+    curl -X POST -H "X-Control-Token: <令牌>" localhost:18765/pause    暂停 (并立即保存 Excel)
+    curl -X POST -H "X-Control-Token: <令牌>" localhost:18765/resume   继续
+    curl -X POST -H "X-Control-Token: <令牌>" localhost:18765/stop     处理完当前候选人后结束本轮
+    curl -X POST -H "X-Control-Token: <令牌>" localhost:18765/flush    立即保存 Excel
+    curl -H "X-Control-Token: <令牌>" localhost:18765/metrics          指标快照 (JSON)
+"""
+
+import os
+import json
+import time
+import hmac
+import asyncio
+import secrets
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = os.getenv("LIEPIN_CONTROL_PORT", "")
+TOKEN_HEADER = "x-control-token"
+# 只读命令允许 GET，其余命令都会改变运行状态，必须 POST
+READ_ONLY_COMMANDS = {"metrics"}
+# 延迟直方图的桶上界 (毫秒)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000]
+
+Handler = Callable[[], Union[Dict, Awaitable[Dict]]]
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图 (毫秒)"""
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        idx = next((i for i, bound in enumerate(self.buckets) if ms <= bound), len(self.buckets))
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if not self.count: return 0.0
+        target = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(self.buckets[idx]) if idx < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.count, "mean": self.total / self.count if self.count else 0.0, "max": self.max,
+            "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RunMetrics:
+    """一轮运行的计数与延迟指标 (只在事件循环线程中更新)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.companies: Dict[str, Dict[str, int]] = {}
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.ai_calls = 0
+        self.ai_errors = 0
+
+    def processed(self, company: str):
+        self.companies.setdefault(company, {"processed": 0, "qualified": 0})["processed"] += 1
+
+    def qualified(self, company: str):
+        self.companies.setdefault(company, {"processed": 0, "qualified": 0})["qualified"] += 1
+
+    def ai_result(self, result: Optional[bool]):
+        self.ai_calls += 1
+        if result is None: self.ai_errors += 1
+
+    def observe(self, stage: str, ms: float):
+        self.stages.setdefault(stage, LatencyHistogram()).observe(ms)
+
+    def snapshot(self) -> Dict:
+        elapsed_min = max((time.time() - self.started) / 60, 1e-9)
+        processed = sum(c["processed"] for c in self.companies.values())
+        qualified = sum(c["qualified"] for c in self.companies.values())
+        return {
+            "elapsed_s": round(elapsed_min * 60),
+            "processed": processed,
+            "qualified": qualified,
+            "throughput": {"processed_per_min": processed / elapsed_min, "qualified_per_min": qualified / elapsed_min},
+            "companies": self.companies,
+            "ai": {"calls": self.ai_calls, "errors": self.ai_errors,
+                   "error_rate": self.ai_errors / self.ai_calls if self.ai_calls else 0.0},
+            "stages_ms": {name: hist.snapshot() for name, hist in self.stages.items()},
+        }
+
+
+class ControlServer:
+    """极简 HTTP 控制服务: 路径即命令，校验令牌，返回 JSON"""
+
+    def __init__(self, handlers: Dict[str, Handler], host: str = CONTROL_HOST, port: int = 0,
+                 token: Optional[str] = None):
+        self.handlers = handlers
+        self.host = host
+        self.port = port
+        self.token = token or secrets.token_urlsafe(24)
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await asyncio.wait_for(reader.readline(), timeout=5)).decode('latin-1')
+            headers: Dict[str, str] = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""): break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+            parts = request_line.split()
+            method = parts[0].upper() if parts else ""
+            command = parts[1].split("?")[0].strip("/") if len(parts) >= 2 else ""
+            handler = self.handlers.get(command)
+            if not hmac.compare_digest(headers.get(TOKEN_HEADER, "").encode('latin-1'), self.token.encode('latin-1')):
+                status, body = "401 Unauthorized", {"error": "missing or invalid X-Control-Token"}
+            elif handler is None:
+                status, body = "404 Not Found", {"error": "unknown command", "commands": sorted(self.handlers)}
+            elif method != "POST" and not (method == "GET" and command in READ_ONLY_COMMANDS):
+                status, body = "405 Method Not Allowed", {"error": f"{command} requires POST"}
+            else:
+                result = handler()
+                if asyncio.iscoroutine(result): result = await result
+                status, body = "200 OK", result or {"ok": True}
+        except Exception as e:
+            status, body = "500 Internal Server Error", {"error": str(e)}
+        payload = json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def start_control_server(handlers: Dict[str, Handler]) -> Optional[ControlServer]:
+    """按 LIEPIN_CONTROL_PORT 启动控制服务；未配置 (默认) 时返回 None，端口被占用时改用随机端口"""
+    if not CONTROL_PORT.strip() or CONTROL_PORT.strip().lower() == "off": return None
+    try:
+        return await ControlServer(handlers, port=int(CONTROL_PORT)).start()
+    except OSError:
+        return await ControlServer(handlers, port=0).start()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+候选人决策日志与漏斗报告
+main.py 每处理一个候选人写入一行 JSONL 到 decisions/<运行时间>.jsonl：
+简历标识、公司、关键词、页码、最终结果 (原因)、到达的阶段与耗时
+
+汇总报告 (按公司/关键词统计各筛选条件淘汰数量、打开简历的合格率、每个合格候选人的耗时):
+    python decisions.py [decisions/*.jsonl ...] [--by company|keyword|both]
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DECISION_DIR = "decisions"
+
+# 筛选阶段 (按 main.py 中的执行顺序)
+DECISION_STAGES = ["open", "negative_cache", "login_date", "departure", "company", "dedup", "shared", "ai", "save", "qualified"]
+STAGE_LABELS = {
+    "open": "打开简历", "negative_cache": "负缓存", "login_date": "登录时间", "departure": "离职时间",
+    "company": "公司名称", "dedup": "查重", "shared": "共享查重", "ai": "AI 判断", "save": "保存", "qualified": "合格",
+}
+# 结果原因 -> 所在阶段
+REASON_STAGES = {
+    "error": "open",
+    "negative_cache": "negative_cache",
+    "login_date": "login_date", "login_unparsed": "login_date",
+    "departure": "departure", "work_time_unparsed": "departure",
+    "company": "company",
+    "duplicate": "dedup", "ai_no_cached": "dedup",
+    "shared_conflict": "shared",
+    "ai_error": "ai", "ai_no": "ai",
+    "save_failed": "save",
+    "qualified": "qualified",
+}
+REASON_LABELS = {
+    "error": "处理出错", "negative_cache": "负缓存跳过",
+    "login_date": "登录时间不符", "login_unparsed": "无法提取登录时间",
+    "departure": "离职时间不符", "work_time_unparsed": "无法提取工作时间",
+    "company": "公司名称不符", "duplicate": "重复候选人", "ai_no_cached": "AI 不匹配 (缓存)",
+    "shared_conflict": "其他实例处理中", "ai_error": "AI API 失败", "ai_no": "AI 判断不匹配",
+    "save_failed": "保存失败", "qualified": "合格",
+}
+
+
+class DecisionLog:
+    """只追加的决策日志 (不需要 fsync，丢失最后几行不影响数据)"""
+
+    def __init__(self, decision_dir: str = DECISION_DIR, run_id: Optional[str] = None):
+        os.makedirs(decision_dir, exist_ok=True)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(decision_dir, f"{self.run_id}.jsonl")
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def log(self, reason: str, **fields):
+        record = {"ts": datetime.now().isoformat(timespec="seconds"), "run_id": self.run_id,
+                  "reason": reason, "stage": REASON_STAGES.get(reason, "open"), **fields}
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_decisions(paths: Iterable[str]) -> List[Dict]:
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try: records.append(json.loads(line))
+                except ValueError: continue
+    return records
+
+
+def aggregate(records: List[Dict], group_by: List[str]) -> Dict[tuple, Dict]:
+    """按 group_by 字段分组: 打开数、各原因数、各阶段到达数、合格数、总耗时"""
+    groups: Dict[tuple, Dict] = {}
+    for record in records:
+        key = tuple(record.get(field) or "-" for field in group_by)
+        group = groups.setdefault(key, {"opened": 0, "qualified": 0, "elapsed_ms": 0.0,
+                                        "reasons": {}, "reached": {stage: 0 for stage in DECISION_STAGES}})
+        group["opened"] += 1
+        group["elapsed_ms"] += record.get("elapsed_ms") or 0
+        reason = record.get("reason", "error")
+        group["reasons"][reason] = group["reasons"].get(reason, 0) + 1
+        if reason == "qualified": group["qualified"] += 1
+        depth = DECISION_STAGES.index(REASON_STAGES.get(reason, "open"))
+        for stage in DECISION_STAGES[:depth + 1]:
+            group["reached"][stage] += 1
+    return groups
+
+
+def dropped_at(group: Dict, stage: str) -> int:
+    return sum(n for r, n in group["reasons"].items() if REASON_STAGES.get(r, "open") == stage and r != "qualified")
+
+
+def print_report(records: List[Dict], group_by: List[str]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    groups = aggregate(records, group_by)
+    # 每个阶段一列 (该阶段淘汰的数量)，细分原因见整体漏斗
+    stages = [st for st in DECISION_STAGES if st != "qualified" and any(dropped_at(g, st) for g in groups.values())]
+
+    table = Table(title=f"候选人漏斗 ({len(records)} 份简历)")
+    for field in group_by:
+        table.add_column({"company": "公司", "keyword": "关键词"}[field], style="cyan")
+    table.add_column("打开", justify="right")
+    for stage in stages:
+        table.add_column(STAGE_LABELS[stage] if stage != "open" else "出错", justify="right", style="yellow")
+    table.add_column("合格", justify="right", style="green")
+    table.add_column("合格率", justify="right")
+    table.add_column("每个合格耗时", justify="right")
+    for key, group in sorted(groups.items(), key=lambda item: -item[1]["opened"]):
+        per_qualified = f"{group['elapsed_ms'] / group['qualified'] / 1000:.0f} s" if group["qualified"] else "-"
+        table.add_row(*[str(k) for k in key], str(group["opened"]),
+                      *[str(dropped_at(group, st)) for st in stages],
+                      str(group["qualified"]), f"{group['qualified'] / group['opened']:.1%}", per_qualified)
+    console.print(table)
+
+    # 整体漏斗: 每个阶段到达数与该阶段淘汰数，便于调整筛选顺序
+    total = aggregate(records, [])[()] if records else None
+    if not total: return
+    funnel = Table(title="整体漏斗")
+    funnel.add_column("阶段", style="cyan")
+    funnel.add_column("到达", justify="right")
+    funnel.add_column("淘汰", justify="right", style="yellow")
+    funnel.add_column("淘汰占比", justify="right")
+    funnel.add_column("原因", style="dim")
+    for stage in DECISION_STAGES:
+        reached = total["reached"][stage]
+        if not reached: continue
+        dropped = dropped_at(total, stage)
+        detail = ", ".join(f"{REASON_LABELS[r]} {n}" for r, n in total["reasons"].items()
+                           if REASON_STAGES.get(r) == stage and r != "qualified")
+        funnel.add_row(STAGE_LABELS[stage], str(reached), str(dropped), f"{dropped / reached:.1%}", detail)
+    console.print(funnel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总候选人决策日志，输出筛选漏斗与关键词产出")
+    parser.add_argument("files", nargs="*", help=f"决策日志 (默认: {DECISION_DIR}/*.jsonl)")
+    parser.add_argument("--by", choices=["company", "keyword", "both"], default="both", help="分组方式")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(DECISION_DIR, "*.jsonl")))
+    if not files:
+        print("没有找到决策日志")
+        sys.exit(1)
+    group_by = ["company", "keyword"] if args.by == "both" else [args.by]
+    print_report(read_decisions(files), group_by)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@
 
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
@@ -14,10 +16,14 @@ from rich.table import Table
 from rich.panel import Panel
 import sys
 import re
+import time
 import shutil
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+from history_compact import archive_by_rename, compact_history, AUTO_COMPACT
+
 # pyperclip 是可选依赖，仅在使用剪贴板功能时需要
 try:
     import pyperclip
@@ -27,6 +33,14 @@ except ImportError:
 
 console = Console()
 
+# 预编译的解析规则 (大文件逐行调用，避免每行重新查找正则缓存)
+MULTI_SPACE_RE = re.compile(r'\s{2,}')
+DIGIT_RE = re.compile(r'\d')
+# 流式读取时每批读取的字节数
+STREAM_CHUNK_BYTES = 1 << 20
+# 解析报告中展示的无法解析行数
+REJECTED_SAMPLE_SIZE = 5
+
 
 def parse_candidate_line(line):
     """
@@ -42,7 +56,7 @@ def parse_candidate_line(line):
     parts = line.split('\t')
     if len(parts) < 3:
         # 尝试按多个空格分隔
-        parts = re.split(r'\s{2,}', line)
+        parts = MULTI_SPACE_RE.split(line)
     if len(parts) < 3:
         # 尝试按单个空格分隔
         parts = line.split()
@@ -117,111 +131,251 @@ def read_from_input():
     return '\n'.join(lines) if lines else None
 
 
-def parse_content(content):
-    """解析内容为候选人列表"""
-    lines = content.strip().split('\n')
-    candidates = []
+class ParseStats:
+    """流式解析统计: 行数、候选人数、无法解析的行 (保留前几条样例)"""
+    
+    def __init__(self):
+        self.lines = 0
+        self.candidates = 0
+        self.categories = 0
+        self.rejected = 0
+        self.rejected_samples = []
+        self.started = time.perf_counter()
+    
+    def reject(self, line_no, line):
+        self.rejected += 1
+        if len(self.rejected_samples) < REJECTED_SAMPLE_SIZE:
+            self.rejected_samples.append((line_no, line))
+    
+    def lines_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.lines / elapsed if elapsed > 0 else 0.0
+
+
+def iter_file_lines(filepath, chunk_bytes=STREAM_CHUNK_BYTES):
+    """按批读取文本文件并逐行产出，内存占用与文件大小无关"""
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.readlines(chunk_bytes)
+            if not chunk:
+                break
+            yield from chunk
+
+
+def iter_candidates(lines, stats=None):
+    """逐行解析候选人 (生成器)，分类行之后的候选人归入该分类"""
     current_category = None
     
-    for line in lines:
+    for line_no, line in enumerate(lines, 1):
         line = line.strip()
+        if stats:
+            stats.lines = line_no
         if not line:
             continue
         
         # 检查是否是分类行（只有一个词，且不包含数字）
-        if len(line.split()) == 1 and not any(char.isdigit() for char in line):
+        if len(line.split()) == 1 and not DIGIT_RE.search(line):
             current_category = line
+            if stats:
+                stats.categories += 1
             continue
         
         # 解析候选人数据
         candidate = parse_candidate_line(line)
-        if candidate:
-            # 如果有分类，添加到候选人数据中
-            if current_category:
-                candidate["分类"] = current_category
-            candidates.append(candidate)
+        if not candidate:
+            if stats:
+                stats.reject(line_no, line)
+            continue
+        # 如果有分类，添加到候选人数据中
+        if current_category:
+            candidate["分类"] = current_category
+        if stats:
+            stats.candidates += 1
+        yield candidate
+
+
+def parse_content(content):
+    """解析内容为候选人列表"""
+    return list(iter_candidates(content.strip().split('\n')))
+
+
+def import_to_history(candidates, source):
+    """将候选人的查重签名直接写入 main.py 的历史查重索引 (不生成 Excel)，返回导入条数"""
+    from signatures import build_candidate_signature, SIGNATURE_VERSION
+    from history_index import HistoryIndex
+    
+    signatures = (build_candidate_signature(c["姓名"], c["职位"], c["在职时间"]) for c in candidates)
+    with HistoryIndex(signature_version=SIGNATURE_VERSION) as index:
+        return index.import_signatures(source, signatures)
+
+
+def display_parse_report(stats):
+    """显示流式解析报告"""
+    elapsed = time.perf_counter() - stats.started
+    table = Table(title="📊 解析报告")
+    table.add_column("项目", style="cyan")
+    table.add_column("值", style="magenta", justify="right")
+    table.add_row("总行数", str(stats.lines))
+    table.add_row("候选人", str(stats.candidates))
+    table.add_row("分类行", str(stats.categories))
+    table.add_row("无法解析", str(stats.rejected))
+    table.add_row("耗时", f"{elapsed:.2f} s")
+    table.add_row("速度", f"{stats.lines_per_second():,.0f} 行/秒")
+    console.print(table)
+    if stats.rejected_samples:
+        console.print("[yellow]无法解析的行 (示例):[/yellow]")
+        for line_no, line in stats.rejected_samples:
+            console.print(f"  [dim]第 {line_no} 行:[/dim] {line[:80]}")
+
+
+def stream_file(filepath, output_path=None, to_history=False, category_name=None):
+    """
+    大文件流式处理: 边读边解析边写出，不在内存中保存全部候选人
+    to_history=True 时直接写入历史查重索引，否则写出 Excel 到 output_path
+    """
+    if not Path(filepath).exists():
+        console.print(f"[red]✗ 文件不存在: {filepath}[/red]")
+        return False
+    
+    stats = ParseStats()
+    candidates = iter_candidates(iter_file_lines(filepath), stats)
+    with console.status(f"[cyan]正在流式处理: {filepath}[/cyan]"):
+        if to_history:
+            count = import_to_history(candidates, Path(filepath).name)
+            ok = count > 0
+        else:
+            ok = create_excel(candidates, output_path, category_name)
+    display_parse_report(stats)
     
-    return candidates
+    if not ok:
+        console.print("[red]✗ 未能解析出有效的候选人数据[/red]")
+    elif to_history:
+        console.print(f"[bold green]✅ 已将 {count} 条签名写入历史查重索引[/bold green]")
+    else:
+        console.print(f"[bold green]✅ Excel 文件创建成功: {output_path}[/bold green]")
+    return ok
+
+
+EXCEL_COLUMNS = ["序号", "分类", "公司", "姓名", "在职公司", "职位", "云号码", "在职时间",
+                 "Profile", "简历链接", "是否合作", "最后一次登录时间"]
+EXCEL_COLUMN_WIDTHS = [8, 12, 12, 15, 25, 25, 18, 18, 40, 15, 12, 20]
+HEADER_STYLE_NAME = "查重表头"
+BODY_STYLE_NAME = "查重正文"
+
+
+def _register_styles(wb):
+    """注册共享的命名样式 (每个单元格只引用样式名，不再各自创建 Font/Alignment 对象)"""
+    wb.add_named_style(NamedStyle(
+        name=HEADER_STYLE_NAME,
+        font=Font(bold=True, size=11),
+        fill=PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center"),
+    ))
+    wb.add_named_style(NamedStyle(name=BODY_STYLE_NAME, alignment=Alignment(horizontal="left", vertical="center")))
+
+
+def _candidate_row(candidate, category_name):
+    """候选人字典 -> 按 EXCEL_COLUMNS 排列的一行 (不含序号)"""
+    category = candidate.get("分类") or category_name or candidate.get("在职公司", "未分类")
+    candidate["分类"] = category
+    return (category, category, candidate.get("姓名", ""), candidate.get("在职公司", ""),
+            candidate.get("职位", ""), candidate.get("云号码", ""), candidate.get("在职时间", ""),
+            "", "", "", "")
 
 
 def create_excel(candidates, output_path, category_name=None):
-    """创建 Excel 文件"""
-    if not candidates:
+    """
+    创建 Excel 文件
+    使用 openpyxl 只写 (流式) 模式逐行写出，内存占用不随行数增长；candidates 可以是列表或生成器
+    """
+    if isinstance(candidates, list) and not candidates:
         console.print("[red]✗ 没有有效的候选人数据[/red]")
         return False
     
-    # 确保所有候选人都有分类
-    for candidate in candidates:
-        if "分类" not in candidate or not candidate["分类"]:
-            if category_name:
-                candidate["分类"] = category_name
-            else:
-                # 尝试从公司名推断分类
-                candidate["分类"] = candidate.get("在职公司", "未分类")
-    
-    # 创建 DataFrame
-    df = pd.DataFrame(candidates)
-    
-    # 添加序号
-    df.insert(0, "序号", range(1, len(df) + 1))
-    
-    # 添加公司列（与分类相同，用于查重）
-    df["公司"] = df["分类"]
-    
-    # 添加空列
-    df["Profile"] = ""
-    df["简历链接"] = ""
-    df["是否合作"] = ""
-    df["最后一次登录时间"] = ""
-    
-    # 重新排列列顺序
-    df = df[["序号", "分类", "公司", "姓名", "在职公司", "职位", "云号码", "在职时间", 
-             "Profile", "简历链接", "是否合作", "最后一次登录时间"]]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("查重数据")
+    _register_styles(wb)
+    for idx, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    
+    header = []
+    for name in EXCEL_COLUMNS:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.style = HEADER_STYLE_NAME
+        header.append(cell)
+    ws.append(header)
+    
+    # 只写模式下 append 会立即序列化，同一组带样式的单元格可以逐行复用
+    body = [WriteOnlyCell(ws) for _ in EXCEL_COLUMNS]
+    for cell in body:
+        cell.style = BODY_STYLE_NAME
+    
+    count = 0
+    for count, candidate in enumerate(candidates, 1):
+        for cell, value in zip(body, (count,) + _candidate_row(candidate, category_name)):
+            cell.value = value
+        ws.append(body)
+    
+    if not count:
+        console.print("[red]✗ 没有有效的候选人数据[/red]")
+        return False
     
-    # 创建 Excel 文件
+    # 保存文件
+    try:
+        wb.save(output_path)
+        return True
+    except Exception as e:
+        console.print(f"[red]✗ 保存文件失败: {e}[/red]")
+        return False
+
+
+def _create_excel_cellwise(candidates, output_path, category_name=None):
+    """旧的逐单元格写法 (DataFrame + ws.cell)，仅用于 --bench-excel 对比"""
+    rows = [(idx,) + _candidate_row(c, category_name) for idx, c in enumerate(candidates, 1)]
+    df = pd.DataFrame(rows, columns=EXCEL_COLUMNS)
     wb = Workbook()
     ws = wb.active
     ws.title = "查重数据"
-    
-    # 写入数据
     for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
         for c_idx, value in enumerate(row, 1):
             cell = ws.cell(row=r_idx, column=c_idx, value=value)
-            
-            # 表头格式
             if r_idx == 1:
                 cell.font = Font(bold=True, size=11)
                 cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
                 cell.alignment = Alignment(horizontal="center", vertical="center")
             else:
                 cell.alignment = Alignment(horizontal="left", vertical="center")
-    
-    # 调整列宽
-    column_widths = {
-        "A": 8,   # 序号
-        "B": 12,  # 分类
-        "C": 12,  # 公司
-        "D": 15,  # 姓名
-        "E": 25,  # 在职公司
-        "F": 25,  # 职位
-        "G": 18,  # 云号码
-        "H": 18,  # 在职时间
-        "I": 40,  # Profile
-        "J": 15,  # 简历链接
-        "K": 12,  # 是否合作
-        "L": 20,  # 最后一次登录时间
-    }
-    
-    for col, width in column_widths.items():
-        ws.column_dimensions[col].width = width
-    
-    # 保存文件
-    try:
-        wb.save(output_path)
-        return True
-    except Exception as e:
-        console.print(f"[red]✗ 保存文件失败: {e}[/red]")
-        return False
+    for idx, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    wb.save(output_path)
+    return True
+
+
+def benchmark_create_excel(rows=100000):
+    """比较流式写入与旧的逐单元格写入的耗时和峰值内存"""
+    import tempfile
+    import time
+    import tracemalloc
+    
+    def synthetic():
+        for i in range(rows):
+            yield {"分类": "上游", "姓名": f"张{i}", "在职公司": "示例科技有限公司",
+                   "职位": "高级产品经理", "云号码": "", "在职时间": "21/3-Present"}
+    
+    table = Table(title=f"Excel 写入对比 ({rows} 行)")
+    table.add_column("方式", style="cyan")
+    table.add_column("耗时", justify="right")
+    table.add_column("峰值内存", justify="right")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, func in (("流式 (write-only)", create_excel), ("逐单元格 (旧)", _create_excel_cellwise)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            func(synthetic(), Path(tmp) / "bench.xlsx")
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            table.add_row(label, f"{elapsed:.2f} s", f"{peak / 1024 / 1024:.1f} MB")
+    console.print(table)
 
 
 def display_preview(candidates):
@@ -283,20 +437,20 @@ def archive_output_directories():
     console.print(f"\n[yellow]--- 正在归档旧文件到 {archive_name}... ---[/yellow]")
     
     for directory in dirs_to_archive:
-        dir_path = Path(directory)
-        if not dir_path.exists():
-            continue
-        archive_path = dir_path / archive_name
-        archive_path.mkdir(exist_ok=True)
-        
         try:
-            for item in dir_path.iterdir():
-                if item.name == archive_name:
-                    continue
-                shutil.move(str(item), str(archive_path / item.name))
-            console.print(f"[green]--- 已归档 {directory}/ 内容 ---[/green]")
+            # 整体重命名目录，不再逐个移动文件
+            if archive_by_rename(directory, archive_name):
+                console.print(f"[green]--- 已归档 {directory}/ 内容 ---[/green]")
         except Exception as e:
             console.print(f"[red]--- 归档 {directory}/ 失败: {e} ---[/red]")
+    
+    if AUTO_COMPACT:
+        try:
+            stats = compact_history("data")
+            if stats["archives"]:
+                console.print(f"[green]--- 已将 {stats['archives']} 个归档压缩进 data/history.parquet (新增 {stats['rows_added']} 条，共 {stats['rows_total']} 条) ---[/green]")
+        except Exception as e:
+            console.print(f"[red]--- 压缩历史归档失败: {e} ---[/red]")
     console.print("[green]--- 归档完成 ---[/green]\n")
 
 
@@ -319,11 +473,25 @@ def main():
     console.print("  [cyan]1[/cyan] - 从剪贴板读取")
     console.print("  [cyan]2[/cyan] - 从文本文件读取")
     console.print("  [cyan]3[/cyan] - 交互式输入")
+    console.print("  [cyan]4[/cyan] - 大文件流式处理 (不预览，直接生成 Excel 或写入历史查重索引)")
     
-    choice = Prompt.ask("请选择", choices=["1", "2", "3"], default="1")
+    choice = Prompt.ask("请选择", choices=["1", "2", "3", "4"], default="1")
     
     content = None
-    if choice == "1":
+    if choice == "4":
+        filepath = Prompt.ask("\n请输入文件路径")
+        if Confirm.ask("是否直接写入 main.py 的历史查重索引? (y=写入索引, n=生成 Excel)", default=False):
+            ok = stream_file(filepath, to_history=True)
+        else:
+            category_name = Prompt.ask("请输入分类名称 (可选，直接回车跳过)", default="")
+            filename = Prompt.ask("请输入输出文件名", default=f"{Path(filepath).stem}-查重数据.xlsx")
+            if not filename.endswith('.xlsx'):
+                filename += '.xlsx'
+            output_dir = Path("./data")
+            output_dir.mkdir(exist_ok=True)
+            ok = stream_file(filepath, output_dir / filename, category_name=category_name or None)
+        sys.exit(0 if ok else 1)
+    elif choice == "1":
         console.print("\n[cyan]📋 正在从剪贴板读取数据...[/cyan]")
         content = read_from_clipboard()
     elif choice == "2":
@@ -398,7 +566,27 @@ def main():
         sys.exit(1)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="猎聘查重数据生成工具 (不带参数时进入交互模式)")
+    parser.add_argument("--stream", metavar="FILE", help="流式处理大文本文件 (不做预览)")
+    parser.add_argument("--to-history", action="store_true", help="与 --stream 一起使用: 直接写入 main.py 的历史查重索引，不生成 Excel")
+    parser.add_argument("-o", "--output", help="与 --stream 一起使用: 输出 Excel 路径 (默认: data/<文件名>-查重数据.xlsx)")
+    parser.add_argument("--category", default=None, help="没有分类行时使用的分类名称")
+    parser.add_argument("--bench-excel", type=int, nargs="?", const=100000, metavar="ROWS", help="比较 Excel 写入方式的耗时")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.bench_excel:
+        benchmark_create_excel(args.bench_excel)
+        sys.exit(0)
+    if args.stream:
+        output = args.output
+        if not output and not args.to_history:
+            Path("./data").mkdir(exist_ok=True)
+            output = str(Path("./data") / f"{Path(args.stream).stem}-查重数据.xlsx")
+        sys.exit(0 if stream_file(args.stream, output, args.to_history, args.category) else 1)
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,178 @@
+"""
+事件循环诊断
+- 事件循环延迟检测 (LIEPIN_DIAGNOSTICS=1 或 python main.py --diagnostics):
+  循环内的定时任务测量调度延迟；看门狗线程发现循环超过 LIEPIN_BLOCK_THRESHOLD_MS (默认 200ms)
+  没有响应时，抓取事件循环线程的调用栈写入 diagnostics/blocks_<时间>.log
+- 采样分析 (LIEPIN_PROFILE=1 或 python main.py --profile):
+  后台线程按 LIEPIN_PROFILE_INTERVAL_MS (默认 10ms) 采样事件循环线程的调用栈，
+  输出折叠栈格式 diagnostics/profile_<时间>.folded (可直接用 flamegraph.pl / speedscope 打开)
+均未开启时不创建任何任务或线程
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DIAGNOSTICS_DIR = "diagnostics"
+SETTINGS = {
+    "diagnostics": os.getenv("LIEPIN_DIAGNOSTICS", "").lower() in ("1", "true", "yes", "y"),
+    "profile": os.getenv("LIEPIN_PROFILE", "").lower() in ("1", "true", "yes", "y"),
+    "block_threshold_ms": float(os.getenv("LIEPIN_BLOCK_THRESHOLD_MS", "200")),
+    "profile_interval_ms": float(os.getenv("LIEPIN_PROFILE_INTERVAL_MS", "10")),
+}
+
+
+def configure(**options):
+    """命令行参数覆盖环境变量设置"""
+    SETTINGS.update({k: v for k, v in options.items() if v is not None})
+
+
+def _frame_stack(frame) -> List[str]:
+    """从根到叶的 '文件名:函数名' 列表"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class LoopMonitor:
+    """测量事件循环调度延迟，并在循环阻塞时记录调用栈"""
+
+    def __init__(self, threshold_ms: float, log_path: str, interval: float = 0.05):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.log_path = log_path
+        self.lags_ms: List[float] = []
+        self.blocks: List[float] = []
+        self._heartbeat = time.perf_counter()
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread.start()
+
+    async def _tick(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self.lags_ms.append(max(0.0, now - expected) * 1000)
+            self._heartbeat = now
+
+    def _watchdog(self):
+        blocked_stack = None
+        blocked_since = None
+        while not self._stop.wait(self.threshold / 4):
+            stalled = time.perf_counter() - self._heartbeat
+            if stalled > self.threshold + self.interval:
+                if blocked_stack is None:
+                    frame = sys._current_frames().get(self._loop_thread)
+                    blocked_stack = traceback.format_stack(frame) if frame else []
+                    blocked_since = self._heartbeat
+            elif blocked_stack is not None:
+                # 循环恢复: 记录本次阻塞的总时长与阻塞时的调用栈
+                duration = self._heartbeat - blocked_since - self.interval
+                self.blocks.append(duration * 1000)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(f"[{datetime.now():%H:%M:%S}] 事件循环阻塞 {duration * 1000:.0f} ms\n")
+                    f.writelines(blocked_stack)
+                    f.write("\n")
+                blocked_stack = None
+
+    def stop(self):
+        self._stop.set()
+        if self._task: self._task.cancel()
+        self._thread.join()
+
+
+class SamplingProfiler:
+    """定时采样目标线程的调用栈，汇总为折叠栈 (stack;frames count)"""
+
+    def __init__(self, interval_ms: float, thread_id: Optional[int] = None):
+        self.interval = interval_ms / 1000
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None: continue
+            key = ";".join(_frame_stack(frame))
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 10) -> List[tuple]:
+        """按自身采样数 (栈顶) 排序的函数"""
+        totals: Dict[str, int] = {}
+        for stack, count in self.samples.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            totals[leaf] = totals.get(leaf, 0) + count
+        return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+
+class DiagnosticsSession:
+    """一次运行的诊断会话，需在事件循环中 start()"""
+
+    def __init__(self, diagnostics: bool, profile: bool):
+        os.makedirs(DIAGNOSTICS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.block_log = os.path.join(DIAGNOSTICS_DIR, f"blocks_{stamp}.log")
+        self.profile_path = os.path.join(DIAGNOSTICS_DIR, f"profile_{stamp}.folded")
+        self.monitor = LoopMonitor(SETTINGS["block_threshold_ms"], self.block_log) if diagnostics else None
+        self.profiler = SamplingProfiler(SETTINGS["profile_interval_ms"]) if profile else None
+
+    def start(self):
+        if self.monitor: self.monitor.start()
+        if self.profiler: self.profiler.start()
+        return self
+
+    def stop(self) -> Dict:
+        """停止并返回汇总: 延迟分位数、阻塞次数、输出文件"""
+        summary: Dict = {}
+        if self.monitor:
+            self.monitor.stop()
+            lags = sorted(self.monitor.lags_ms)
+            if lags:
+                summary["lag_p50"] = lags[len(lags) // 2]
+                summary["lag_p99"] = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+                summary["lag_max"] = lags[-1]
+            summary["blocks"] = len(self.monitor.blocks)
+            summary["block_max"] = max(self.monitor.blocks, default=0)
+            summary["block_log"] = self.block_log if self.monitor.blocks else None
+        if self.profiler:
+            self.profiler.stop()
+            self.profiler.write_folded(self.profile_path)
+            summary["profile"] = self.profile_path
+            summary["profile_samples"] = sum(self.profiler.samples.values())
+            summary["profile_top"] = self.profiler.top_functions()
+        return summary
+
+
+def start_diagnostics() -> Optional[DiagnosticsSession]:
+    """按当前设置启动诊断；都未开启时返回 None"""
+    if not (SETTINGS["diagnostics"] or SETTINGS["profile"]): return None
+    return DiagnosticsSession(SETTINGS["diagnostics"], SETTINGS["profile"]).start()
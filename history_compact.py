@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+历史数据压缩 (Compaction)
+将 data/archive_* 中归档的 Excel 合并为一个去重后的列式历史文件 data/history.parquet
+(附带来源列)，原始归档打包转入冷存储 data/cold/，之后启动只需读取一个文件
+
+    python history_compact.py [--data data] [--cold-mode zip|move]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+from datetime import datetime
+from typing import Dict, List, TYPE_CHECKING
+
+from signatures import history_signatures_from_frame
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+HISTORY_STORE_NAME = "history.parquet"
+COLD_DIR_NAME = "cold"
+ARCHIVE_PREFIX = "archive_"
+PROVENANCE_COLUMNS = ["来源归档", "来源文件", "压缩时间"]
+COLD_MODES = ("zip", "move")
+# 归档后是否自动压缩 (main.py / dedup.py 启动时的归档步骤)
+AUTO_COMPACT = os.getenv("LIEPIN_AUTO_COMPACT", "").lower() in ("1", "true", "yes", "y")
+
+def _is_reserved(name: str) -> bool:
+    """归档时保留在原位的条目: 已有的归档目录、冷存储、历史文件"""
+    return name.startswith(ARCHIVE_PREFIX) or name in (HISTORY_STORE_NAME, COLD_DIR_NAME)
+
+
+def archive_by_rename(directory: str, archive_name: str) -> bool:
+    """
+    通过重命名整个目录完成归档 (不逐个移动文件):
+    directory -> 临时名 -> 新建空 directory，移回保留条目 -> 临时目录改名为 directory/archive_name
+    任何一步失败都按相反顺序撤销已完成的步骤，恢复原来的 directory 后再抛出异常
+    没有需要归档的内容时返回 False
+    """
+    if not os.path.isdir(directory): return False
+    entries = os.listdir(directory)
+    keep = [name for name in entries if _is_reserved(name)]
+    if len(keep) == len(entries): return False
+
+    staging = f"{os.path.normpath(directory)}.{archive_name}.tmp"
+    undo = []  # 已完成步骤的撤销操作
+    try:
+        os.rename(directory, staging)
+        undo.append(lambda: os.rename(staging, directory))
+        os.makedirs(directory)
+        undo.append(lambda: os.rmdir(directory))
+        for name in keep:
+            src, dst = os.path.join(staging, name), os.path.join(directory, name)
+            os.rename(src, dst)
+            undo.append(lambda src=src, dst=dst: os.rename(dst, src))
+        os.rename(staging, os.path.join(directory, archive_name))
+    except BaseException as e:
+        for step in reversed(undo):
+            try:
+                step()
+            except OSError as undo_error:
+                raise RuntimeError(f"归档失败 ({e})，且无法自动恢复 ({undo_error})；"
+                                   f"请手动把 {staging} 中的内容移回 {directory}") from e
+        raise
+    return True
+
+
+def _read_archive(archive_dir: str, compacted_at: str) -> List["pd.DataFrame"]:
+    import pandas as pd
+    frames = []
+    for root, _, names in os.walk(archive_dir):
+        for name in sorted(names):
+            if not name.endswith(".xlsx") or name.startswith("~$"): continue
+            path = os.path.join(root, name)
+            df = pd.read_excel(path, dtype=str, engine='openpyxl')
+            if df.empty: continue
+            df["来源归档"] = os.path.basename(archive_dir)
+            df["来源文件"] = os.path.relpath(path, archive_dir)
+            df["压缩时间"] = compacted_at
+            frames.append(df)
+    return frames
+
+
+def _to_cold_storage(archive_dir: str, cold_dir: str, mode: str) -> str:
+    os.makedirs(cold_dir, exist_ok=True)
+    target = os.path.join(cold_dir, os.path.basename(archive_dir))
+    if mode == "move":
+        os.rename(archive_dir, target)
+        return target
+    archive = shutil.make_archive(target, "zip", archive_dir)
+    shutil.rmtree(archive_dir)
+    return archive
+
+
+def compact_history(data_dir: str = "data", cold_mode: str = "zip") -> Dict[str, int]:
+    """
+    合并 data_dir 下全部 archive_* 中的 Excel 到 history.parquet (按查重签名去重，保留最早的记录)，
+    然后把这些归档转入冷存储；返回统计信息
+    去重只使用与实时查重相同的签名 (signatures.history_signatures_from_frame)，不同候选人不会被合并
+    """
+    import pandas as pd
+
+    if cold_mode not in COLD_MODES:
+        raise ValueError(f"cold_mode 可选: {'/'.join(COLD_MODES)}")
+    stats = {"archives": 0, "files": 0, "rows_in": 0, "rows_added": 0, "rows_total": 0}
+    if not os.path.isdir(data_dir): return stats
+    archives = sorted(os.path.join(data_dir, name) for name in os.listdir(data_dir)
+                      if name.startswith(ARCHIVE_PREFIX) and os.path.isdir(os.path.join(data_dir, name)))
+    if not archives: return stats
+
+    store_path = os.path.join(data_dir, HISTORY_STORE_NAME)
+    existing = pd.read_parquet(store_path) if os.path.exists(store_path) else None
+    compacted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    frames = []
+    for archive_dir in archives:
+        archive_frames = [df for df in _read_archive(archive_dir, compacted_at) if history_signatures_from_frame(df)]
+        stats["files"] += len(archive_frames)
+        stats["rows_in"] += sum(len(df) for df in archive_frames)
+        frames.extend(archive_frames)
+    stats["archives"] = len(archives)
+
+    if frames:
+        base = [existing] if existing is not None else []
+        combined = pd.concat(base + frames, ignore_index=True).astype(object)
+        combined = combined.where(combined.notna(), None)
+        # 已有记录在前，归档按时间顺序排列，重复时保留最早的一条
+        keys = pd.Series(["\x1f".join(sig) for sig in history_signatures_from_frame(combined)], index=combined.index)
+        combined = combined[~keys.duplicated()]
+        ordered = [c for c in combined.columns if c not in PROVENANCE_COLUMNS] + PROVENANCE_COLUMNS
+        combined = combined[ordered]
+        tmp_path = store_path + ".tmp"
+        combined.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, store_path)
+        stats["rows_total"] = len(combined)
+        stats["rows_added"] = len(combined) - (len(existing) if existing is not None else 0)
+    else:
+        stats["rows_total"] = len(existing) if existing is not None else 0
+
+    # 合并文件写入成功后才移走原始归档
+    cold_dir = os.path.join(data_dir, COLD_DIR_NAME)
+    for archive_dir in archives:
+        _to_cold_storage(archive_dir, cold_dir, cold_mode)
+    return stats
+
+
+def main():
+    from rich.console import Console
+    console = Console()
+
+    parser = argparse.ArgumentParser(description="将归档的历史 Excel 合并为去重后的 history.parquet，并把原始归档转入冷存储")
+    parser.add_argument("--data", default="data", help="数据目录 (默认: data)")
+    parser.add_argument("--cold-mode", choices=COLD_MODES, default="zip", help="原始归档处理方式: zip=打包后删除 / move=整体移动")
+    args = parser.parse_args()
+
+    try:
+        stats = compact_history(args.data, args.cold_mode)
+    except Exception as e:
+        console.print(f"[red]✗ 压缩失败: {e}[/red]")
+        sys.exit(1)
+    if not stats["archives"]:
+        console.print("[dim]没有需要压缩的归档[/dim]")
+        return
+    console.print(f"[green]已压缩 {stats['archives']} 个归档 ({stats['files']} 个文件, {stats['rows_in']} 行)，"
+                  f"新增 {stats['rows_added']} 条，历史文件共 {stats['rows_total']} 条: "
+                  f"{os.path.join(args.data, HISTORY_STORE_NAME)}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+历史查重索引
+将 data/ (含 archive_* 子目录) 下每个 Excel 的查重签名持久化到 SQLite，
+记录文件路径、大小和修改时间，启动时只重新读取新增或发生变化的文件
+"""
+
+import os
+import time
+import difflib
+import hashlib
+import sqlite3
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from history_compact import COLD_DIR_NAME
+
+Signature = Tuple[str, str, str]
+
+HISTORY_INDEX_PATH = os.getenv("LIEPIN_HISTORY_INDEX", os.path.join(".cache", "history.sqlite3"))
+# 需要读取的文件数达到该值时才启用进程池 (子进程启动本身有开销)
+PARALLEL_MIN_FILES = 4
+# 历史签名达到该数量时改用紧凑哈希存储 (SignatureStore)
+COMPACT_DEDUP_THRESHOLD = int(os.getenv("LIEPIN_COMPACT_DEDUP_THRESHOLD", "200000"))
+SIGNATURE_STORE_PATH = os.getenv("LIEPIN_SIGNATURE_STORE", os.path.join(".cache", "history.sig"))
+# 职位模糊匹配阈值 (0~1)，为空时只做精确匹配
+FUZZY_TITLE_THRESHOLD = float(os.getenv("LIEPIN_FUZZY_TITLE_THRESHOLD") or 0) or None
+# 直接导入 (不对应 data/ 下文件) 的签名使用该路径前缀，sync 时不会被当作已删除文件清理
+IMPORT_PREFIX = "import:"
+
+
+# 历史 Excel 以及 history_compact.py 压缩后的列式历史文件
+HISTORY_EXTENSIONS = (".xlsx", ".parquet")
+
+
+def list_history_files(data_dir: str) -> Dict[str, Tuple[int, int]]:
+    """返回 {路径: (大小, 修改时间ns)}，跳过 Excel 临时文件"""
+    files = {}
+    for root, dirs, names in os.walk(data_dir):
+        # 冷存储中的原始归档已合并进 history.parquet
+        dirs[:] = [d for d in dirs if d != COLD_DIR_NAME]
+        for name in names:
+            if name.endswith(HISTORY_EXTENSIONS) and not name.startswith("~$"):
+                path = os.path.join(root, name)
+                try: st = os.stat(path)
+                except OSError: continue
+                files[path] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def _timed_read(reader: Callable[[str], Iterable[Signature]], path: str):
+    """进程池中执行: 读取一个文件并计时，异常作为结果返回"""
+    start = time.perf_counter()
+    try:
+        rows = list(reader(path))
+        return path, rows, time.perf_counter() - start, None
+    except Exception as e:
+        return path, None, time.perf_counter() - start, e
+
+
+def signature_hash(signature: Signature) -> int:
+    """签名的 64 位哈希 (blake2b)"""
+    data = "\x1f".join(signature).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class SignatureStore:
+    """
+    大规模查重历史的紧凑表示
+    - 主体为排序后的 uint64 哈希数组，保存为文件后以 mmap 只读打开，多个进程可共享同一份页缓存
+    - 可选 Bloom 过滤器在二分查找前快速排除绝大多数新候选人
+    - 运行中新增的签名放在内存集合中
+    接口与 set 保持一致 (in / add / len)，可直接替换 LiepinScraper.seen_candidates
+    """
+
+    def __init__(self, hashes: np.ndarray, bloom: Optional[np.ndarray] = None, bloom_hashes: int = 0):
+        self.hashes = hashes
+        self.bloom = bloom
+        self.bloom_hashes = bloom_hashes
+        self._extra: Set[int] = set()
+
+    # --- Build / Persist ---
+    @classmethod
+    def build(cls, signatures: Iterable[Signature], bloom_fp_rate: Optional[float] = 0.01) -> "SignatureStore":
+        hashes = np.unique(np.fromiter((signature_hash(sig) for sig in signatures), dtype=np.uint64))
+        bloom, k = cls._build_bloom(hashes, bloom_fp_rate) if bloom_fp_rate else (None, 0)
+        return cls(hashes, bloom, k)
+
+    @staticmethod
+    def _bloom_positions(h1: np.ndarray, h2: np.ndarray, k: int, m: int) -> List[np.ndarray]:
+        return [(h1 + np.uint64(i) * h2) % np.uint64(m) for i in range(k)]
+
+    @staticmethod
+    def _split_hash(hashes: np.ndarray):
+        return hashes & np.uint64(0xFFFFFFFF), (hashes >> np.uint64(32)) | np.uint64(1)
+
+    @classmethod
+    def _build_bloom(cls, hashes: np.ndarray, fp_rate: float):
+        n = max(len(hashes), 1)
+        m = int(-n * np.log(fp_rate) / (np.log(2) ** 2))
+        m = max(64, (m + 63) // 64 * 64)
+        k = max(1, int(round(m / n * np.log(2))))
+        bits = np.zeros(m // 8, dtype=np.uint8)
+        h1, h2 = cls._split_hash(hashes)
+        for pos in cls._bloom_positions(h1, h2, k, m):
+            np.bitwise_or.at(bits, (pos >> np.uint64(3)).astype(np.int64), (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+        return bits, k
+
+    def save(self, path: str = SIGNATURE_STORE_PATH):
+        """写出 <path>.u64 (哈希数组) 与 <path>.bloom (可选)，原子替换"""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        for suffix, array in (('.u64', self.hashes), ('.bloom', self.bloom)):
+            target = path + suffix
+            if array is None:
+                if os.path.exists(target): os.remove(target)
+                continue
+            tmp = target + '.tmp'
+            with open(tmp, 'wb') as f:
+                if suffix == '.bloom': f.write(np.uint64(self.bloom_hashes).tobytes())
+                f.write(np.ascontiguousarray(array).tobytes())
+            os.replace(tmp, target)
+
+    @classmethod
+    def open(cls, path: str = SIGNATURE_STORE_PATH) -> "SignatureStore":
+        """以只读 mmap 方式打开已保存的存储"""
+        hashes_path = path + '.u64'
+        if os.path.getsize(hashes_path) == 0:
+            hashes = np.zeros(0, dtype=np.uint64)
+        else:
+            hashes = np.memmap(hashes_path, dtype=np.uint64, mode='r')
+        bloom, k = None, 0
+        if os.path.exists(path + '.bloom'):
+            raw = np.memmap(path + '.bloom', dtype=np.uint8, mode='r')
+            k = int(np.frombuffer(raw[:8].tobytes(), dtype=np.uint64)[0])
+            bloom = raw[8:]
+        return cls(hashes, bloom, k)
+
+    # --- Set-like API ---
+    def _bloom_contains(self, h: int) -> bool:
+        m = len(self.bloom) * 8
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.bloom_hashes):
+            pos = (h1 + i * h2) % (1 << 64) % m
+            if not self.bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def _contains_hash(self, h: int) -> bool:
+        if h in self._extra: return True
+        if self.bloom is not None and not self._bloom_contains(h): return False
+        idx = int(np.searchsorted(self.hashes, np.uint64(h)))
+        return idx < len(self.hashes) and int(self.hashes[idx]) == h
+
+    def __contains__(self, signature: Signature) -> bool:
+        return self._contains_hash(signature_hash(signature))
+
+    def add(self, signature: Signature):
+        h = signature_hash(signature)
+        if not self._contains_hash(h):
+            self._extra.add(h)
+
+    def __len__(self) -> int:
+        return len(self.hashes) + len(self._extra)
+
+    # --- Diagnostics ---
+    def nbytes(self) -> int:
+        """哈希数组 + Bloom 位图的字节数 (mmap 时为共享页缓存大小)"""
+        return int(self.hashes.nbytes) + (int(self.bloom.nbytes) if self.bloom is not None else 0) + len(self._extra) * 8
+
+    def false_positive_rate(self) -> Dict[str, float]:
+        """哈希碰撞导致误判的概率 (对一个新签名)，以及 Bloom 过滤器的理论误判率"""
+        n = len(self)
+        rates = {"hash_collision": n / 2.0 ** 64}
+        if self.bloom is not None:
+            m = len(self.bloom) * 8
+            rates["bloom"] = float((1 - np.exp(-self.bloom_hashes * len(self.hashes) / m)) ** self.bloom_hashes)
+        return rates
+
+
+class HistoryIndex:
+    """基于 SQLite 的增量查重签名索引"""
+
+    def __init__(self, db_path: str = HISTORY_INDEX_PATH, signature_version: int = 1):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                rows INTEGER NOT NULL DEFAULT 0,
+                ingest_ms REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS signatures (
+                path TEXT NOT NULL,
+                name_char TEXT NOT NULL,
+                title TEXT NOT NULL,
+                work_time TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_signatures_path ON signatures(path);
+            CREATE INDEX IF NOT EXISTS idx_signatures_bucket ON signatures(name_char, work_time);
+        """)
+        # 签名规则变化后 (例如新增归一化) 旧签名不可再用，全部重新读取
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != signature_version:
+            with self.conn:
+                self.conn.execute("DELETE FROM signatures")
+                self.conn.execute("DELETE FROM files")
+            self.conn.execute(f"PRAGMA user_version = {int(signature_version)}")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        for column, ddl in (("rows", "INTEGER NOT NULL DEFAULT 0"), ("ingest_ms", "REAL NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE files ADD COLUMN {column} {ddl}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync(self, data_dir: str, reader: Callable[[str], Iterable[Signature]],
+             on_error: Optional[Callable[[str, Exception], None]] = None,
+             on_progress: Optional[Callable[[int, int], None]] = None,
+             workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        让索引与 data_dir 保持一致
+        - 新增/大小或修改时间变化的文件: 调用 reader 重新读取 (文件较多时使用进程池并行)
+        - 被移动到 archive_* 的文件 (文件名、大小、修改时间不变): 只更新路径，不再读取
+        - 已不存在的文件: 删除其签名
+        reader 需为模块级函数以便在子进程中调用；on_progress(已完成, 总数) 用于显示进度
+        """
+        current = list_history_files(data_dir) if os.path.exists(data_dir) else {}
+        known = {path: (name, size, mtime) for path, name, size, mtime in
+                 self.conn.execute("SELECT path, name, size, mtime_ns FROM files WHERE path NOT LIKE ?", (IMPORT_PREFIX + "%",))}
+        stats = {"files": len(current), "ingested": 0, "relinked": 0, "removed": 0, "failed": 0}
+
+        missing = {path: info for path, info in known.items() if path not in current}
+        moved_from = {}
+        for path, (name, size, mtime) in missing.items():
+            moved_from.setdefault((name, size, mtime), []).append(path)
+
+        to_read = []
+        with self.conn:
+            for path, (size, mtime) in current.items():
+                if path in known and known[path][1:] == (size, mtime):
+                    continue
+                candidates = moved_from.get((os.path.basename(path), size, mtime))
+                if path not in known and candidates:
+                    old_path = candidates.pop()
+                    del missing[old_path]
+                    self.conn.execute("UPDATE files SET path = ? WHERE path = ?", (path, old_path))
+                    self.conn.execute("UPDATE signatures SET path = ? WHERE path = ?", (path, old_path))
+                    stats["relinked"] += 1
+                    continue
+                to_read.append(path)
+
+            for path in missing:
+                self.conn.execute("DELETE FROM signatures WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                stats["removed"] += 1
+
+        for done, (path, rows, elapsed, error) in enumerate(self._read_files(to_read, reader, workers), 1):
+            if error is not None:
+                stats["failed"] += 1
+                if on_error: on_error(path, error)
+            else:
+                size, mtime = current[path]
+                with self.conn:
+                    self._replace_file(path, size, mtime, rows, elapsed * 1000)
+                stats["ingested"] += 1
+            if on_progress: on_progress(done, len(to_read))
+        return stats
+
+    def _read_files(self, paths: List[str], reader, workers: Optional[int]):
+        if len(paths) < PARALLEL_MIN_FILES or workers == 1:
+            for path in paths:
+                yield _timed_read(reader, path)
+            return
+        # 调用方 (main.py) 此时已有浏览器预热等线程在运行，fork 会复制它们持有的锁，因此固定使用 spawn
+        with ProcessPoolExecutor(max_workers=workers or min(len(paths), os.cpu_count() or 1),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_timed_read, reader, path) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _replace_file(self, path: str, size: int, mtime: int, rows: List[Signature], ingest_ms: float):
+        self.conn.execute("DELETE FROM signatures WHERE path = ?", (path,))
+        self.conn.executemany(
+            "INSERT INTO signatures (path, name_char, title, work_time) VALUES (?, ?, ?, ?)",
+            ((path, *row) for row in rows))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, name, size, mtime_ns, rows, ingest_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, os.path.basename(path), size, mtime, len(rows), ingest_ms))
+
+    def import_signatures(self, source: str, signatures: Iterable[Signature],
+                          store_path: Optional[str] = SIGNATURE_STORE_PATH) -> int:
+        """
+        将签名直接写入索引 (例如 dedup.py 流式导入的大文件)，同一 source 再次导入时覆盖旧数据
+        签名规则版本变化时与其他数据一起清空，需要重新导入；返回导入条数
+        """
+        path = IMPORT_PREFIX + source
+        count = 0
+        start = time.perf_counter()
+
+        def counted():
+            nonlocal count
+            for row in signatures:
+                count += 1
+                yield (path, *row)
+
+        with self.conn:
+            self.conn.execute("DELETE FROM signatures WHERE path = ?", (path,))
+            self.conn.executemany("INSERT INTO signatures (path, name_char, title, work_time) VALUES (?, ?, ?, ?)", counted())
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, name, size, mtime_ns, rows, ingest_ms) VALUES (?, ?, 0, 0, ?, ?)",
+                (path, source, count, (time.perf_counter() - start) * 1000))
+        # 紧凑存储已过期，下次加载时重新生成
+        if store_path:
+            for ext in ('.u64', '.bloom'):
+                if os.path.exists(store_path + ext): os.remove(store_path + ext)
+        return count
+
+    def slowest_files(self, limit: int = 5) -> List[Tuple[str, int, float]]:
+        """读取最慢的文件 (路径, 行数, 耗时ms)"""
+        return list(self.conn.execute(
+            "SELECT path, rows, ingest_ms FROM files ORDER BY ingest_ms DESC LIMIT ?", (limit,)))
+
+    def signatures(self) -> Set[Signature]:
+        return set(self.conn.execute("SELECT DISTINCT name_char, title, work_time FROM signatures"))
+
+    def signature_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def compact_store(self, path: str = SIGNATURE_STORE_PATH, rebuild: bool = False) -> SignatureStore:
+        """返回紧凑哈希存储；索引有变化 (rebuild=True) 或文件不存在时重新生成"""
+        if rebuild or not os.path.exists(path + '.u64'):
+            rows = self.conn.execute("SELECT name_char, title, work_time FROM signatures")
+            SignatureStore.build(rows).save(path)
+        return SignatureStore.open(path)
+
+
+class CandidateMatcher:
+    """
+    查重匹配: 先做精确签名匹配，可选地在 (姓名首字, 在职时间) 相同的桶内对职位做模糊匹配
+    桶查询走 SQLite 索引 (idx_signatures_bucket)，运行中新增的签名保存在内存桶中
+    """
+
+    def __init__(self, exact, db_path: Optional[str] = HISTORY_INDEX_PATH,
+                 fuzzy_threshold: Optional[float] = FUZZY_TITLE_THRESHOLD):
+        self.exact = exact
+        self.fuzzy_threshold = fuzzy_threshold
+        self.last_fuzzy_match: Optional[str] = None
+        self._buckets: Dict[Tuple[str, str], List[str]] = {}
+        self._conn = None
+        if fuzzy_threshold and db_path and os.path.exists(db_path):
+            self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _bucket_titles(self, name_char: str, work_time: str) -> List[str]:
+        titles = list(self._buckets.get((name_char, work_time), []))
+        if self._conn is not None:
+            titles.extend(row[0] for row in self._conn.execute(
+                "SELECT DISTINCT title FROM signatures WHERE name_char = ? AND work_time = ?", (name_char, work_time)))
+        return titles
+
+    def _similar(self, a: str, b: str) -> bool:
+        if not a or not b: return False
+        if a in b or b in a: return min(len(a), len(b)) / max(len(a), len(b)) >= self.fuzzy_threshold
+        return difflib.SequenceMatcher(None, a, b).ratio() >= self.fuzzy_threshold
+
+    def __contains__(self, signature: Signature) -> bool:
+        self.last_fuzzy_match = None
+        if signature in self.exact: return True
+        if not self.fuzzy_threshold: return False
+        name_char, title, work_time = signature
+        for other in self._bucket_titles(name_char, work_time):
+            if self._similar(title, other):
+                self.last_fuzzy_match = other
+                return True
+        return False
+
+    def add(self, signature: Signature):
+        self.exact.add(signature)
+        if self.fuzzy_threshold:
+            self._buckets.setdefault((signature[0], signature[2]), []).append(signature[1])
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
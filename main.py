@@ -1,20 +1,19 @@
+import time
+PROCESS_STARTED = time.perf_counter()
+
 import asyncio
 import os
-import pandas as pd
 import random
 import json
-import requests
-from playwright.async_api import async_playwright
 import threading
-import time
 import re
-import pypinyin
-import docx
-from docx.shared import Pt
-from bs4 import BeautifulSoup
 import zipfile
+import importlib
+import concurrent.futures
+import io
 import shutil
 import sys
+from functools import lru_cache
 
 # --- Helper Functions ---
 
@@ -29,7 +28,7 @@ def resource_path(relative_path: str) -> str:
 sys.path.append(resource_path('libs'))
 
 from datetime import datetime
-from typing import List, Dict, Set, Optional, Tuple
+from typing import List, Dict, Set, Optional, Tuple, Union, TYPE_CHECKING
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -43,22 +42,59 @@ from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich import print as rprint
 
-from htmldocx import HtmlToDocx
+from shared_dedup import SharedDedup, SHARED_DEDUP_PATH
+from negative_cache import NegativeCache, NEGATIVE_CACHE_PATH, REASON_LABELS, resume_key, briefing_hash, signature_key as negative_signature_key
+from run_journal import RunJournal, ExcelMaterializer
+from history_compact import archive_by_rename, compact_history, AUTO_COMPACT
+from signatures import SIGNATURE_VERSION, extract_name_first_char, build_candidate_signature, read_history_signatures
+from tracing import tracer, span, traced
+from decisions import DecisionLog
+from diagnostics import start_diagnostics, configure as configure_diagnostics
+from control import RunMetrics, start_control_server
+from startup import (ensure_browsers_installed, invalidate_browser_check, EventLoopThread, BrowserSession, StartupTimer,
+                     SEARCH_URL, SEARCH_INPUT_SELECTOR)
+
+# pandas / pypinyin / docx / bs4 / htmldocx / requests / numpy 在首次使用时才导入 (启动时由后台线程预先导入)，
+# 让第一个输入提示尽快出现
+HEAVY_MODULES = ("pandas", "pypinyin", "requests", "history_index", "resume_docx")
+if TYPE_CHECKING:
+    import docx
+    import pandas as pd
+    from history_index import SignatureStore, CandidateMatcher
+    from resume_docx import SnapshotWriter
 
 # --- Configuration & Constants ---
 VOLC_SECRETKEY = os.getenv("VOLC_SECRETKEY")
+VOLC_API_URL = os.getenv("VOLC_API_URL", "https://ark.cn-beijing.volces.com/api/v3/chat/completions")
+# 固定等待与候选人间随机间隔的倍数 (离线基准测试 bench/e2e_bench.py 用它比较等待策略；正式运行保持 1)
+WAIT_SCALE = float(os.getenv("LIEPIN_WAIT_SCALE", "1"))
+# AI 请求超时 (秒) 与重试退避的倍数 (退避为 倍数 * 1s/2s/4s；bench/ai_load.py 用它们压测不同的客户端配置)
+AI_MATCH_TIMEOUT = float(os.getenv("LIEPIN_AI_MATCH_TIMEOUT", "30"))
+AI_SUMMARY_TIMEOUT = float(os.getenv("LIEPIN_AI_SUMMARY_TIMEOUT", "60"))
+AI_BACKOFF_SCALE = float(os.getenv("LIEPIN_AI_BACKOFF_SCALE", "1"))
 RESUME_LINK_SELECTOR = "div.new-resume-personal-name"
 CV_TEXT_SELECTOR = "#resume-detail-single"
+# 以下两个选择器尚未对照真实简历页核实；提取为空时 template 模式会回退为 html 模式 (见 resolve_docx_mode)
+WORK_ITEM_SELECTOR = "div.rd-work-item, .work-item, .work-exp-item"
+EDU_ITEM_SELECTOR = "div.rd-edu-item, .edu-item, .education-item"
 
 console = Console()
 
+# 每个候选人都会调用的解析函数使用预编译正则；配置值 (离职/登录筛选条件) 的解析结果缓存 (见 bench/micro_bench.py)
+DEPARTURE_DATE_RE = re.compile(r"(\d{2})/(\d{1,2})")
+WORK_TIME_RE = re.compile(r"(\d{4})\.(\d{1,2})\s*-\s*(\d{4})\.(\d{1,2})|(\d{4})\.(\d{1,2})\s*-\s*(至今|To present|present)", re.IGNORECASE)
+WORK_TIME_PRESENT_RE = re.compile(r'\s*-\s*(?:至今|To present|present)', re.IGNORECASE)
+WORK_TIME_START_RE = re.compile(r"(\d{4})\.(\d{1,2})")
+
+@lru_cache(maxsize=4096)
 def convert_date_to_value(date_str: str) -> int:
     date_str = date_str.strip().upper()
     if date_str == "PRESENT": return 999999
-    match = re.search(r"(\d{2})/(\d{1,2})", date_str)
+    match = DEPARTURE_DATE_RE.search(date_str)
     if match: return int(match.group(1)) * 100 + int(match.group(2))
     return 0
 
+@lru_cache(maxsize=256)
 def parse_login_date_input(date_str: str) -> Optional[datetime]:
     if not date_str: return None
     date_str = date_str.strip().replace('-', '/')
@@ -84,14 +120,13 @@ def format_work_time(time_str: str) -> str:
         if ',' in cleaned_str: cleaned_str = cleaned_str.split(',')[0].strip()
         
         # 支持中英文的 "至今/To present/present" 格式
-        pattern = r"(\d{4})\.(\d{1,2})\s*-\s*(\d{4})\.(\d{1,2})|(\d{4})\.(\d{1,2})\s*-\s*(至今|To present|present)"
-        match = re.search(pattern, cleaned_str, re.IGNORECASE)
+        match = WORK_TIME_RE.search(cleaned_str)
         
         if not match:
             # 备用匹配：处理 " - 至今" 或 " - To present" 格式
-            if re.search(r'\s*-\s*(至今|To present|present)', cleaned_str, re.IGNORECASE):
-                parts = re.split(r'\s*-\s*(?:至今|To present|present)', cleaned_str, flags=re.IGNORECASE)
-                start_match = re.search(r"(\d{4})\.(\d{1,2})", parts[0])
+            if WORK_TIME_PRESENT_RE.search(cleaned_str):
+                parts = WORK_TIME_PRESENT_RE.split(cleaned_str)
+                start_match = WORK_TIME_START_RE.search(parts[0])
                 if start_match: return f"{start_match.group(1)[-2:]}/{int(start_match.group(2))}-Present"
             return cleaned_str
         
@@ -102,39 +137,75 @@ def format_work_time(time_str: str) -> str:
         return cleaned_str
     except Exception: return time_str
 
-def extract_name_first_char(name: str) -> str:
-    """提取姓名的第一个字符用于查重匹配"""
-    if not name:
-        return ""
-    # 移除常见后缀后提取第一个字符
-    clean = name.strip().replace("*", "").replace("先生", "").replace("女士", "")
-    return clean[0] if clean else ""
+@lru_cache(maxsize=4096)
+def surname_initial(surname: str) -> str:
+    try:
+        import pypinyin
+        pinyin_list = pypinyin.pinyin(surname, style=pypinyin.Style.FIRST_LETTER)
+        return pinyin_list[0][0].upper()
+    except Exception: return surname.upper()
 
 def format_name_to_initials(full_name: str, gender: str) -> str:
     if not full_name: return ""
-    surname = full_name[0]
-    try:
-        pinyin_list = pypinyin.pinyin(surname, style=pypinyin.Style.FIRST_LETTER)
-        first_char = pinyin_list[0][0].upper()
-    except Exception: first_char = surname.upper()
+    first_char = surname_initial(full_name[0])
     if gender == "男": return f"{first_char}先生"
     elif gender == "女": return f"{first_char}女士"
     return first_char
 
-def save_resume_as_docx(html_content: str, filename: str, max_retries: int = 3) -> bool:
-    """保存简历为 docx 文件，支持失败重试机制"""
+@traced()
+def clean_resume_html(html_content: str) -> str:
+    """转换前清理网页: 去掉内嵌 (data:) 图片和所有 style 属性"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for img in soup.find_all('img'):
+        if img.get('src', '').startswith('data:'): img.decompose()
+    for tag in soup.find_all(True):
+        if 'style' in tag.attrs: del tag.attrs['style']
+    return str(soup)
+
+def render_resume_html(cleaned_html: str) -> "docx.document.Document":
+    """把清理后的网页转换为 Docx 文档对象 (尚未保存)"""
+    import docx
+    from resume_docx import ResumeHtmlToDocx
+
+    doc = docx.Document()
+    ResumeHtmlToDocx().add_html_to_document(cleaned_html, doc)
+    return doc
+
+def resolve_docx_mode(mode: str, fields: Optional[Dict], name: str = "") -> str:
+    """template 模式下工作/教育经历都没有提取到时 (选择器与页面不符)，回退为 html 模式，避免生成空白简历"""
+    if mode != "template" or (fields and (fields.get("工作经历") or fields.get("教育经历"))):
+        return mode
+    console.print(f"[yellow]--- 未提取到工作/教育经历 (WORK_ITEM_SELECTOR/EDU_ITEM_SELECTOR 可能与页面不符)，{name or '该简历'}改用 html 模式 ---[/yellow]")
+    return "html"
+
+def save_resume_as_docx(html_content: str, filename: str, max_retries: int = 3,
+                        mode: str = "html", fields: Optional[Dict] = None,
+                        zip_writer: Optional["CompanyZipWriter"] = None, keep_file: bool = True) -> bool:
+    """保存简历为 docx 文件，支持失败重试机制
+    mode='html' 完整转换网页; mode='template' 直接用结构化字段渲染固定模板 (更快)
+    zip_writer 不为空时，docx 在内存中生成并直接写入公司压缩包；keep_file=False 时不再写出单独的 docx 文件
+    """
+    from resume_docx import render_resume_template
+
     for attempt in range(max_retries):
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            for img in soup.find_all('img'):
-                if img.get('src', '').startswith('data:'): img.decompose()
-            for tag in soup.find_all(True):
-                if 'style' in tag.attrs: del tag.attrs['style']
-            
-            doc = docx.Document()
-            HtmlToDocx().add_html_to_document(str(soup), doc)
-            doc.save(filename)
-            console.print(f"[green]成功保存简历Docx: {filename}[/green]")
+            if mode == "template":
+                doc = render_resume_template(fields or {})
+            else:
+                doc = render_resume_html(clean_resume_html(html_content))
+            if zip_writer is None:
+                doc.save(filename)
+            else:
+                buffer = io.BytesIO()
+                doc.save(buffer)
+                if keep_file:
+                    with open(filename, 'wb') as f:
+                        f.write(buffer.getvalue())
+                zip_writer.add(os.path.basename(filename), buffer.getvalue())
+            target = filename if keep_file or zip_writer is None else f"{os.path.basename(zip_writer.partial_path)}:{os.path.basename(filename)}"
+            console.print(f"[green]成功保存简历Docx: {target}[/green]")
             return True
         except Exception as e:
             if attempt < max_retries - 1:
@@ -145,27 +216,72 @@ def save_resume_as_docx(html_content: str, filename: str, max_retries: int = 3)
                 return False
     return False
 
+def next_available_path(directory: str, base_name: str, ext: str, reserved: Optional[Set[str]] = None) -> str:
+    """返回 directory 下不冲突的文件路径: base.ext, base-1.ext, base-2.ext ... (同时避开 reserved 中的路径)"""
+    path = os.path.join(directory, f"{base_name}{ext}")
+    counter = 1
+    while os.path.exists(path) or (reserved and path in reserved):
+        path = os.path.join(directory, f"{base_name}-{counter}{ext}")
+        counter += 1
+    return path
+
+def company_zip_path(company_name: str, file_count: int, zip_identifier: str, zip_dir: str = 'zips') -> str:
+    return next_available_path(zip_dir, f"猎聘-{company_name}-{file_count}份-{zip_identifier}", ".zip")
+
+def zip_member_compression(file_name: str) -> int:
+    # docx 本身就是 zip，再次 DEFLATE 几乎没有收益，直接存储
+    return zipfile.ZIP_STORED if file_name.lower().endswith(".docx") else zipfile.ZIP_DEFLATED
+
 def zip_company_files(company_name: str, file_paths: List[str], output_zip_name: str):
     try:
         if not file_paths: return
         with zipfile.ZipFile(output_zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for file_path in file_paths:
-                if os.path.exists(file_path): zipf.write(file_path, os.path.basename(file_path))
+                if os.path.exists(file_path):
+                    zipf.write(file_path, os.path.basename(file_path), compress_type=zip_member_compression(file_path))
         console.print(f"[green]成功打包Zip: {output_zip_name} ({len(file_paths)} 个文件)[/green]")
     except Exception as e: console.print(f"[red]打包Zip失败: {e}[/red]")
 
-# --- AI Functions ---
-def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional[bool]:
-    """判断简历是否匹配，返回 True/False/None (None表示API错误)"""
-    api_key = VOLC_SECRETKEY
-    if not api_key:
-        console.print("[red]错误: 未找到 VOLC_SECRETKEY。[/red]")
-        return None
+class CompanyZipWriter:
+    """公司压缩包增量写入器：每份 docx 生成后立即写入，公司结束时按实际份数重命名"""
 
-    MODEL_ENDPOINT_ID = "doubao-seed-1-6-lite-251015"
-    API_URL = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+    def __init__(self, company_name: str, zip_identifier: str, zip_dir: str = 'zips'):
+        self.company_name = company_name
+        self.zip_identifier = zip_identifier
+        self.zip_dir = zip_dir
+        self.partial_path = os.path.join(zip_dir, f".猎聘-{company_name}-{zip_identifier}-{os.getpid()}.partial.zip")
+        self.names: List[str] = []
+        self._zipf: Optional[zipfile.ZipFile] = None
+
+    def unique_name(self, base_name: str, ext: str = ".docx") -> str:
+        name = f"{base_name}{ext}"
+        counter = 1
+        while name in self.names:
+            name = f"{base_name}-{counter}{ext}"
+            counter += 1
+        return name
 
-    prompt = f"""
+    def add(self, arcname: str, data: bytes):
+        if self._zipf is None:
+            self._zipf = zipfile.ZipFile(self.partial_path, 'w')
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = zip_member_compression(arcname)
+        self._zipf.writestr(info, data)
+        self.names.append(arcname)
+
+    def close(self) -> Optional[str]:
+        """关闭压缩包并重命名为正式名称，返回最终路径 (没有任何文件时返回 None)"""
+        if self._zipf is None: return None
+        self._zipf.close()
+        self._zipf = None
+        zip_name = company_zip_path(self.company_name, len(self.names), self.zip_identifier, self.zip_dir)
+        os.replace(self.partial_path, zip_name)
+        console.print(f"[green]成功打包Zip: {zip_name} ({len(self.names)} 个文件)[/green]")
+        return zip_name
+
+# --- AI Functions ---
+def build_match_prompt(cv_text: str, briefing: str) -> str:
+    return f"""
     你是一个专业的招聘/访谈助手。你的任务是判断一份简历是否符合访谈提纲的要求。
     【访谈提纲】:
     {briefing}
@@ -175,6 +291,34 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
     请仔细阅读提纲和简历，判断该候选人是否符合提纲中的核心要求。
     请只回答 "YES" 或 "NO"。
     """
+
+def build_summary_prompt(cv_text: str, target_company: str) -> str:
+    return f"""
+    你是一位专业的简历分析师。
+    【简历全文】: {cv_text}
+    【目标公司】: {target_company}
+    任务: 1.定位目标公司经历(YY/M-YY/M或Present) 2.一句话总结 3.罗列其他经历
+    格式:
+    {target_company}的经历:
+    [在职时间] [公司名称] [职位]
+    [一句话总结]
+    其他工作经历:
+    [在职时间1] [公司名称1] [职位1]
+    """
+
+@traced()
+def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional[bool]:
+    """判断简历是否匹配，返回 True/False/None (None表示API错误)"""
+    import requests
+    api_key = VOLC_SECRETKEY
+    if not api_key:
+        console.print("[red]错误: 未找到 VOLC_SECRETKEY。[/red]")
+        return None
+
+    MODEL_ENDPOINT_ID = "doubao-seed-1-6-lite-251015"
+    API_URL = VOLC_API_URL
+
+    prompt = build_match_prompt(cv_text, briefing)
     
     headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
     payload = {
@@ -186,7 +330,7 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
 
     for attempt in range(max_retries):
         try:
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+            response = requests.post(API_URL, headers=headers, json=payload, timeout=AI_MATCH_TIMEOUT)
             response.raise_for_status()
             result = response.json()
             
@@ -195,7 +339,7 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
                 if attempt < max_retries - 1:
                     console.print(f"[yellow]火山引擎 API 错误 (尝试 {attempt+1}/{max_retries}): {error_msg}，重试中...[/yellow]")
                     import time
-                    time.sleep(2 ** attempt)  # 指数退避: 1s, 2s, 4s
+                    time.sleep(AI_BACKOFF_SCALE * 2 ** attempt)  # 指数退避: 1s, 2s, 4s
                     continue
                 else:
                     console.print(f"[red]火山引擎 API 返回错误: {error_msg}[/red]")
@@ -206,7 +350,7 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
                 if attempt < max_retries - 1:
                     console.print(f"[yellow]AI 返回空结果 (尝试 {attempt+1}/{max_retries})，重试中...[/yellow]")
                     import time
-                    time.sleep(2 ** attempt)
+                    time.sleep(AI_BACKOFF_SCALE * 2 ** attempt)
                     continue
                 return None
             
@@ -218,7 +362,7 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
             if attempt < max_retries - 1:
                 console.print(f"[yellow]API 请求超时 (尝试 {attempt+1}/{max_retries})，重试中...[/yellow]")
                 import time
-                time.sleep(2 ** attempt)
+                time.sleep(AI_BACKOFF_SCALE * 2 ** attempt)
                 continue
             else:
                 console.print(f"[red]火山引擎 API 请求超时 (已重试 {max_retries} 次)[/red]")
@@ -227,7 +371,7 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
             if attempt < max_retries - 1:
                 console.print(f"[yellow]API 请求出错 (尝试 {attempt+1}/{max_retries}): {e}，重试中...[/yellow]")
                 import time
-                time.sleep(2 ** attempt)
+                time.sleep(AI_BACKOFF_SCALE * 2 ** attempt)
                 continue
             else:
                 console.print(f"[red]火山引擎 API 请求出错: {e}[/red]")
@@ -235,25 +379,16 @@ def is_match_volc(cv_text: str, briefing: str, max_retries: int = 3) -> Optional
     
     return None
 
+@traced()
 def summarize_profile_volc(cv_text: str, target_company: str) -> str:
+    import requests
     api_key = VOLC_SECRETKEY
     if not api_key: return "错误: 未找到 VOLC_SECRETKEY。"
 
     MODEL_ENDPOINT_ID = "doubao-seed-1-6-lite-251015"
-    API_URL = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+    API_URL = VOLC_API_URL
 
-    prompt = f"""
-    你是一位专业的简历分析师。
-    【简历全文】: {cv_text}
-    【目标公司】: {target_company}
-    任务: 1.定位目标公司经历(YY/M-YY/M或Present) 2.一句话总结 3.罗列其他经历
-    格式:
-    {target_company}的经历:
-    [在职时间] [公司名称] [职位]
-    [一句话总结]
-    其他工作经历:
-    [在职时间1] [公司名称1] [职位1]
-    """
+    prompt = build_summary_prompt(cv_text, target_company)
     headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
     payload = {
         "model": MODEL_ENDPOINT_ID,
@@ -263,7 +398,7 @@ def summarize_profile_volc(cv_text: str, target_company: str) -> str:
     }
 
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
+        response = requests.post(API_URL, headers=headers, json=payload, timeout=AI_SUMMARY_TIMEOUT)
         response.raise_for_status()
         result = response.json()
         summary = result.get('choices', [{}])[0].get('message', {}).get('content', '')
@@ -275,6 +410,32 @@ def summarize_profile_volc(cv_text: str, target_company: str) -> str:
         console.print(f"[red]AI Profile总结 API 请求出错: {e}[/red]")
         return f"AI_ERROR: {e}"
 
+CONTACT_COLUMNS = ['分类', '公司', '姓名', '在职公司', '职位', '云号码', '在职时间', 'Profile', '简历链接', '是否合作', '最后一次登录时间']
+
+def build_contacts_dataframe(contacts: List[Dict]) -> "pd.DataFrame":
+    """按输出列顺序生成带序号的 DataFrame (主程序保存与从日志重建共用)"""
+    import pandas as pd
+    df = pd.DataFrame(list(contacts))
+    if not df.empty:
+        df = df[[col for col in CONTACT_COLUMNS if col in df.columns]]
+        df.insert(0, '序号', range(1, 1 + len(df)))
+    return df
+
+RESUME_OUTPUT_MODES = ("files", "stream", "both")
+
+def parse_output_mode(value: str) -> str:
+    mode = (value or "files").strip().lower()
+    if mode not in RESUME_OUTPUT_MODES:
+        raise ValueError(f"可选: {'/'.join(RESUME_OUTPUT_MODES)}")
+    return mode
+
+def parse_docx_mode(value: str) -> str:
+    mode = (value or "html").strip().lower()
+    from resume_docx import DOCX_MODES
+    if mode not in DOCX_MODES:
+        raise ValueError(f"可选: {'/'.join(DOCX_MODES)}")
+    return mode
+
 # --- Input Manager ---
 class InputManager:
     def __init__(self):
@@ -338,14 +499,18 @@ class InputManager:
 
 class LiepinScraper:
     def __init__(self):
-        self.pause_flag = threading.Event()
-        self.pause_flag.set()
+        # 暂停/停止由事件循环中的 asyncio.Event 控制，其他线程通过 call_soon_threadsafe 切换
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.resume_event: Optional[asyncio.Event] = None
+        self.stop_requested = False
+        self.metrics = RunMetrics()
         self.contacts_lock = threading.Lock()
+        self.excel_lock = threading.Lock()
         self.saved_contacts = []
         self.output_filename = ""
         self.qualified_resumes_count = 0
         self.processed_resumes_count = 0
-        self.seen_candidates: Set[Tuple[str, str, str]] = set()
+        self.seen_candidates: Union[Set[Tuple[str, str, str]], "SignatureStore", "CandidateMatcher"] = set()
         
         # Configuration
         self.config = {}
@@ -355,24 +520,61 @@ class LiepinScraper:
         self.is_default_filename = False
         self.actually_searched_positions = []
         self.base_default_filename = "" # 分类-公司名 部分
+        self.snapshot_writer: Optional["SnapshotWriter"] = None
+        self.shared_dedup: Optional[SharedDedup] = None
+        self.negative_cache: Optional[NegativeCache] = None
+        self.journal: Optional[RunJournal] = None
+        self.excel_writer: Optional[ExcelMaterializer] = None
+        self.decision_log: Optional[DecisionLog] = None
+        self.startup = StartupTimer(PROCESS_STARTED)
+        self.session = BrowserSession()
+        self.round_ttfc: List[float] = []
         
-    def ensure_browsers_installed(self):
-        console.print("[dim]正在检查浏览器环境...[/dim]")
+    def preload_history(self) -> concurrent.futures.Future:
+        """后台线程: 预先导入重型模块，然后加载历史数据；返回的 Future 结果为缓存的消息与耗时"""
+        def work():
+            started = time.perf_counter()
+            for module in HEAVY_MODULES:
+                importlib.import_module(module)
+            messages = []
+            self.load_historical_data(log=messages.append, show_progress=False)
+            return messages, (time.perf_counter() - started) * 1000
+
+        console.print("[dim]正在后台加载历史数据以进行查重 (可同时继续输入)...[/dim]")
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        future = executor.submit(work)
+        executor.shutdown(wait=False)
+        return future
+
+    def finish_history(self, history: concurrent.futures.Future, runner: EventLoopThread):
+        messages, ms = runner.result(history)
+        for message in messages:
+            console.print(message)
+        self.startup.record("history", ms)
+
+    def finish_warm_up(self, warm_up: Optional[concurrent.futures.Future], runner: EventLoopThread):
+        """等待后台预热完成；失败时由 run_scraper 开始时重新启动"""
+        if warm_up is None: return
         try:
-            import subprocess
-            console.print("[dim]正在验证/安装 Chromium 浏览器... (首次运行可能需要几分钟)[/dim]")
-            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
-            console.print("[green]浏览器环境检查通过。[/green]")
+            session = runner.result(warm_up)
         except Exception as e:
-            console.print(f"[yellow]警告: 浏览器安装检查失败 ({e})。如果程序运行报错，请手动运行 'playwright install'。[/yellow]")
+            if not self.session.launches:
+                invalidate_browser_check()
+            console.print(f"[yellow]浏览器预热失败 ({e})，开始运行时重新启动。[/yellow]")
+            return
+        self.startup.record("browser_reused" if session.reused else "browser", session.prepare_ms)
+        if session.logged_in is False:
+            console.print("[yellow]登录状态可能已失效 (搜索页未出现搜索框)，如搜索失败请重新登录/更新Cookie。[/yellow]")
 
     async def save_session(self):
+        from playwright.async_api import async_playwright
+
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=False, channel='chrome')
             context = await browser.new_context()
             page = await context.new_page()
             
-            await page.goto("https://h.liepin.com/search/getConditionItem")
+            await page.goto(SEARCH_URL)
             console.print(Panel("[bold yellow]请在弹出的浏览器窗口中手动登录猎聘网[/bold yellow]\n登录成功后，返回此终端，按 Enter 键继续", title="登录提示"))
             input()
             
@@ -393,8 +595,22 @@ class LiepinScraper:
                     console.print(f"[green]--- 已清空: {directory}/ ---[/green]")
                 except Exception as e: console.print(f"[red]--- 清空 {directory}/ 失败: {e} ---[/red]")
             else: console.print(f"[dim]--- 目录不存在，跳过: {directory}/ ---[/dim]")
+        self.clear_shared_dedup()
         console.print("[green]--- 清空完成 ---[/green]\n")
 
+    def clear_shared_dedup(self):
+        """历史记录清空后，共享查重中的已完成记录也一并清除，否则这些候选人会被永久跳过"""
+        if not SHARED_DEDUP_PATH or not os.path.exists(SHARED_DEDUP_PATH):
+            return
+        try:
+            store = self.shared_dedup or SharedDedup()
+            removed = store.clear_committed()
+            if store is not self.shared_dedup:
+                store.close()
+            console.print(f"[green]--- 已清空共享查重记录: {removed} 条 ---[/green]")
+        except Exception as e:
+            console.print(f"[red]--- 清空共享查重记录失败: {e} ---[/red]")
+
     def archive_output_directories(self):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         archive_name = f"archive_{timestamp}"
@@ -403,49 +619,60 @@ class LiepinScraper:
         console.print(f"\n[yellow]--- 正在归档旧文件到 {archive_name}... ---[/yellow]")
         
         for directory in dirs_to_archive:
-            if not os.path.exists(directory): continue
-            archive_path = os.path.join(directory, archive_name)
-            if not os.path.exists(archive_path): os.makedirs(archive_path)
-            
             try:
-                for filename in os.listdir(directory):
-                    file_path = os.path.join(directory, filename)
-                    if filename == archive_name: continue
-                    shutil.move(file_path, os.path.join(archive_path, filename))
-                console.print(f"[green]--- 已归档 {directory}/ 内容 ---[/green]")
+                if archive_by_rename(directory, archive_name):
+                    console.print(f"[green]--- 已归档 {directory}/ 内容 ---[/green]")
             except Exception as e:
                 console.print(f"[red]--- 归档 {directory}/ 失败: {e} ---[/red]")
+        
+        if AUTO_COMPACT:
+            try:
+                stats = compact_history('data')
+                if stats['archives']:
+                    console.print(f"[green]--- 已将 {stats['archives']} 个归档压缩进 data/history.parquet (新增 {stats['rows_added']} 条，共 {stats['rows_total']} 条) ---[/green]")
+            except Exception as e:
+                console.print(f"[red]--- 压缩历史归档失败: {e} ---[/red]")
         console.print("[green]--- 归档完成 ---[/green]\n")
 
-    def load_historical_data(self):
-        console.print("[dim]正在加载历史数据以进行查重...[/dim]")
+    def load_historical_data(self, log=console.print, show_progress: bool = True):
+        """加载历史签名用于查重；在后台线程中运行时 (与输入提示并行) 不显示进度条，消息交给 log 缓存"""
+        from history_index import HistoryIndex, CandidateMatcher, COMPACT_DEDUP_THRESHOLD, FUZZY_TITLE_THRESHOLD
+
+        if show_progress:
+            log("[dim]正在加载历史数据以进行查重...[/dim]")
         self.seen_candidates = set()
         data_dir = 'data'
         
-        if not os.path.exists(data_dir): return
+        def on_error(file_path, e):
+            log(f"[yellow]读取历史文件失败 {os.path.basename(file_path)}: {e}[/yellow]")
         
-        xlsx_files = []
-        for root, dirs, files in os.walk(data_dir):
-            for file in files:
-                if file.endswith(".xlsx") and not file.startswith("~$"):
-                    xlsx_files.append(os.path.join(root, file))
+        # 增量索引: 只重新读取新增或变化的 Excel，其余签名直接从索引加载
+        with HistoryIndex(signature_version=SIGNATURE_VERSION) as index, Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
+                                               TextColumn("{task.completed}/{task.total}"), TimeElapsedColumn(),
+                                               console=console, transient=True, disable=not show_progress) as progress:
+            task_id = progress.add_task("[cyan]读取历史文件", total=None)
+            stats = index.sync(data_dir, read_history_signatures, on_error=on_error,
+                               on_progress=lambda done, total: progress.update(task_id, completed=done, total=total))
+            slowest = index.slowest_files(3) if stats['ingested'] else []
+            if index.signature_count() >= COMPACT_DEDUP_THRESHOLD:
+                # 超大历史: 使用 mmap 的 64 位哈希数组 + Bloom 过滤器，避免构建巨大的 Python set
+                changed = bool(stats['ingested'] or stats['relinked'] or stats['removed'])
+                self.seen_candidates = index.compact_store(rebuild=changed)
+                rates = self.seen_candidates.false_positive_rate()
+                log(f"[dim]紧凑查重存储: {self.seen_candidates.nbytes() / 1024 / 1024:.1f} MB, "
+                    f"哈希误判率 {rates['hash_collision']:.1e}, Bloom 误判率 {rates.get('bloom', 0):.2%}[/dim]")
+            else:
+                self.seen_candidates = index.signatures()
         
-        for file_path in xlsx_files:
-            try:
-                df = pd.read_excel(file_path)
-                required_cols = ['姓名', '职位', '在职时间']
-                if all(col in df.columns for col in required_cols):
-                    for _, row in df.iterrows():
-                        signature = (
-                            extract_name_first_char(str(row['姓名'])),
-                            str(row['职位']).strip(),
-                            str(row['在职时间']).strip()
-                        )
-                        self.seen_candidates.add(signature)
-            except Exception as e:
-                console.print(f"[yellow]读取历史文件失败 {os.path.basename(file_path)}: {e}[/yellow]")
-                
-        console.print(f"[green]已加载 {len(self.seen_candidates)} 条历史记录用于查重。[/green]")
+        if FUZZY_TITLE_THRESHOLD:
+            # 同一姓名首字 + 在职时间桶内，对职位做模糊匹配
+            self.seen_candidates = CandidateMatcher(self.seen_candidates)
+        
+        if stats['ingested'] or stats['relinked'] or stats['removed']:
+            log(f"[dim]查重索引更新: 新读取 {stats['ingested']} 个文件, 归档移动 {stats['relinked']} 个, 移除 {stats['removed']} 个 (共 {stats['files']} 个)[/dim]")
+            for path, rows, ms in slowest:
+                log(f"[dim]  {os.path.basename(path)}: {rows} 行, {ms:.0f} ms[/dim]")
+        log(f"[green]已加载 {len(self.seen_candidates)} 条历史记录用于查重。[/green]")
 
     def get_user_inputs(self):
         # 1. 基础信息预收集 (为了生成默认文件名)
@@ -492,6 +719,9 @@ class LiepinScraper:
         im.add_step('min_departure', "离职年限不早于 (格式: YY/M 或 'Present')", default="Present")
         im.add_step('earliest_login', "最后一次登陆时间不晚于 (格式: YY/M)", default="")
         im.add_step('zip_id', "请输入压缩包命名标识", default="ZTZ")
+        im.add_step('deferred_render', "是否延迟生成Docx (只保存网页快照，稍后用 batch_render.py 批量生成)? (y/N)", default='n')
+        im.add_step('output_mode', "简历输出方式 (files=docx文件+结束时打包 / stream=直接写入zip / both=两者)", processor=parse_output_mode, default="files")
+        im.add_step('docx_mode', "简历Docx模式 (html=完整网页 / template=结构化模板，更快)", processor=parse_docx_mode, default="html")
         
         self.config = im.run()
         
@@ -544,9 +774,22 @@ class LiepinScraper:
         table.add_row("输出文件", self.output_filename)
         table.add_row("最早离职", self.config['min_departure'])
         table.add_row("最早登录", self.config['earliest_login'] or "不过滤")
+        table.add_row("Docx模式", self.config['docx_mode'])
+        table.add_row("输出方式", self.config['output_mode'])
+        table.add_row("延迟生成", "是" if self.config['deferred_render'].lower() == 'y' else "否")
         console.print(table)
 
+    def record_reject(self, reason: str, contexts: Dict[str, str], *keys: str):
+        """将不合格的候选人写入负缓存 (上下文为空的筛选条件不记录)"""
+        if self.negative_cache and contexts.get(reason):
+            self.negative_cache.record(keys, reason, contexts[reason])
+
     def save_data_to_excel(self):
+        # 后台写入线程与暂停键可能同时触发保存，串行执行
+        with self.excel_lock:
+            self._write_excel()
+
+    def _write_excel(self):
         # Track old file path for cleanup after successful save
         old_path_to_delete = None
         
@@ -565,13 +808,7 @@ class LiepinScraper:
                 console.print("[yellow]--- (保存请求) 没有数据或文件名未设置 ---[/yellow]")
                 return
             
-            df = pd.DataFrame(list(self.saved_contacts))
-            if not df.empty:
-                desired_order = ['分类', '公司', '姓名', '在职公司', '职位', '云号码', '在职时间', 'Profile', '简历链接', '是否合作', '最后一次登录时间']
-                cols_in_order = [col for col in desired_order if col in df.columns]
-                df = df[cols_in_order]
-                df.insert(0, '序号', range(1, 1 + len(df)))
-                if '序号' in df.columns: df.sort_values(by='序号', ascending=True, inplace=True)
+            df = build_contacts_dataframe(self.saved_contacts)
             
             n, m = self.qualified_resumes_count, self.processed_resumes_count
 
@@ -592,6 +829,90 @@ class LiepinScraper:
         except Exception as e:
             console.print(f"[red]--- (保存请求) 保存到 Excel 时出错: {e} ---[/red]")
 
+    # --- 运行控制 (只在事件循环线程中调用) ---
+    def pause(self) -> Dict:
+        if self.resume_event and self.resume_event.is_set():
+            console.print("\n[yellow]--- 暂停中... ---[/yellow]")
+            self.resume_event.clear()
+            self.request_flush()
+        return {"paused": True}
+
+    def resume(self) -> Dict:
+        if self.resume_event and not self.resume_event.is_set():
+            console.print("\n[green]--- 继续运行 ---[/green]")
+            self.resume_event.set()
+        return {"paused": False}
+
+    def toggle_pause(self) -> Dict:
+        return self.resume() if self.resume_event and not self.resume_event.is_set() else self.pause()
+
+    def request_stop(self) -> Dict:
+        console.print("\n[yellow]--- 收到停止请求，处理完当前候选人后结束 ---[/yellow]")
+        self.stop_requested = True
+        if self.resume_event: self.resume_event.set()
+        return {"stopping": True}
+
+    def request_flush(self) -> Dict:
+        # 由后台写入线程保存，不阻塞事件循环
+        if self.excel_writer: self.excel_writer.request(immediate=True)
+        return {"flush": "requested"}
+
+    def metrics_snapshot(self) -> Dict:
+        snapshot = self.metrics.snapshot()
+        snapshot["paused"] = bool(self.resume_event and not self.resume_event.is_set())
+        snapshot["stopping"] = self.stop_requested
+        if tracer.enabled:
+            snapshot["trace"] = tracer.summary()
+        return snapshot
+
+    def report_startup(self):
+        """启动耗时: 首个候选人 (TTFC) 从输入完成算起；后台阶段与输入提示并行"""
+        timer = self.startup
+        ttfc = timer.since("first_candidate", "inputs_done")
+        if ttfc is None: return
+        parts = []
+        first_prompt = timer.since("prompt")
+        if first_prompt is not None and timer.origin == PROCESS_STARTED:
+            parts.append(f"进程启动到首个提示 {first_prompt:.1f} s")
+        for name, label in (("browser", "浏览器预热"), ("browser_reused", "复用浏览器检查"), ("history", "历史加载")):
+            if name in timer.durations:
+                parts.append(f"{label} {timer.durations[name] / 1000:.1f} s (与输入并行)")
+        parts.append(f"输入完成到首个候选人 {ttfc:.1f} s")
+        console.print(f"[bold]--- 启动耗时: {' | '.join(parts)} ---[/bold]")
+        self.round_ttfc.append(ttfc)
+        if len(self.round_ttfc) > 1:
+            rounds = ", ".join(f"第{i}轮 {t:.1f} s" for i, t in enumerate(self.round_ttfc, 1))
+            console.print(f"[dim]各轮首个候选人耗时: {rounds} (浏览器启动 {self.session.launches} 次)[/dim]")
+
+    def report_trace(self):
+        """导出 Chrome trace 并显示各阶段耗时分布"""
+        try:
+            path = tracer.export_chrome()
+        except Exception as e:
+            console.print(f"[red]导出阶段追踪失败: {e}[/red]")
+            path = None
+        table = Table(title="阶段耗时 (ms)")
+        table.add_column("阶段", style="cyan")
+        for column in ("次数", "p50", "p95", "p99", "合计(s)"):
+            table.add_column(column, justify="right")
+        for row in tracer.summary():
+            table.add_row(row["stage"], str(row["count"]), f"{row['p50']:.0f}", f"{row['p95']:.0f}",
+                          f"{row['p99']:.0f}", f"{row['total'] / 1000:.1f}")
+        console.print(table)
+        if path:
+            console.print(f"[dim]阶段追踪已导出: {path} (可在 chrome://tracing 或 ui.perfetto.dev 打开)[/dim]")
+
+    def report_diagnostics(self, summary: Dict):
+        if "blocks" in summary:
+            console.print(f"[bold]--- 事件循环延迟: p50 {summary.get('lag_p50', 0):.0f} ms, p99 {summary.get('lag_p99', 0):.0f} ms, "
+                          f"最大 {summary.get('lag_max', 0):.0f} ms; 阻塞 {summary['blocks']} 次 (最长 {summary['block_max']:.0f} ms) ---[/bold]")
+            if summary.get("block_log"):
+                console.print(f"[dim]阻塞时的调用栈: {summary['block_log']}[/dim]")
+        if "profile" in summary:
+            top = ", ".join(f"{name} {count}" for name, count in summary["profile_top"][:5])
+            console.print(f"[bold]--- 采样分析: {summary['profile_samples']} 个样本，最耗时: {top} ---[/bold]")
+            console.print(f"[dim]火焰图数据 (折叠栈): {summary['profile']}[/dim]")
+
     async def run_scraper(self):
         # Setup directories
         for folder in ['resumes', 'data', 'zips']:
@@ -601,12 +922,65 @@ class LiepinScraper:
             console.print("[red]错误：未找到 state.json。请先登录。[/red]")
             return
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True, channel='chrome', args=['--disable-blink-features=AutomationControlled'])
-            context = await browser.new_context(storage_state="state.json")
-            page = await context.new_page()
+        if self.config['deferred_render'].lower() == 'y':
+            from resume_docx import SnapshotWriter
+            self.snapshot_writer = SnapshotWriter()
+        else:
+            self.snapshot_writer = None
+        tracer.reset()
+        diagnostics = start_diagnostics()
+        self.loop = asyncio.get_running_loop()
+        self.resume_event = asyncio.Event()
+        self.resume_event.set()
+        self.stop_requested = False
+        self.metrics = RunMetrics()
+        control_server = None
+        try:
+            control_server = await start_control_server({
+                "pause": self.pause, "resume": self.resume, "stop": self.request_stop,
+                "flush": self.request_flush, "metrics": self.metrics_snapshot,
+            })
+            if control_server:
+                console.print(f"[dim]控制接口: http://{control_server.host}:{control_server.port}/ (POST pause/resume/stop/flush，GET metrics)[/dim]")
+                console.print(f"[dim]控制令牌 (请求头 X-Control-Token): {control_server.token}[/dim]")
+        except OSError as e:
+            console.print(f"[yellow]控制接口启动失败: {e}[/yellow]")
+        if self.negative_cache is None and NEGATIVE_CACHE_PATH:
+            try:
+                self.negative_cache = NegativeCache()
+                self.negative_cache.purge_expired()
+            except Exception as e:
+                console.print(f"[yellow]负缓存不可用: {e}[/yellow]")
+        if self.negative_cache:
+            self.negative_cache.skip_counts = {}
+        if self.shared_dedup is None and SHARED_DEDUP_PATH:
+            try:
+                self.shared_dedup = SharedDedup()
+                self.shared_dedup.purge_expired()
+            except Exception as e:
+                console.print(f"[yellow]共享查重存储不可用，仅使用本地查重: {e}[/yellow]")
+        # 运行日志: 每条合格数据立即落盘；Excel 由后台线程合并写入
+        try:
+            self.journal = RunJournal({"output_filename": self.output_filename, "category": self.config['category']})
+            console.print(f"[dim]运行日志: {self.journal.path} (崩溃后可用 python run_journal.py 重建 Excel)[/dim]")
+        except Exception as e:
+            console.print(f"[yellow]运行日志不可用: {e}[/yellow]")
+            self.journal = None
+        try:
+            self.decision_log = DecisionLog()
+        except Exception as e:
+            console.print(f"[yellow]决策日志不可用: {e}[/yellow]")
+            self.decision_log = None
+        self.excel_writer = ExcelMaterializer(self.save_data_to_excel,
+                                              on_error=lambda e: console.print(f"[red]后台保存 Excel 出错: {e}[/red]"))
+
+        # 浏览器在多轮之间复用 (通常已在输入提示期间预热)；未启动或已崩溃时在这里 (重新) 启动
+        session = self.session
+        async with session.round():
+            context, page = session.context, session.page
             
             console.print("[bold green]--- 自动化流程启动 ---[/bold green]")
+            zip_writer: Optional[CompanyZipWriter] = None
             
             try:
                 with Progress(
@@ -620,10 +994,14 @@ class LiepinScraper:
                 ) as progress:
                     
                     for company_info in self.target_companies_info:
+                        if self.stop_requested: break
                         target_company = company_info['name']
                         company_quota = company_info['quota']
                         current_company_qualified_count = 0
                         company_generated_files = []
+                        output_mode = self.config['output_mode']
+                        if output_mode != "files" and not self.snapshot_writer:
+                            zip_writer = CompanyZipWriter(target_company, self.config['zip_id'])
                         
                         task_id = progress.add_task(
                             f"[cyan]处理公司: {target_company}", 
@@ -633,12 +1011,21 @@ class LiepinScraper:
                         )
                         
                         briefing_text = self.briefing_template.replace('__COMPANY__', target_company)
+                        negative_contexts = {
+                            "login_date": self.config['earliest_login'],
+                            "departure": self.config['min_departure'],
+                            "company": target_company,
+                            "ai_no": briefing_hash(briefing_text),
+                        }
                         
                         # Fix: Handle empty position list - default to [""] to search all candidates
                         positions_to_search = self.target_positions if self.target_positions else [""]
                         
-                        for current_position in positions_to_search:
-                            if current_company_qualified_count >= company_quota: break
+                        # 浏览器中途崩溃时，当前关键词重新启动浏览器后再搜索一次
+                        pending_positions = list(positions_to_search)
+                        while pending_positions:
+                            current_position = pending_positions.pop(0)
+                            if current_company_qualified_count >= company_quota or self.stop_requested: break
                             
                             # Fix: Reset early stopping counter for each new position
                             consecutive_failure_count = 0
@@ -648,39 +1035,73 @@ class LiepinScraper:
 
                             position_display = current_position if current_position else "[所有职位]"
                             console.print(f"\n[dim]正在搜索职位: {position_display}[/dim]")
-                            await page.goto("https://h.liepin.com/search/getConditionItem")
-                            await page.fill('input#rc_select_1, input.search-input, input.company-position-input, .search-box, .search-input', f"{target_company} {current_position}")
-                            await page.click('button:has-text("搜 索"), button:has-text("搜索"), .search-btn, .submit-btn')
-                            
-                            await page.wait_for_load_state('networkidle', timeout=10000)
-                            await page.wait_for_timeout(3000)
+                            await session.ensure_ready()
+                            context, page = session.context, session.page
+                            with span("search", position=current_position):
+                                if session.fresh_search_page:
+                                    session.fresh_search_page = False
+                                else:
+                                    await page.goto(SEARCH_URL)
+                                await page.fill(SEARCH_INPUT_SELECTOR, f"{target_company} {current_position}")
+                                await page.click('button:has-text("搜 索"), button:has-text("搜索"), .search-btn, .submit-btn')
+                                
+                                await page.wait_for_load_state('networkidle', timeout=10000)
+                            with span("wait_search_fixed"):
+                                await page.wait_for_timeout(3000 * WAIT_SCALE)
                             
                             page_number = 1
                             while True:
-                                if consecutive_failure_count >= 10: break
+                                if consecutive_failure_count >= 10 or self.stop_requested: break
                                 
-                                await page.wait_for_timeout(1000)
-                                profile_links_locators = await page.locator(RESUME_LINK_SELECTOR).all()
+                                with span("list_page", page=page_number):
+                                    await page.wait_for_timeout(1000 * WAIT_SCALE)
+                                    profile_links_locators = await page.locator(RESUME_LINK_SELECTOR).all()
                                 
                                 if not profile_links_locators: break
                                 
                                 for i, link_locator in enumerate(profile_links_locators):
                                     if consecutive_failure_count >= 10: break
                                     
+                                    # 暂停时在此等待 (不轮询)，停止请求会同时唤醒
+                                    await self.resume_event.wait()
+                                    if self.stop_requested: break
+                                    
                                     with self.contacts_lock:
                                         self.processed_resumes_count += 1
-                                    
-                                    # Non-blocking pause check
-                                    while not self.pause_flag.is_set():
-                                        await asyncio.sleep(0.5)
+                                    self.metrics.processed(target_company)
                                     
                                     profile_page = None
+                                    reserved_signature = None
+                                    candidate_span = tracer.begin("candidate", company=target_company, index=self.processed_resumes_count)
+                                    candidate_started = time.perf_counter()
+                                    profile_key = None
+                                    decision_reason = "error"
+                                    decision_detail = None
+                                    ai_ms = None
                                     try:
-                                        async with context.expect_page() as new_page_info:
-                                            await link_locator.click(timeout=5000)
-                                        profile_page = await new_page_info.value
-                                        await profile_page.wait_for_load_state('domcontentloaded')
-                                        await profile_page.wait_for_timeout(2000)
+                                        with span("open_profile"):
+                                            async with context.expect_page() as new_page_info:
+                                                await link_locator.click(timeout=5000)
+                                            profile_page = await new_page_info.value
+                                            await profile_page.wait_for_load_state('domcontentloaded')
+                                        self.metrics.observe("open_profile", (time.perf_counter() - candidate_started) * 1000)
+                                        self.startup.mark("first_candidate")
+                                        
+                                        # 0. 负缓存: 之前已因相同条件被拒绝的简历直接跳过
+                                        profile_key = resume_key(profile_page.url)
+                                        if self.negative_cache:
+                                            with span("negative_cache"):
+                                                cached_reason = self.negative_cache.lookup([profile_key], negative_contexts)
+                                            if cached_reason:
+                                                console.print(f"[yellow]{REASON_LABELS[cached_reason]} (缓存)，跳过。[/yellow]")
+                                                decision_reason = "negative_cache"
+                                                decision_detail = cached_reason
+                                                consecutive_failure_count += 1
+                                                progress.update(task_id, processed=self.processed_resumes_count)
+                                                continue
+                                        
+                                        with span("wait_profile_fixed"):
+                                            await profile_page.wait_for_timeout(2000 * WAIT_SCALE)
                                         
                                         # --- Validation Logic (Optimized Order) ---
                                         
@@ -688,18 +1109,19 @@ class LiepinScraper:
                                         earliest_login_date = parse_login_date_input(self.config['earliest_login'])
                                         actual_login_date_str = "未知"
                                         try:
-                                            # 尝试使用更通用的选择器 (Ant Design Tab Extra Content)
-                                            login_area_text = await profile_page.locator("#resume-detail-single .ant-tabs-extra-content").text_content(timeout=3000)
-                                            match = re.search(r'(\d{4}/\d{2}/\d{2})', login_area_text)
-                                            
-                                            # 如果上面的失败，尝试在整个头部区域搜索日期模式
-                                            if not match:
-                                                header_text = await profile_page.locator("#resume-detail-single").text_content(timeout=3000)
-                                                # 搜索 "登录" 附近的日期，或者直接搜索日期格式 (假设最近的日期是登录时间)
-                                                # 这里假设登录时间通常在顶部，且格式为 YYYY/MM/DD
-                                                match = re.search(r'最后登录.*?(\d{4}/\d{2}/\d{2})', header_text)
+                                            with span("login_date"):
+                                                # 尝试使用更通用的选择器 (Ant Design Tab Extra Content)
+                                                login_area_text = await profile_page.locator("#resume-detail-single .ant-tabs-extra-content").text_content(timeout=3000)
+                                                match = re.search(r'(\d{4}/\d{2}/\d{2})', login_area_text)
+                                                
+                                                # 如果上面的失败，尝试在整个头部区域搜索日期模式
                                                 if not match:
-                                                    match = re.search(r'(\d{4}/\d{2}/\d{2})', header_text)
+                                                    header_text = await profile_page.locator("#resume-detail-single").text_content(timeout=3000)
+                                                    # 搜索 "登录" 附近的日期，或者直接搜索日期格式 (假设最近的日期是登录时间)
+                                                    # 这里假设登录时间通常在顶部，且格式为 YYYY/MM/DD
+                                                    match = re.search(r'最后登录.*?(\d{4}/\d{2}/\d{2})', header_text)
+                                                    if not match:
+                                                        match = re.search(r'(\d{4}/\d{2}/\d{2})', header_text)
 
                                             if not match: raise ValueError("无法解析日期")
                                             
@@ -708,12 +1130,15 @@ class LiepinScraper:
                                             
                                             if earliest_login_date and actual_login_date_dt < earliest_login_date:
                                                 console.print(f"[yellow]登录时间不符: {actual_login_date_str} (要求不晚于 {self.config['earliest_login']})[/yellow]")
+                                                self.record_reject("login_date", negative_contexts, profile_key)
+                                                decision_reason = "login_date"
                                                 consecutive_failure_count += 1
                                                 progress.update(task_id, processed=self.processed_resumes_count)
                                                 continue
                                         except Exception as e:
                                             if earliest_login_date:
                                                 console.print(f"[yellow]无法提取登录时间 (选择器可能失效): {e}[/yellow]")
+                                                decision_reason = "login_unparsed"
                                                 consecutive_failure_count += 1
                                                 progress.update(task_id, processed=self.processed_resumes_count)
                                                 continue
@@ -721,64 +1146,103 @@ class LiepinScraper:
                                         # 2. Work Time Check
                                         try:
                                             work_time_selector = 'div.work-time, .work-duration, .time-text, .work-time-text, .contact-time, span.rd-work-time'
-                                            raw_work_time = await profile_page.locator(work_time_selector).first.text_content(timeout=5000)
+                                            with span("work_time"):
+                                                raw_work_time = await profile_page.locator(work_time_selector).first.text_content(timeout=5000)
                                             work_time = format_work_time(raw_work_time)
                                             if not is_departure_date_ok(work_time, self.config['min_departure']):
                                                 console.print(f"[yellow]离职时间不符: {work_time} (要求不早于 {self.config['min_departure']})[/yellow]")
+                                                self.record_reject("departure", negative_contexts, profile_key)
+                                                decision_reason = "departure"
                                                 consecutive_failure_count += 1
                                                 progress.update(task_id, processed=self.processed_resumes_count)
                                                 continue
                                         except Exception as e:
                                             console.print(f"[yellow]无法提取工作时间 (选择器可能失效): {e}[/yellow]")
+                                            decision_reason = "work_time_unparsed"
                                             consecutive_failure_count += 1
                                             progress.update(task_id, processed=self.processed_resumes_count)
                                             continue
 
                                         # 3. Extract Name, Title, Company for field-based checks
-                                        name = await profile_page.locator('div.resume-preview-name, .person-name, .resume-name, .name-text, .contact-name, h4.name').first.text_content(timeout=5000)
-                                        clean_name = name.strip().replace("*", "")
+                                        with span("extract_fields"):
+                                            name = await profile_page.locator('div.resume-preview-name, .person-name, .resume-name, .name-text, .contact-name, h4.name').first.text_content(timeout=5000)
+                                            clean_name = name.strip().replace("*", "")
                                         
-                                        gender = ""
-                                        try:
-                                            info_text = await profile_page.locator('div.basic-cont > div.sep-info').first.inner_text(timeout=5000)
-                                            gender = re.search(r'\s*(男|女)\s*', info_text).group(1)
-                                        except: pass
+                                            gender = ""
+                                            try:
+                                                info_text = await profile_page.locator('div.basic-cont > div.sep-info').first.inner_text(timeout=5000)
+                                                gender = re.search(r'\s*(男|女)\s*', info_text).group(1)
+                                            except: pass
                                         
-                                        should_format_name = self.config['format_name'].lower() == 'y'
-                                        if should_format_name:
-                                            clean_name = format_name_to_initials(clean_name, gender)
-                                        elif gender and "先生" not in clean_name and "女士" not in clean_name:
-                                            clean_name += f"{gender}士" if gender == "女" else "先生"
+                                            should_format_name = self.config['format_name'].lower() == 'y'
+                                            if should_format_name:
+                                                clean_name = format_name_to_initials(clean_name, gender)
+                                            elif gender and "先生" not in clean_name and "女士" not in clean_name:
+                                                clean_name += f"{gender}士" if gender == "女" else "先生"
                                         
-                                        title = await profile_page.locator('div.position-name, .work-position, .position-text, .position-title, .contact-position, h6.job-name').first.text_content(timeout=5000)
+                                            title = await profile_page.locator('div.position-name, .work-position, .position-text, .position-title, .contact-position, h6.job-name').first.text_content(timeout=5000)
                                         
-                                        company_selector = 'div.company-name, .work-company, .company-text, .company-title, .contact-company, div.rd-work-comp > h5'
-                                        company = await profile_page.locator(company_selector).first.text_content(timeout=5000)
+                                            company_selector = 'div.company-name, .work-company, .company-text, .company-title, .contact-company, div.rd-work-comp > h5'
+                                            company = await profile_page.locator(company_selector).first.text_content(timeout=5000)
                                         
                                         # 4. Company Check (before AI to save API calls)
                                         if target_company.lower() not in company.lower():
                                             console.print(f"[yellow]公司名称不符: {company.strip()} (要求包含 {target_company})[/yellow]")
+                                            self.record_reject("company", negative_contexts, profile_key)
+                                            decision_reason = "company"
                                             consecutive_failure_count += 1
                                             progress.update(task_id, processed=self.processed_resumes_count)
                                             continue
                                         
                                         # 5. Deduplication Check (before AI to save API calls)
-                                        candidate_signature = (extract_name_first_char(clean_name), title.strip(), work_time.strip())
-                                        if candidate_signature in self.seen_candidates:
-                                            console.print(f"[yellow]发现重复候选人: {clean_name} - {title}，跳过 (节省AI额度)。[/yellow]")
+                                        with span("dedup"):
+                                            candidate_signature = build_candidate_signature(clean_name, title, work_time)
+                                            is_duplicate = candidate_signature in self.seen_candidates
+                                        if is_duplicate:
+                                            fuzzy_match = getattr(self.seen_candidates, 'last_fuzzy_match', None)
+                                            similar_note = f" (相似职位: {fuzzy_match})" if fuzzy_match else ""
+                                            console.print(f"[yellow]发现重复候选人: {clean_name} - {title}{similar_note}，跳过 (节省AI额度)。[/yellow]")
+                                            decision_reason = "duplicate"
                                             # Note: Do NOT increment consecutive_failure_count for duplicates
                                             progress.update(task_id, processed=self.processed_resumes_count)
                                             continue
                                         
+                                        # 5a. 相同提纲下 AI 已判断不匹配的候选人 (可能来自另一个关键词/另一份简历链接)
+                                        if self.negative_cache and self.negative_cache.lookup([negative_signature_key(candidate_signature)], {"ai_no": negative_contexts["ai_no"]}):
+                                            console.print(f"[yellow]{REASON_LABELS['ai_no']} (缓存): {clean_name} - {title}，跳过。[/yellow]")
+                                            decision_reason = "ai_no_cached"
+                                            consecutive_failure_count += 1
+                                            progress.update(task_id, processed=self.processed_resumes_count)
+                                            continue
+                                        
+                                        # 5b. 多实例共享查重: 原子占用，避免其他正在运行的实例重复处理同一候选人
+                                        if self.shared_dedup:
+                                            with span("shared_reserve"):
+                                                reserved = self.shared_dedup.reserve(candidate_signature)
+                                            if not reserved:
+                                                console.print(f"[yellow]候选人已被其他实例处理: {clean_name} - {title}，跳过。[/yellow]")
+                                                decision_reason = "shared_conflict"
+                                                progress.update(task_id, processed=self.processed_resumes_count)
+                                                continue
+                                            reserved_signature = candidate_signature
+                                        
                                         # 6. AI Check (LAST - most expensive operation)
-                                        cv_text = await profile_page.locator(CV_TEXT_SELECTOR).text_content(timeout=5000)
+                                        with span("cv_text"):
+                                            cv_text = await profile_page.locator(CV_TEXT_SELECTOR).text_content(timeout=5000)
+                                        ai_started = time.perf_counter()
                                         match_result = is_match_volc(cv_text, briefing_text)
+                                        ai_ms = (time.perf_counter() - ai_started) * 1000
+                                        self.metrics.ai_result(match_result)
+                                        self.metrics.observe("ai_match", ai_ms)
                                         if match_result is None:
                                             console.print("[yellow]AI API 失败，跳过此候选人[/yellow]")
+                                            decision_reason = "ai_error"
                                             consecutive_failure_count += 1
                                             progress.update(task_id, processed=self.processed_resumes_count)
                                             continue
                                         elif not match_result:
+                                            self.record_reject("ai_no", negative_contexts, profile_key, negative_signature_key(candidate_signature))
+                                            decision_reason = "ai_no"
                                             consecutive_failure_count += 1
                                             progress.update(task_id, processed=self.processed_resumes_count)
                                             continue
@@ -788,26 +1252,60 @@ class LiepinScraper:
                                         # Name/Title/Gender/Company already extracted above
                                         
                                         # --- 先尝试保存 docx，成功后才记录数据 ---
-                                        full_html = await profile_page.content()
+                                        docx_mode = self.config['docx_mode']
+                                        with span("collect_content"):
+                                            docx_fields = None
+                                            if docx_mode == "template" or self.snapshot_writer:
+                                                docx_fields = {
+                                                    "姓名": clean_name,
+                                                    "在职公司": company.strip(),
+                                                    "职位": title.strip(),
+                                                    "在职时间": work_time.strip(),
+                                                    "Profile": summarized_profile,
+                                                    "工作经历": await profile_page.locator(WORK_ITEM_SELECTOR).all_inner_texts(),
+                                                    "教育经历": await profile_page.locator(EDU_ITEM_SELECTOR).all_inner_texts(),
+                                                    "简历链接": profile_page.url,
+                                                    "最后一次登录时间": actual_login_date_str,
+                                                }
+                                                docx_mode = resolve_docx_mode(docx_mode, docx_fields, clean_name)
+                                            # 延迟渲染时始终保存 HTML，方便以后用新的转换器重新生成
+                                            full_html = await profile_page.content() if docx_mode == "html" or self.snapshot_writer else ""
                                         
                                         # 使用临时序号生成文件名 (基于当前合格数+1)
                                         temp_seq = self.qualified_resumes_count + 1
                                         base_filename = f"{temp_seq}-猎聘-{clean_name}"
-                                        docx_filename = os.path.join('resumes', f"{base_filename}.docx")
-                                        counter = 1
-                                        while os.path.exists(docx_filename):
-                                            docx_filename = os.path.join('resumes', f"{base_filename}-{counter}.docx")
-                                            counter += 1
                                         
-                                        # 尝试保存 docx (带重试机制)
-                                        if not save_resume_as_docx(full_html, docx_filename):
-                                            console.print(f"[red]--- 由于 docx 保存失败，跳过此候选人: {clean_name} ---[/red]")
-                                            consecutive_failure_count += 1
-                                            progress.update(task_id, processed=self.processed_resumes_count)
-                                            continue
+                                        if self.snapshot_writer:
+                                            # 延迟渲染: 只保存压缩 HTML 与元数据，docx/zip 由 batch_render.py 生成
+                                            try:
+                                                with span("snapshot"):
+                                                    docx_filename = self.snapshot_writer.add(base_filename, full_html, docx_fields, target_company, self.config['zip_id'], docx_mode)
+                                            except Exception as e:
+                                                console.print(f"[red]--- 保存简历快照失败，跳过此候选人: {clean_name} ({e}) ---[/red]")
+                                                decision_reason = "save_failed"
+                                                consecutive_failure_count += 1
+                                                progress.update(task_id, processed=self.processed_resumes_count)
+                                                continue
+                                        else:
+                                            if zip_writer and output_mode == "stream":
+                                                docx_filename = os.path.join('resumes', zip_writer.unique_name(base_filename))
+                                            else:
+                                                docx_filename = next_available_path('resumes', base_filename, ".docx")
+                                            
+                                            # 尝试保存 docx (带重试机制)
+                                            if not save_resume_as_docx(full_html, docx_filename, mode=docx_mode, fields=docx_fields,
+                                                                       zip_writer=zip_writer, keep_file=output_mode != "stream"):
+                                                console.print(f"[red]--- 由于 docx 保存失败，跳过此候选人: {clean_name} ---[/red]")
+                                                decision_reason = "save_failed"
+                                                consecutive_failure_count += 1
+                                                progress.update(task_id, processed=self.processed_resumes_count)
+                                                continue
                                         
                                         # --- docx 保存成功，正式记录数据 ---
                                         self.seen_candidates.add(candidate_signature)
+                                        if reserved_signature:
+                                            self.shared_dedup.commit(reserved_signature)
+                                            reserved_signature = None
                                         company_generated_files.append(docx_filename)
                                         
                                         contact_info = "未查看"
@@ -815,23 +1313,33 @@ class LiepinScraper:
                                         if should_view_phone:
                                             contact_info = "需手动查看" 
                                         
+                                        contact_row = {
+                                            "分类": self.config['category'],
+                                            "公司": target_company,
+                                            "姓名": clean_name,
+                                            "职位": title.strip(),
+                                            "在职公司": company.strip(),
+                                            "在职时间": work_time.strip(),
+                                            "云号码": contact_info,
+                                            "简历链接": profile_page.url,
+                                            "Profile": summarized_profile, 
+                                            "是否合作": "否",
+                                            "最后一次登录时间": actual_login_date_str
+                                        }
+                                        if self.journal:
+                                            try:
+                                                with span("journal"):
+                                                    self.journal.append(contact_row)
+                                            except Exception as e:
+                                                console.print(f"[red]写入运行日志失败: {e}[/red]")
                                         with self.contacts_lock:
-                                            self.saved_contacts.append({
-                                                "分类": self.config['category'],
-                                                "公司": target_company,
-                                                "姓名": clean_name,
-                                                "职位": title.strip(),
-                                                "在职公司": company.strip(),
-                                                "在职时间": work_time.strip(),
-                                                "云号码": contact_info,
-                                                "简历链接": profile_page.url,
-                                                "Profile": summarized_profile, 
-                                                "是否合作": "否",
-                                                "最后一次登录时间": actual_login_date_str
-                                            })
+                                            self.saved_contacts.append(contact_row)
                                             self.qualified_resumes_count += 1
                                             current_company_qualified_count += 1
+                                        self.metrics.qualified(target_company)
+                                        self.excel_writer.request()
                                         
+                                        decision_reason = "qualified"
                                         consecutive_failure_count = 0
                                         progress.update(task_id, advance=1, qualified=self.qualified_resumes_count, processed=self.processed_resumes_count)
                                         
@@ -840,39 +1348,79 @@ class LiepinScraper:
 
                                     except Exception as e:
                                         console.print(f"[red]处理出错: {e}[/red]")
+                                        if not session.connected(): break
                                     finally:
-                                        if profile_page: await profile_page.close()
+                                        if reserved_signature:
+                                            # 未成功保存 (不匹配/出错)，释放占用
+                                            self.shared_dedup.release(reserved_signature)
+                                        self.metrics.observe("candidate", (time.perf_counter() - candidate_started) * 1000)
+                                        if self.decision_log:
+                                            self.decision_log.log(decision_reason, key=profile_key, company=target_company,
+                                                                  keyword=current_position, page=page_number, detail=decision_detail,
+                                                                  elapsed_ms=round((time.perf_counter() - candidate_started) * 1000),
+                                                                  ai_ms=round(ai_ms) if ai_ms is not None else None)
+                                        if profile_page and session.connected():
+                                            try: await profile_page.close()
+                                            except Exception: pass
                                         # Non-blocking random sleep
-                                        await asyncio.sleep(random.uniform(3, 7))
+                                        with span("pacing_sleep"):
+                                            await asyncio.sleep(random.uniform(3, 7) * WAIT_SCALE)
+                                        candidate_span.end()
                                 
-                                if current_company_qualified_count >= company_quota: break
+                                if current_company_qualified_count >= company_quota or self.stop_requested or not session.connected(): break
                                 
                                 # Use simplified selector (tested and verified)
                                 next_btn = page.locator("li.ant-pagination-next:not(.ant-pagination-disabled) button")
                                 if await next_btn.count() > 0:
-                                    await next_btn.click()
-                                    await page.wait_for_load_state('networkidle')
+                                    with span("next_page"):
+                                        await next_btn.click()
+                                        await page.wait_for_load_state('networkidle')
                                     page_number += 1
                                 else:
                                     break
+                            
+                            if not session.connected() and not self.stop_requested:
+                                console.print(f"[yellow]浏览器已断开，重新启动后重新搜索: {position_display}[/yellow]")
+                                pending_positions.insert(0, current_position)
 
                         
                         # Stop the timer for this company (regardless of quota or early stop)
                         progress.stop_task(task_id)
                         
-                        if company_generated_files:
-                            zip_identifier = self.config['zip_id']
-                            zip_name = os.path.join('zips', f"猎聘-{target_company}-{len(company_generated_files)}份-{zip_identifier}.zip")
-                            counter = 1
-                            base = zip_name.replace(".zip", "")
-                            while os.path.exists(zip_name):
-                                zip_name = f"{base}-{counter}.zip"
-                                counter += 1
+                        if zip_writer:
+                            zip_writer.close()
+                            zip_writer = None
+                        elif company_generated_files and not self.snapshot_writer:
+                            zip_name = company_zip_path(target_company, len(company_generated_files), self.config['zip_id'])
                             zip_company_files(target_company, company_generated_files, zip_name)
 
+                if self.snapshot_writer:
+                    console.print(f"[bold]简历快照已保存到 {self.snapshot_writer.dir}，运行 python batch_render.py {self.snapshot_writer.dir} 生成 docx 与 zip[/bold]")
+
             finally:
+                if self.shared_dedup:
+                    self.shared_dedup.release_all()
+                if self.negative_cache and self.negative_cache.skip_counts:
+                    skipped = ", ".join(f"{REASON_LABELS[r]} {n}" for r, n in self.negative_cache.skip_counts.items())
+                    console.print(f"[bold]--- 本次运行负缓存跳过: {skipped} ---[/bold]")
+                if zip_writer:
+                    # 中途退出时也保留已写入的简历
+                    zip_writer.close()
+                self.excel_writer.close(flush_pending=False)
                 self.save_data_to_excel()
-                await browser.close()
+                if self.journal:
+                    self.journal.close()
+                if self.decision_log:
+                    self.decision_log.close()
+                    console.print(f"[dim]决策日志: {self.decision_log.path} (python decisions.py 查看筛选漏斗)[/dim]")
+                self.report_startup()
+                if tracer.enabled and tracer.events:
+                    self.report_trace()
+                if diagnostics:
+                    self.report_diagnostics(diagnostics.stop())
+                if control_server:
+                    await control_server.close()
+                self.loop = None
 
     def start(self):
         # Keyboard listener thread
@@ -881,47 +1429,77 @@ class LiepinScraper:
                 from pynput import keyboard
                 def on_press(key):
                     try:
-                        if key == keyboard.Key.esc:
-                            if self.pause_flag.is_set():
-                                console.print("\n[yellow]--- 暂停中... ---[/yellow]")
-                                self.pause_flag.clear()
-                                self.save_data_to_excel()
-                            else:
-                                console.print("\n[green]--- 继续运行 ---[/green]")
-                                self.pause_flag.set()
-                    except AttributeError: pass
+                        # 交给事件循环处理，不在监听线程中直接操作状态或保存文件
+                        loop = self.loop
+                        if key == keyboard.Key.esc and loop:
+                            loop.call_soon_threadsafe(self.toggle_pause)
+                    except (AttributeError, RuntimeError): pass
                 with keyboard.Listener(on_press=on_press) as listener:
                     listener.join()
             except ImportError:
                 console.print("pynput未安装")
+            except Exception as e:
+                console.print(f"[dim]键盘监听不可用 ({e})，可使用控制接口暂停/继续[/dim]")
 
         listener_thread = threading.Thread(target=keyboard_listener, daemon=True)
         listener_thread.start()
         
         console.rule("[bold blue]猎聘简历自动化助手[/bold blue]")
-        self.ensure_browsers_installed()
+        ensure_browsers_installed(console.print)
+        # 事件循环在后台线程常驻: 浏览器启动、历史加载与下面的输入提示并行进行
+        runner = EventLoopThread()
+        first_round = True
         
-        while True:
-            try:
-                if Confirm.ask("是否需要重新登录/更新Cookie?"):
-                    asyncio.run(self.save_session())
-                
-                if Confirm.ask("是否清空 data, resumes, zips 文件夹下的所有内容? (y=清空, n=归档)"):
-                    self.clear_output_directories()
-                else:
-                    self.archive_output_directories()
-                
-                self.load_historical_data()
-                self.get_user_inputs()
+        try:
+            while True:
+                self.startup = StartupTimer(PROCESS_STARTED if first_round else None)
+                first_round = False
+                warm_up = None
+                try:
+                    self.startup.mark("prompt")
+                    if Confirm.ask("是否需要重新登录/更新Cookie?"):
+                        runner.run(self.save_session())
+                    if os.path.exists("state.json"):
+                        # 首轮启动浏览器；之后的轮次复用，只做健康检查并重新打开搜索页
+                        warm_up = runner.submit(self.session.prepare())
+                    
+                    if Confirm.ask("是否清空 data, resumes, zips 文件夹下的所有内容? (y=清空, n=归档)"):
+                        self.clear_output_directories()
+                    else:
+                        self.archive_output_directories()
+                    
+                    history = self.preload_history()
+                    self.get_user_inputs()
+                    self.startup.mark("inputs_done")
+                    self.finish_history(history, runner)
+                    self.finish_warm_up(warm_up, runner)
+                    warm_up = None
+                    
+                    runner.run(self.run_scraper())
+                except Exception as e:
+                    console.print(f"[red]运行出错: {e}[/red]")
+                finally:
+                    if warm_up:
+                        # 输入阶段出错: 等预热结束，浏览器留给下一轮
+                        try: runner.result(warm_up)
+                        except Exception: pass
                 
-                self.pause_flag.set()
-                asyncio.run(self.run_scraper())
-            except Exception as e:
-                console.print(f"[red]运行出错: {e}[/red]")
-            
-            if not Confirm.ask("是否开始新一轮搜索?"):
-                break
+                if not Confirm.ask("是否开始新一轮搜索?"):
+                    break
+        finally:
+            try: runner.run(self.session.shutdown())
+            except Exception: pass
+            runner.close()
 
 if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+    multiprocessing.freeze_support()  # PyInstaller 打包后 spawn 子进程 (历史索引并行读取) 需要
+    parser = argparse.ArgumentParser(description="猎聘简历自动化助手")
+    parser.add_argument("--diagnostics", action="store_true", default=None, help="检测事件循环阻塞并记录调用栈 (同 LIEPIN_DIAGNOSTICS=1)")
+    parser.add_argument("--profile", action="store_true", default=None, help="采样分析并输出火焰图数据 (同 LIEPIN_PROFILE=1)")
+    args = parser.parse_args()
+    configure_diagnostics(diagnostics=args.diagnostics, profile=args.profile)
+    
     scraper = LiepinScraper()
     scraper.start()
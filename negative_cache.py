@@ -0,0 +1,109 @@
+"""
+不合格候选人缓存 (负缓存)
+记录因登录时间、离职时间、公司名称或 AI 判断为 NO 而被跳过的简历，
+之后的运行/其他关键词再次遇到时直接跳过，不再重复提取和调用 AI
+
+每条记录带有“上下文”，只有在上下文相同时才复用：
+    login_date -> 最后登录时间筛选条件
+    departure  -> 最早离职时间筛选条件
+    company    -> 目标公司
+    ai_no      -> 访谈提纲的哈希 (提纲变化后 AI 结论不再有效)
+"""
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+NEGATIVE_CACHE_PATH = os.getenv("LIEPIN_NEGATIVE_CACHE", os.path.join(".cache", "negative_cache.sqlite3"))
+
+# 各原因的有效期 (天)
+NEGATIVE_CACHE_TTL_DAYS = {
+    "login_date": 3,     # 候选人随时可能重新登录
+    "departure": 30,
+    "company": 30,
+    "ai_no": 90,
+}
+
+REASON_LABELS = {
+    "login_date": "登录时间不符",
+    "departure": "离职时间不符",
+    "company": "公司名称不符",
+    "ai_no": "AI 判断不匹配",
+}
+
+RESUME_ID_RE = re.compile(r"res_id_encode=([^&#]+)")
+
+
+def resume_key(url: str) -> str:
+    """简历的稳定标识: 优先使用 URL 中的 res_id_encode，否则使用去掉锚点的 URL"""
+    match = RESUME_ID_RE.search(url or "")
+    return f"id:{match.group(1)}" if match else f"url:{(url or '').split('#')[0]}"
+
+
+def signature_key(signature: Tuple[str, str, str]) -> str:
+    return "sig:" + "\x1f".join(signature)
+
+
+def briefing_hash(briefing: str) -> str:
+    return hashlib.sha256(briefing.strip().encode('utf-8')).hexdigest()[:16]
+
+
+class NegativeCache:
+    """基于 SQLite 的负缓存"""
+
+    def __init__(self, db_path: str = NEGATIVE_CACHE_PATH, ttl_days: Optional[Dict[str, float]] = None):
+        self.db_path = db_path
+        self.ttl_days = dict(NEGATIVE_CACHE_TTL_DAYS, **(ttl_days or {}))
+        self.skip_counts: Dict[str, int] = {}
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rejects (
+                key TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                context TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (key, reason, context)
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def lookup(self, keys: Iterable[str], contexts: Dict[str, str]) -> Optional[str]:
+        """
+        查询任一 key 在对应上下文下是否有未过期的拒绝记录，返回原因 (并计入本次运行的跳过统计)
+        contexts: {原因: 当前上下文}，只检查其中列出的原因
+        """
+        now = time.time()
+        for key in keys:
+            for reason, context in contexts.items():
+                row = self.conn.execute(
+                    "SELECT created_at FROM rejects WHERE key = ? AND reason = ? AND context = ?",
+                    (key, reason, context)).fetchone()
+                if row and now - row[0] <= self.ttl_days.get(reason, 0) * 86400:
+                    self.skip_counts[reason] = self.skip_counts.get(reason, 0) + 1
+                    return reason
+        return None
+
+    def record(self, keys: Iterable[str], reason: str, context: str):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rejects (key, reason, context, created_at) VALUES (?, ?, ?, ?)",
+                ((key, reason, context, now) for key in keys if key))
+
+    def purge_expired(self) -> int:
+        """删除所有已过期的记录，返回删除条数"""
+        now = time.time()
+        removed = 0
+        with self.conn:
+            for reason, days in self.ttl_days.items():
+                removed += self.conn.execute(
+                    "DELETE FROM rejects WHERE reason = ? AND created_at < ?", (reason, now - days * 86400)).rowcount
+        return removed
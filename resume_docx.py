@@ -0,0 +1,601 @@
+"""
+简历 HTML -> Docx 转换扩展
+在 htmldocx.HtmlToDocx 的基础上增加图片缓存/并发预取等能力，供 main.py 使用
+"""
+
+import io
+import os
+import atexit
+import json
+import hashlib
+import threading
+import urllib.request
+import urllib.error
+import zipfile
+import argparse
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional, Tuple
+
+import docx
+from docx.shared import Pt, RGBColor
+from docx.oxml.ns import qn
+from bs4 import BeautifulSoup
+from htmldocx import HtmlToDocx
+from htmldocx.h2d import is_url, get_filename_from_url, remove_whitespace, font_styles, font_names
+
+# --- Image Fetch Configuration ---
+# fetch: 联网下载并缓存; cache: 只使用本地缓存; skip: 不插入任何图片
+IMAGE_POLICY = os.getenv("LIEPIN_IMAGE_POLICY", "fetch").lower()
+IMAGE_CACHE_DIR = os.getenv("LIEPIN_IMAGE_CACHE_DIR", os.path.join(".cache", "images"))
+IMAGE_TIMEOUT = float(os.getenv("LIEPIN_IMAGE_TIMEOUT", "5"))
+IMAGE_MAX_BYTES = int(os.getenv("LIEPIN_IMAGE_MAX_BYTES", str(2 * 1024 * 1024)))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("LIEPIN_IMAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+IMAGE_POLICIES = ("fetch", "cache", "skip")
+
+
+class ImageFetcher:
+    """
+    带缓存的图片下载器
+    - 按内容哈希 (sha256) 存盘，同一张头像/Logo 只存一份
+    - 内存 LRU + 磁盘 LRU (按访问时间淘汰)
+    - prefetch() 并发下载整个文档的图片，单个请求有超时和大小上限
+    - 失败的 URL 在本次进程内记为负缓存，不会反复请求
+    """
+
+    INDEX_FILE = "index.json"
+    # 索引累计这么多次改动后才写盘一次；其余在 close()/flush() 时写出
+    INDEX_FLUSH_EVERY = 32
+
+    def __init__(self, cache_dir: Optional[str] = IMAGE_CACHE_DIR, policy: str = IMAGE_POLICY,
+                 timeout: float = IMAGE_TIMEOUT, max_bytes: int = IMAGE_MAX_BYTES,
+                 max_workers: int = 8, memory_items: int = 256,
+                 disk_max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        if policy not in IMAGE_POLICIES:
+            raise ValueError(f"未知的图片策略: {policy} (可选: {', '.join(IMAGE_POLICIES)})")
+        self.policy = policy
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "failures": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()  # url -> bytes
+        self._failed: set = set()
+        self._inflight: Dict[str, Future] = {}
+        self._index: Dict[str, str] = {}  # url -> sha256
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()  # sha256 -> 字节数，按访问时间从旧到新
+        self._disk_bytes = 0
+        self._removed: set = set()  # 本进程淘汰的 sha256，写索引时从磁盘上的旧索引中一并去掉
+        self._index_dirty = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_index()
+            self._scan_disk()
+
+    # --- Disk index ---
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._index = {}
+
+    def _scan_disk(self):
+        """启动时遍历一次缓存目录，之后磁盘占用与 LRU 顺序都在内存中增量维护"""
+        blobs = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name == self.INDEX_FILE or name.endswith(".tmp"): continue
+                try: st = os.stat(os.path.join(root, name))
+                except OSError: continue
+                blobs.append((st.st_mtime, name, st.st_size))
+        self._blobs = OrderedDict((name, size) for _, name, size in sorted(blobs))
+        self._disk_bytes = sum(self._blobs.values())
+        self._evict_disk()
+
+    def _save_index(self):
+        # 与磁盘上的索引合并，避免多个进程 (batch_render.py) 互相覆盖对方新增的条目
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                merged = json.load(f)
+        except (FileNotFoundError, ValueError):
+            merged = {}
+        merged.update(self._index)
+        if self._removed:
+            merged = {u: d for u, d in merged.items() if d not in self._removed}
+        tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f)
+        os.replace(tmp_path, self._index_path())
+        self._index_dirty = 0
+
+    def _mark_index_dirty(self):
+        self._index_dirty += 1
+        if self._index_dirty >= self.INDEX_FLUSH_EVERY:
+            self._save_index()
+
+    def flush(self):
+        """把尚未写盘的索引改动写出"""
+        with self._lock:
+            if self.cache_dir and self._index_dirty:
+                self._save_index()
+
+    def _read_disk(self, digest: str) -> Optional[bytes]:
+        """读取缓存中的图片 (不持有锁)"""
+        path = self._blob_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # 刷新访问时间，下次启动扫描时保持 LRU 顺序
+        except OSError:
+            return None
+        return data
+
+    def _store_blob(self, data: bytes) -> str:
+        """把图片写入缓存目录 (不持有锁)，返回内容哈希"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _record_disk(self, url: str, digest: str, size: int):
+        """登记新写入的图片；只有超出上限时才淘汰"""
+        if digest in self._blobs:
+            self._blobs.move_to_end(digest)
+        else:
+            self._blobs[digest] = size
+            self._disk_bytes += size
+            self._removed.discard(digest)
+        self._index[url] = digest
+        self._mark_index_dirty()
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        removed = set()
+        while self._blobs and self._disk_bytes > self.disk_max_bytes:
+            digest, size = self._blobs.popitem(last=False)
+            try: os.remove(self._blob_path(digest))
+            except FileNotFoundError: pass
+            except OSError: continue
+            self._disk_bytes -= size
+            removed.add(digest)
+        if removed:
+            self.stats["evictions"] += len(removed)
+            self._removed |= removed
+            self._index = {u: d for u, d in self._index.items() if d not in removed}
+            self._mark_index_dirty()
+
+    # --- Memory LRU ---
+    def _remember(self, url: str, data: bytes):
+        self._memory[url] = data
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # --- Network ---
+    def _download(self, url: str) -> Optional[bytes]:
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > self.max_bytes:
+                    return None
+                data = response.read(self.max_bytes + 1)
+                if len(data) > self.max_bytes:
+                    return None
+                return data
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+
+    def _lookup(self, url: str) -> Optional[bytes]:
+        """只查缓存，不发请求；磁盘读取在锁外进行，不阻塞其他预取线程"""
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                self.stats["memory_hits"] += 1
+                return self._memory[url]
+            digest = self._index.get(url) if self.cache_dir else None
+        if not digest: return None
+        data = self._read_disk(digest)
+        if data is None: return None
+        with self._lock:
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+            self.stats["disk_hits"] += 1
+            self._remember(url, data)
+        return data
+
+    def _fetch(self, url: str) -> Optional[bytes]:
+        try:
+            data = self._lookup(url)
+            if data is not None: return data
+            with self._lock:
+                if url in self._failed: return None
+
+            data = self._download(url)
+            with self._lock:
+                if data is None:
+                    self._failed.add(url)
+                    self.stats["failures"] += 1
+                    return None
+                self.stats["downloads"] += 1
+                self._remember(url, data)
+            if self.cache_dir:
+                try:
+                    digest = self._store_blob(data)
+                except OSError:
+                    return data
+                with self._lock:
+                    self._record_disk(url, digest, len(data))
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def get(self, url: str) -> Optional[bytes]:
+        """返回图片字节；策略为 skip、下载失败、超时或超出大小上限时返回 None"""
+        if self.policy == "skip": return None
+        data = self._lookup(url)
+        if data is not None or self.policy == "cache": return data
+        with self._lock:
+            future = self._inflight.get(url)
+        if future is not None:
+            # 预取仍在进行中，等待它而不是重复下载
+            try: return future.result(timeout=self.timeout)
+            except Exception: return None
+        return self._fetch(url)
+
+    def prefetch(self, urls: Iterable[str]):
+        """并发下载尚未缓存的图片；最多等待一个超时周期，未完成的留在后台继续"""
+        if self.policy != "fetch": return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="img-fetch")
+        futures = []
+        for url in dict.fromkeys(urls):
+            if self._lookup(url) is not None: continue
+            with self._lock:
+                if url in self._failed: continue
+                future = self._inflight.get(url)
+                if future is None:
+                    future = self._executor.submit(self._fetch, url)
+                    self._inflight[url] = future
+            futures.append(future)
+        if futures:
+            wait(futures, timeout=self.timeout)
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.flush()
+
+
+_default_fetcher: Optional[ImageFetcher] = None
+
+def get_image_fetcher() -> ImageFetcher:
+    """进程内共享的图片下载器 (跨简历复用缓存)"""
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = ImageFetcher()
+        atexit.register(_default_fetcher.flush)
+    return _default_fetcher
+
+
+class ResumeHtmlToDocx(HtmlToDocx):
+    """
+    面向简历的 HtmlToDocx
+    - 使用 ImageFetcher 处理远程图片
+    - 相邻且格式相同的文本合并到同一个 w:r，减少 document.xml 体积
+    """
+
+    def __init__(self, fetcher: Optional[ImageFetcher] = None):
+        super().__init__()
+        self.fetcher = fetcher or get_image_fetcher()
+        self.prefetch_images = True
+        if self.fetcher.policy == "skip":
+            self.options['images'] = False
+
+    def copy_settings_from(self, other):
+        super().copy_settings_from(other)
+        self.options = dict(other.options)
+
+    def set_initial_attrs(self, document=None):
+        super().set_initial_attrs(document)
+        self.run = None
+        self._run_format: Optional[Tuple] = None
+
+    def _current_run_format(self) -> Tuple:
+        """当前文本的格式签名：外层 span 的 style + 字体相关标签"""
+        span_styles = tuple(span['style'] for span in self.tags['span'] if 'style' in span)
+        font_tags = tuple(sorted(tag for tag in self.tags if tag in font_styles or tag in font_names))
+        return span_styles, font_tags
+
+    def _can_extend_run(self, run_format: Tuple) -> bool:
+        run = self.run
+        if run is None or self.paragraph is None: return False
+        r = run._r
+        if len(self.paragraph._p) == 0 or self.paragraph._p[-1] is not r: return False
+        if self._run_format is not None and self._run_format[0] is r:
+            return self._run_format[1] == run_format
+        # 段落起始处由 handle_starttag 创建的空 run，没有任何格式
+        return r.rPr is None and run_format == ((), ())
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+
+        # Only remove white space if we're not in a pre block.
+        if 'pre' not in self.tags:
+            data = remove_whitespace(data, True, True)
+
+        if not self.paragraph:
+            self.paragraph = self.doc.add_paragraph()
+
+        link = self.tags.get('a')
+        if link:
+            self.handle_link(link['href'], data)
+            return
+
+        run_format = self._current_run_format()
+        if self._can_extend_run(run_format):
+            self.run.add_text(data)
+            return
+
+        self.run = self.paragraph.add_run(data)
+        self._run_format = (self.run._r, run_format)
+        for span in self.tags['span']:
+            if 'style' in span:
+                self.add_styles_to_run(self.parse_dict_string(span['style']))
+
+        # add font style and name
+        for tag in run_format[1]:
+            if tag in font_styles:
+                setattr(self.run.font, font_styles[tag], True)
+            if tag in font_names:
+                self.run.font.name = font_names[tag]
+
+    def run_process(self, html):
+        if self.bs:
+            self.soup = BeautifulSoup(html, 'html.parser')
+            html = str(self.soup)
+            if self.prefetch_images and self.include_images:
+                # 先并发预取整份文档的图片，后续 handle_img 直接命中缓存
+                self.fetcher.prefetch(img['src'] for img in self.soup.find_all('img', src=True) if is_url(img['src']))
+        if self.include_tables:
+            self.get_tables()
+        self.feed(html)
+
+    def handle_img(self, current_attrs):
+        if not self.include_images:
+            # <img> 没有结束标签，直接忽略即可
+            return
+        src = current_attrs.get('src', '')
+        src_is_url = is_url(src)
+        data = self.fetcher.get(src) if src_is_url else None
+        image = io.BytesIO(data) if data else (None if src_is_url else src)
+        if image:
+            try:
+                if isinstance(self.doc, docx.document.Document):
+                    self.doc.add_picture(image)
+                else:
+                    self.add_image_to_cell(self.doc, image)
+            except Exception:
+                # 文件不存在或图片格式不受支持
+                image = None
+        if not image:
+            label = src if src_is_url else get_filename_from_url(src)
+            self.doc.add_paragraph("<image: %s>" % label)
+
+    def handle_table(self):
+        """与 HtmlToDocx.handle_table 相同，但单元格使用同类解析器以共享图片缓存"""
+        table_soup = self.tables[self.table_no]
+        rows, cols = self.get_table_dimensions(table_soup)
+        self.table = self.doc.add_table(rows, cols)
+
+        if self.table_style:
+            try:
+                self.table.style = self.table_style
+            except KeyError as e:
+                raise ValueError(f"Unable to apply style {self.table_style}.") from e
+
+        for cell_row, row in enumerate(self.get_table_rows(table_soup)):
+            for cell_col, col in enumerate(self.get_table_columns(row)):
+                cell_html = self.get_cell_html(col)
+                if col.name == 'th':
+                    cell_html = "<b>%s</b>" % cell_html
+                child_parser = self.__class__(fetcher=self.fetcher)
+                child_parser.copy_settings_from(self)
+                child_parser.prefetch_images = False  # 父文档已预取
+                child_parser.add_html_to_cell(cell_html, self.table.cell(cell_row, cell_col))
+
+        # skip all tags until corresponding closing tag
+        self.instances_to_skip = len(table_soup.find_all('table'))
+        self.skip_tag = 'table'
+        self.skip = True
+        self.table = None
+
+
+def docx_stats(doc) -> Dict[str, int]:
+    """统计文档中的 w:r 数量以及 document.xml 的字节数"""
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    with zipfile.ZipFile(buffer) as zf:
+        xml_size = zf.getinfo('word/document.xml').file_size
+    runs = len(doc.element.body.xpath('.//w:r'))
+    return {"runs": runs, "document_xml_bytes": xml_size, "docx_bytes": buffer.tell()}
+
+
+# --- Template Mode ---
+TEMPLATE_FONT = "Microsoft YaHei"
+TEMPLATE_ACCENT = RGBColor(0x1F, 0x4E, 0x79)
+DOCX_MODES = ("html", "template")
+
+
+def _set_run_font(run, size: Optional[float] = None, bold: bool = False, color: Optional[RGBColor] = None):
+    run.font.name = TEMPLATE_FONT
+    run._element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), TEMPLATE_FONT)
+    if size: run.font.size = Pt(size)
+    if bold: run.font.bold = True
+    if color is not None: run.font.color.rgb = color
+
+
+def _add_section(doc, title: str, lines: Iterable[str], bullet: bool = False):
+    lines = [line.strip() for line in lines if line and line.strip()]
+    if not lines: return
+    heading = doc.add_paragraph()
+    heading.paragraph_format.space_before = Pt(10)
+    _set_run_font(heading.add_run(title), size=12, bold=True, color=TEMPLATE_ACCENT)
+    for line in lines:
+        paragraph = doc.add_paragraph(style='List Bullet' if bullet else None)
+        paragraph.paragraph_format.space_after = Pt(2)
+        _set_run_font(paragraph.add_run(line), size=10.5)
+
+
+def render_resume_template(fields: Dict) -> "docx.document.Document":
+    """
+    根据已提取的结构化字段直接生成简历 Docx (不解析 HTML)
+    fields: 姓名/在职公司/职位/在职时间/Profile/工作经历/教育经历/简历链接/最后一次登录时间
+    """
+    doc = docx.Document()
+    normal = doc.styles['Normal']
+    normal.font.name = TEMPLATE_FONT
+    normal.font.size = Pt(10.5)
+    normal.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), TEMPLATE_FONT)
+
+    title = doc.add_paragraph()
+    _set_run_font(title.add_run(fields.get("姓名", "")), size=18, bold=True, color=TEMPLATE_ACCENT)
+    current = " | ".join(v for v in (fields.get("在职公司", ""), fields.get("职位", ""), fields.get("在职时间", "")) if v)
+    if current:
+        _set_run_font(doc.add_paragraph().add_run(current), size=11)
+
+    _add_section(doc, "AI Profile", str(fields.get("Profile", "")).splitlines())
+    _add_section(doc, "工作经历", fields.get("工作经历") or [], bullet=True)
+    _add_section(doc, "教育经历", fields.get("教育经历") or [], bullet=True)
+
+    footer = [f"简历链接: {fields['简历链接']}" if fields.get("简历链接") else "",
+              f"最后一次登录时间: {fields['最后一次登录时间']}" if fields.get("最后一次登录时间") else ""]
+    _add_section(doc, "其他信息", footer)
+    return doc
+
+
+# --- Deferred Rendering Snapshots ---
+SNAPSHOT_ROOT = "snapshots"
+SNAPSHOT_MANIFEST = "manifest.jsonl"
+
+
+class SnapshotWriter:
+    """
+    延迟渲染: 抓取时只保存压缩后的简历 HTML + 元数据，稍后由 batch_render.py 批量生成 docx/zip
+    目录结构: snapshots/<run_id>/manifest.jsonl + 00001.html.gz ...
+    """
+
+    def __init__(self, root: str = SNAPSHOT_ROOT, run_id: Optional[str] = None):
+        from datetime import datetime
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.dir = os.path.join(root, self.run_id)
+        os.makedirs(self.dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.dir, SNAPSHOT_MANIFEST)
+        self._names = set()
+        self._count = 0
+        for entry in load_snapshot_manifest(self.dir):
+            self._names.add(entry["docx_name"])
+            self._count += 1
+
+    def add(self, base_name: str, html: str, fields: Dict, company: str, zip_id: str, mode: str) -> str:
+        """保存一份快照，返回在本次运行内唯一的 docx 文件名"""
+        import gzip
+        docx_name = f"{base_name}.docx"
+        counter = 1
+        while docx_name in self._names:
+            docx_name = f"{base_name}-{counter}.docx"
+            counter += 1
+
+        self._count += 1
+        html_file = f"{self._count:05d}.html.gz"
+        with gzip.open(os.path.join(self.dir, html_file), 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(html)
+        entry = {"docx_name": docx_name, "html_file": html_file, "company": company,
+                 "zip_id": zip_id, "mode": mode, "fields": fields}
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._names.add(docx_name)
+        return docx_name
+
+
+def load_snapshot_manifest(run_dir: str) -> list:
+    path = os.path.join(run_dir, SNAPSHOT_MANIFEST)
+    if not os.path.exists(path): return []
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            try: entries.append(json.loads(line))
+            except ValueError: continue  # 崩溃时写了一半的行
+    return entries
+
+
+def read_snapshot_html(run_dir: str, entry: Dict) -> str:
+    import gzip
+    with gzip.open(os.path.join(run_dir, entry["html_file"]), 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+if __name__ == '__main__':
+    import time
+    arg_parser = argparse.ArgumentParser(description='对比 htmldocx 原始转换与合并 run 后的 docx 体积')
+    arg_parser.add_argument('filename_html', help='待转换的 .html 文件')
+    arg_parser.add_argument('--bench', type=int, default=0, help='额外对比 html/template 两种模式的平均耗时 (重复次数)')
+    args = arg_parser.parse_args()
+    from main import clean_resume_html  # 与 save_resume_as_docx 相同的预处理，测量的是实际转换的输入
+    with open(args.filename_html, 'r', encoding='utf-8') as infile:
+        html = clean_resume_html(infile.read())
+
+    offline = ImageFetcher(cache_dir=None, policy='skip')
+    baseline = HtmlToDocx()
+    baseline.options['images'] = False
+    before_doc = docx.Document()
+    baseline.add_html_to_document(html, before_doc)
+    after_doc = docx.Document()
+    ResumeHtmlToDocx(offline).add_html_to_document(html, after_doc)
+
+    before, after = docx_stats(before_doc), docx_stats(after_doc)
+    for key in before:
+        print(f"{key:<20} {before[key]:>10} -> {after[key]:>10}")
+
+    if args.bench:
+        text = BeautifulSoup(html, 'html.parser').get_text("\n", strip=True).splitlines()
+        sample_fields = {"姓名": "Z先生", "在职公司": "示例公司", "职位": "产品经理", "在职时间": "21/3-Present",
+                         "Profile": "\n".join(text[:6]), "工作经历": text[6:16], "教育经历": text[16:19]}
+        timings = {}
+        for mode in DOCX_MODES:
+            start = time.perf_counter()
+            for _ in range(args.bench):
+                if mode == "html":
+                    doc = docx.Document()
+                    ResumeHtmlToDocx(offline).add_html_to_document(html, doc)
+                else:
+                    doc = render_resume_template(sample_fields)
+                doc.save(io.BytesIO())
+            timings[mode] = (time.perf_counter() - start) / args.bench * 1000
+        for mode, ms in timings.items():
+            print(f"{mode:<10} {ms:>8.1f} ms/份")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+运行日志 (Journal)
+每条合格数据在确认后立即以 JSONL 追加写入 journals/<运行时间>.jsonl 并 fsync，
+程序崩溃也不会丢失已处理的数据；Excel 由后台线程按固定间隔合并生成。
+
+从日志重建 Excel:
+    python run_journal.py journals/20260101_120000.jsonl [-o data/恢复.xlsx]
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+JOURNAL_DIR = "journals"
+EXCEL_FLUSH_INTERVAL = float(os.getenv("LIEPIN_EXCEL_FLUSH_INTERVAL", "30"))
+
+
+class RunJournal:
+    """只追加的 JSONL 日志，第一行为运行元数据，之后每行一条合格数据"""
+
+    def __init__(self, meta: Dict, journal_dir: str = JOURNAL_DIR, run_id: Optional[str] = None):
+        os.makedirs(journal_dir, exist_ok=True)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(journal_dir, f"{self.run_id}.jsonl")
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._write({"type": "meta", **meta})
+
+    def _write(self, record: Dict):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def append(self, row: Dict):
+        self._write({"type": "row", "row": row})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_journal(path: str) -> Tuple[Dict, List[Dict]]:
+    """读取日志，返回 (元数据, 数据行)；忽略崩溃时写了一半的最后一行"""
+    meta, rows = {}, []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try: record = json.loads(line)
+            except ValueError: continue
+            if record.get("type") == "meta": meta.update(record)
+            elif record.get("type") == "row": rows.append(record["row"])
+    return meta, rows
+
+
+class ExcelMaterializer:
+    """
+    后台 Excel 写入线程
+    request() 只做标记，线程在 interval 秒内合并多次请求后调用一次 flush；
+    request(immediate=True) 跳过合并等待，尽快写出 (暂停/手动保存时使用)
+    """
+
+    def __init__(self, flush: Callable[[], None], interval: float = EXCEL_FLUSH_INTERVAL,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self._flush = flush
+        self.interval = interval
+        self.on_error = on_error
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._now = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="excel-writer", daemon=True)
+        self._thread.start()
+
+    def request(self, immediate: bool = False):
+        self._dirty.set()
+        if immediate: self._now.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._dirty.wait(timeout=0.5): continue
+            self._now.wait(self.interval)
+            if self._stop.is_set(): break
+            self._now.clear()
+            self._dirty.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                if self.on_error: self.on_error(e)
+
+    def close(self, flush_pending: bool = True):
+        """停止线程；flush_pending=True 时在当前线程写出尚未保存的数据"""
+        self._stop.set()
+        self._now.set()
+        self._thread.join()
+        if flush_pending and self._dirty.is_set():
+            self._dirty.clear()
+            self._flush()
+
+
+def rebuild_excel(journal_path: str, output_path: Optional[str] = None) -> Optional[str]:
+    """根据日志重新生成 Excel，返回输出路径"""
+    from main import console, build_contacts_dataframe, next_available_path
+
+    meta, rows = read_journal(journal_path)
+    if not rows:
+        console.print(f"[yellow]日志中没有数据: {journal_path}[/yellow]")
+        return None
+    if not output_path:
+        base = os.path.splitext(os.path.basename(meta.get("output_filename") or journal_path))[0]
+        output_path = next_available_path('data', f"{base}-恢复", ".xlsx")
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    build_contacts_dataframe(rows).to_excel(output_path, index=False, engine='openpyxl')
+    console.print(f"[green]已从日志重建 {len(rows)} 条数据: {output_path}[/green]")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从运行日志重建 Excel")
+    parser.add_argument("journal", nargs="?", help=f"日志文件 (默认: {JOURNAL_DIR}/ 下最新的一个)")
+    parser.add_argument("-o", "--output", help="输出 Excel 路径 (默认: data/<原文件名>-恢复.xlsx)")
+    args = parser.parse_args()
+
+    journal = args.journal
+    if not journal and os.path.isdir(JOURNAL_DIR):
+        journals = sorted(f for f in os.listdir(JOURNAL_DIR) if f.endswith(".jsonl"))
+        journal = os.path.join(JOURNAL_DIR, journals[-1]) if journals else None
+    if not journal:
+        print("没有找到运行日志")
+        sys.exit(1)
+    rebuild_excel(journal, args.output)
+
+
+if __name__ == "__main__":
+    main()
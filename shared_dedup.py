@@ -0,0 +1,126 @@
+"""
+多实例共享查重
+同一台机器上的多个 main.py 进程通过同一个本地 SQLite (WAL 模式) 文件协调，
+保证同一个候选人只被一个实例处理、只花一次 AI 额度：
+    reserve()  原子地检查并占用签名
+    commit()   成功保存后标记为已完成 (保留 LIEPIN_SHARED_DEDUP_DONE_DAYS 天)
+    release()  处理失败时释放占用
+WAL 依赖共享内存，不支持 NFS/SMB 等网络文件系统，不能用于跨机器协调。
+默认关闭，设置 LIEPIN_SHARED_DEDUP=1 (使用默认路径) 或指定文件路径后开启。
+"""
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+Signature = Tuple[str, str, str]
+
+DEFAULT_SHARED_DEDUP_PATH = os.path.join(".cache", "shared_dedup.sqlite3")
+
+
+def _shared_dedup_path() -> str:
+    value = os.getenv("LIEPIN_SHARED_DEDUP", "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return ""
+    if value.lower() in ("1", "true", "yes", "on"):
+        return DEFAULT_SHARED_DEDUP_PATH
+    return value
+
+
+# 为空表示关闭共享查重 (默认)
+SHARED_DEDUP_PATH = _shared_dedup_path()
+# 占用超时 (秒)，超过后视为持有者已崩溃，其他实例可以重新占用
+RESERVATION_TTL = float(os.getenv("LIEPIN_SHARED_DEDUP_TTL", "900"))
+# 已完成记录的保留天数，过期后可再次处理 (与本地历史记录一样会被「清空」清除)
+COMMITTED_TTL_DAYS = float(os.getenv("LIEPIN_SHARED_DEDUP_DONE_DAYS", "30"))
+
+
+def signature_key(signature: Signature) -> str:
+    return "\x1f".join(signature)
+
+
+class SharedDedup:
+    """基于 SQLite WAL 的共享查重存储"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl: float = RESERVATION_TTL,
+                 owner: Optional[str] = None, committed_ttl: float = COMMITTED_TTL_DAYS * 86400):
+        db_path = db_path or SHARED_DEDUP_PATH or DEFAULT_SHARED_DEDUP_PATH
+        self.db_path = db_path
+        self.ttl = ttl
+        self.committed_ttl = committed_ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stats = {"reserved": 0, "conflicts": 0, "committed": 0, "released": 0}
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # isolation_level=None: 手动控制事务，用 BEGIN IMMEDIATE 获取写锁实现原子的检查并占用
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                signature TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def reserve(self, signature: Signature) -> bool:
+        """占用签名；已被其他实例占用 (未过期) 或已完成时返回 False"""
+        key = signature_key(signature)
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT status, owner, expires_at FROM candidates WHERE signature = ?", (key,)).fetchone()
+            if row:
+                status, owner, expires_at = row
+                if expires_at > now and (status == "committed" or owner != self.owner):
+                    self.conn.execute("COMMIT")
+                    self.stats["conflicts"] += 1
+                    return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO candidates (signature, status, owner, expires_at, updated_at) VALUES (?, 'reserved', ?, ?, ?)",
+                (key, self.owner, now + self.ttl, now))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.stats["reserved"] += 1
+        return True
+
+    def commit(self, signature: Signature):
+        """候选人已成功保存，标记为已处理 (保留 committed_ttl 秒)"""
+        now = time.time()
+        self.conn.execute(
+            "UPDATE candidates SET status = 'committed', expires_at = ?, updated_at = ? WHERE signature = ? AND owner = ?",
+            (now + self.committed_ttl, now, signature_key(signature), self.owner))
+        self.stats["committed"] += 1
+
+    def release(self, signature: Signature):
+        """处理失败 (AI 不匹配、保存失败等)，释放占用以便其他实例可以处理"""
+        self.conn.execute(
+            "DELETE FROM candidates WHERE signature = ? AND owner = ? AND status = 'reserved'",
+            (signature_key(signature), self.owner))
+        self.stats["released"] += 1
+
+    def release_all(self):
+        """退出时释放本实例仍持有的全部占用"""
+        self.conn.execute("DELETE FROM candidates WHERE owner = ? AND status = 'reserved'", (self.owner,))
+
+    def purge_expired(self) -> int:
+        """删除已过期的占用和已完成记录"""
+        return self.conn.execute("DELETE FROM candidates WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def clear_committed(self) -> int:
+        """清空已完成记录 (随本地历史一起清空)；其他实例正在进行的占用保留"""
+        return self.conn.execute("DELETE FROM candidates WHERE status = 'committed'").rowcount
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.stats)
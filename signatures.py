@@ -0,0 +1,80 @@
+"""
+查重签名 (main.py 实时查重、历史索引、dedup.py、history_compact.py 共用)
+签名 = (NFKC 后的姓名首字, 去空白/标点并小写的职位, 统一为 YY/M-YY/M 或 YY/M-Present 的在职时间)；
+只依赖标准库 (读取历史文件时才导入 pandas)，独立工具不需要加载 main.py
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# 签名规则版本，修改归一化逻辑时递增，历史索引会自动重建
+# 3: 修复历史签名在 pyarrow 字符串列上丢掉中文职位 (版本 2)
+SIGNATURE_VERSION = 3
+TITLE_NOISE_RE = re.compile(r"[^\w+#]+")
+WORK_DATE_RE = re.compile(r"(\d{4}|\d{2})\s*[./\-年]\s*(\d{1,2})\s*月?")
+PRESENT_RE = re.compile(r"至今|present|now", re.IGNORECASE)
+HISTORY_COLUMNS = ['姓名', '职位', '在职时间']
+
+
+def extract_name_first_char(name: str) -> str:
+    """提取姓名的第一个字符用于查重匹配"""
+    if not name:
+        return ""
+    # 移除常见后缀后提取第一个字符
+    clean = name.strip().replace("*", "").replace("先生", "").replace("女士", "")
+    return clean[0] if clean else ""
+
+
+def normalize_title(title: str) -> str:
+    """职位归一化: NFKC (全角->半角) + 去掉空白与标点 + 小写"""
+    return TITLE_NOISE_RE.sub("", unicodedata.normalize("NFKC", str(title))).lower()
+
+
+@lru_cache(maxsize=8192)
+def canonical_work_time(time_str: str) -> str:
+    """在职时间归一化为 YY/M-YY/M 或 YY/M-Present，例如 '2023.05-至今' 与 '23/5-Present' 相同"""
+    text = unicodedata.normalize("NFKC", str(time_str)).strip().strip("()")
+    if ',' in text: text = text.split(',')[0]
+    dates = WORK_DATE_RE.findall(text)
+    if not dates: return text
+    parts = []
+    for year, month in dates[:2]:
+        if not 1 <= int(month) <= 12: return text
+        parts.append(f"{year[-2:]}/{int(month)}")
+    if len(parts) == 1 and PRESENT_RE.search(text): parts.append("Present")
+    return "-".join(parts)
+
+
+def build_candidate_signature(name: str, title: str, work_time: str) -> Tuple[str, str, str]:
+    """查重签名: (姓名首字, 归一化职位, 归一化在职时间)"""
+    return (extract_name_first_char(unicodedata.normalize("NFKC", name)), normalize_title(title), canonical_work_time(work_time))
+
+
+def read_history_signatures(file_path: str) -> List[Tuple[str, str, str]]:
+    """读取一个历史 Excel (或压缩后的 history.parquet)，返回其中所有候选人的查重签名 (只读取查重所需的三列)"""
+    import pandas as pd
+    if file_path.endswith(".parquet"):
+        df = pd.read_parquet(file_path, columns=HISTORY_COLUMNS)
+    else:
+        df = pd.read_excel(file_path, usecols=lambda col: col in HISTORY_COLUMNS, dtype=str, engine='openpyxl')
+    return history_signatures_from_frame(df)
+
+
+def history_signatures_from_frame(df: "pd.DataFrame") -> List[Tuple[str, str, str]]:
+    if not all(col in df.columns for col in HISTORY_COLUMNS): return []
+    # 转为 object 列: .str 由 Python re 执行 (\w 匹配中文)；pyarrow 字符串列走 RE2，\w 只匹配 ASCII，会丢掉中文职位
+    df = df[HISTORY_COLUMNS].fillna('nan').astype(str).astype(object)
+    # 与 build_candidate_signature 逐项对应，由 tests/test_signatures.py 保证一致
+    names = df['姓名'].str.normalize("NFKC").str.strip()
+    for noise in ("*", "先生", "女士"):
+        names = names.str.replace(noise, "", regex=False)
+    name_chars = names.str[0].fillna("")
+    titles = df['职位'].str.normalize("NFKC").str.replace(TITLE_NOISE_RE, "", regex=True).str.lower()
+    work_times = df['在职时间'].map(canonical_work_time)
+    return list(zip(name_chars, titles, work_times))
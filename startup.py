@@ -0,0 +1,268 @@
+"""
+启动加速
+- 浏览器环境检查结果缓存在 .browser_check.json，只有 Playwright 版本 (或 Python 环境) 变化时才重新运行 playwright install
+- EventLoopThread: 事件循环在后台线程中常驻，主线程处理输入提示的同时浏览器已在启动
+- BrowserSession: 常驻的 Chrome + 登录上下文 + 搜索页，多轮之间复用，崩溃时自动重启；预热时顺带检查登录状态
+- StartupTimer: 记录启动各阶段的时间点，运行结束时输出首个候选人耗时 (TTFC)
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import contextlib
+import subprocess
+import concurrent.futures
+import importlib.metadata
+from typing import Callable, Coroutine, Dict, Optional
+
+BROWSER_CHECK_PATH = os.getenv("LIEPIN_BROWSER_CHECK", ".browser_check.json")
+# 离线基准测试时指向本地模拟站点 (bench/fake_liepin.py)
+LIEPIN_BASE_URL = os.getenv("LIEPIN_BASE_URL", "https://h.liepin.com").rstrip("/")
+SEARCH_URL = f"{LIEPIN_BASE_URL}/search/getConditionItem"
+# 设为空则使用 Playwright 自带的 Chromium
+BROWSER_CHANNEL = os.getenv("LIEPIN_BROWSER_CHANNEL", "chrome") or None
+SEARCH_INPUT_SELECTOR = 'input#rc_select_1, input.search-input, input.company-position-input, .search-box, .search-input'
+BROWSER_ARGS = ['--disable-blink-features=AutomationControlled']
+LOGIN_CHECK_TIMEOUT_MS = 15000
+HEALTH_CHECK_TIMEOUT = 5
+MAX_RELAUNCHES = 3
+
+
+def browser_check_key() -> Dict[str, str]:
+    try:
+        version = importlib.metadata.version("playwright")
+    except importlib.metadata.PackageNotFoundError:
+        version = ""
+    return {"playwright": version, "python": sys.executable}
+
+
+def browser_check_cached() -> bool:
+    try:
+        with open(BROWSER_CHECK_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f).get("key") == browser_check_key()
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def invalidate_browser_check():
+    """浏览器启动失败时删除缓存，下次启动重新检查安装"""
+    try: os.remove(BROWSER_CHECK_PATH)
+    except OSError: pass
+
+
+def ensure_browsers_installed(log: Callable[[str], None] = print):
+    """检查/安装 Chromium；同一 Playwright 版本检查通过后不再重复运行"""
+    if browser_check_cached():
+        log(f"[dim]浏览器环境已检查 (Playwright {browser_check_key()['playwright']})，跳过安装。[/dim]")
+        return
+    log("[dim]正在验证/安装 Chromium 浏览器... (首次运行可能需要几分钟)[/dim]")
+    try:
+        subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
+    except Exception as e:
+        log(f"[yellow]警告: 浏览器安装检查失败 ({e})。如果程序运行报错，请手动运行 'playwright install'。[/yellow]")
+        return
+    try:
+        with open(BROWSER_CHECK_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"key": browser_check_key(), "checked_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+    except OSError:
+        pass
+    log("[green]浏览器环境检查通过。[/green]")
+
+
+class EventLoopThread:
+    """在后台线程中常驻的事件循环"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="event-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine):
+        """阻塞等待协程完成；Ctrl+C 时取消协程，等它的 finally (保存数据) 执行完后再抛出"""
+        finished = threading.Event()
+
+        async def runner():
+            try:
+                return await coro
+            finally:
+                finished.set()
+
+        future = self.submit(runner())
+        try:
+            return self.result(future)
+        except KeyboardInterrupt:
+            future.cancel()
+            finished.wait()
+            raise
+
+    @staticmethod
+    def result(future: concurrent.futures.Future):
+        """等待 Future 结果；带超时轮询，保证 Windows 下 Ctrl+C 也能及时响应"""
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except concurrent.futures.TimeoutError:
+                continue
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class BrowserSession:
+    """
+    常驻的 Chrome 进程 + 带登录状态的上下文 + 搜索页，多轮搜索之间复用 (保留 HTTP 缓存，省去启动时间)
+    每轮开始前做健康检查，Chrome 崩溃/断开时自动重新启动；state.json 更新后重建上下文
+    """
+
+    def __init__(self, state_path: str = "state.json"):
+        self.state_path = state_path
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.logged_in: Optional[bool] = None
+        # 预热时已打开搜索页，第一次搜索可以省去一次页面跳转
+        self.fresh_search_page = False
+        self.launches = 0
+        self.relaunches = 0
+        self.reused = False
+        self.prepare_ms = 0.0
+        self._state_mtime: Optional[float] = None
+
+    def _current_state_mtime(self) -> Optional[float]:
+        try: return os.path.getmtime(self.state_path)
+        except OSError: return None
+
+    def connected(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    async def launch(self) -> "BrowserSession":
+        from playwright.async_api import async_playwright
+
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        try:
+            self.browser = await self.playwright.chromium.launch(headless=True, channel=BROWSER_CHANNEL, args=BROWSER_ARGS)
+            await self._new_context()
+        except Exception:
+            await self.close()
+            raise
+        self.launches += 1
+        return self
+
+    async def _new_context(self):
+        if self.context:
+            try: await self.context.close()
+            except Exception: pass
+        self._state_mtime = self._current_state_mtime()
+        self.context = await self.browser.new_context(storage_state=self.state_path)
+        self.page = await self.context.new_page()
+        self.fresh_search_page = False
+
+    async def is_healthy(self) -> bool:
+        if not self.connected() or self.page is None or self.page.is_closed(): return False
+        try:
+            await asyncio.wait_for(self.page.evaluate("1"), HEALTH_CHECK_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+    async def ensure_ready(self) -> "BrowserSession":
+        """未启动时启动；健康检查失败时重新启动 (每轮最多 MAX_RELAUNCHES 次)；登录状态文件更新后重建上下文"""
+        if self.browser is None:
+            return await self.launch()
+        if not await self.is_healthy():
+            if self.relaunches >= MAX_RELAUNCHES:
+                raise RuntimeError(f"浏览器已连续重启 {self.relaunches} 次仍不可用")
+            self.relaunches += 1
+            await self.close()
+            return await self.launch()
+        if self._current_state_mtime() != self._state_mtime:
+            await self._new_context()
+        return self
+
+    async def prepare(self) -> "BrowserSession":
+        """预热 (与输入提示并行): 确保浏览器可用，并打开搜索页检查登录状态"""
+        started = time.perf_counter()
+        launches = self.launches
+        await self.ensure_ready()
+        self.reused = self.launches == launches
+        self.logged_in = await self.check_login()
+        self.prepare_ms = (time.perf_counter() - started) * 1000
+        return self
+
+    async def check_login(self) -> bool:
+        """打开搜索页并等待搜索框出现；跳转到登录页或找不到搜索框时返回 False"""
+        try:
+            await self.page.goto(SEARCH_URL, wait_until="domcontentloaded")
+            await self.page.wait_for_selector(SEARCH_INPUT_SELECTOR, timeout=LOGIN_CHECK_TIMEOUT_MS)
+        except Exception:
+            return False
+        self.fresh_search_page = True
+        return True
+
+    @contextlib.asynccontextmanager
+    async def round(self):
+        """一轮搜索: 开始时确保浏览器可用；结束时只关闭多余的标签页，浏览器与搜索页留给下一轮"""
+        self.relaunches = 0
+        await self.ensure_ready()
+        try:
+            yield self
+        finally:
+            await self.close_extra_pages()
+
+    async def close_extra_pages(self):
+        if not self.connected() or self.context is None: return
+        for page in list(self.context.pages):
+            if page is not self.page:
+                try: await page.close()
+                except Exception: pass
+
+    async def close(self):
+        """关闭浏览器 (Chrome 已崩溃时忽略错误)；playwright 驱动保留给下次启动"""
+        if self.browser:
+            try: await self.browser.close()
+            except Exception: pass
+        self.browser = self.context = self.page = None
+        self.fresh_search_page = False
+
+    async def shutdown(self):
+        await self.close()
+        if self.playwright:
+            try: await self.playwright.stop()
+            except Exception: pass
+            self.playwright = None
+
+
+class StartupTimer:
+    """一轮运行的启动时间点 (perf_counter 秒)，同名只记录第一次"""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, time.perf_counter())
+
+    def record(self, name: str, ms: float):
+        """后台完成的阶段 (与输入提示并行) 的耗时"""
+        self.durations[name] = ms
+
+    def since(self, name: str, start: Optional[str] = None) -> Optional[float]:
+        """从 start (默认本轮起点) 到 name 的秒数；未记录时返回 None"""
+        if name not in self.marks: return None
+        begin = self.marks.get(start) if start else self.origin
+        return None if begin is None else self.marks[name] - begin
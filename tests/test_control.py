@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from control import ControlServer
+
+
+async def _request(port, method, path, token=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = f"X-Control-Token: {token}\r\n" if token else ""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_token_and_post_required():
+    calls = []
+
+    async def scenario():
+        server = await ControlServer({"pause": lambda: calls.append("pause"),
+                                      "metrics": lambda: {"processed": 1}}).start()
+        try:
+            results = [
+                await _request(server.port, "POST", "/pause"),
+                await _request(server.port, "POST", "/pause", "wrong"),
+                await _request(server.port, "GET", "/pause", server.token),
+                await _request(server.port, "POST", "/pause", server.token),
+                await _request(server.port, "GET", "/metrics", server.token),
+                await _request(server.port, "GET", "/metrics"),
+            ]
+        finally:
+            await server.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert [status for status, _ in results] == [401, 401, 405, 200, 200, 401]
+    assert results[4][1] == {"processed": 1}
+    assert calls == ["pause"]
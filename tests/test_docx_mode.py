@@ -0,0 +1,12 @@
+from main import resolve_docx_mode
+
+
+def test_template_falls_back_to_html_without_sections():
+    fields = {"姓名": "张三", "工作经历": [], "教育经历": []}
+    assert resolve_docx_mode("template", fields, "张三") == "html"
+    assert resolve_docx_mode("template", None) == "html"
+
+
+def test_template_kept_when_sections_extracted():
+    assert resolve_docx_mode("template", {"工作经历": ["2020-至今 某公司"], "教育经历": []}) == "template"
+    assert resolve_docx_mode("html", {}) == "html"
@@ -0,0 +1,57 @@
+"""history_compact: 压缩去重不丢失不同的候选人；归档中途失败时恢复原目录"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import history_compact
+from history_compact import archive_by_rename, compact_history, HISTORY_STORE_NAME
+
+
+def write_archive(data_dir, name, rows):
+    archive = data_dir / name
+    archive.mkdir(parents=True)
+    pd.DataFrame(rows, columns=["姓名", "职位", "在职时间", "公司"]).to_excel(archive / "a.xlsx", index=False)
+
+
+def test_compact_keeps_candidates_with_different_cjk_titles(tmp_path):
+    write_archive(tmp_path, "archive_20260101_000000", [
+        ("张先生", "产品经理", "2023.05-至今", "甲"),
+        ("张女士", "算法工程师", "2023.05-至今", "乙"),
+        ("张**", "产品 经理", "23/5-Present", "丙"),  # 与第一行是同一个人
+    ])
+    stats = compact_history(str(tmp_path), cold_mode="move")
+    history = pd.read_parquet(tmp_path / HISTORY_STORE_NAME)
+    assert stats["rows_total"] == 2
+    assert sorted(history["职位"]) == ["产品经理", "算法工程师"]
+
+
+def test_archive_by_rename_moves_content_and_keeps_reserved(tmp_path):
+    data = tmp_path / "data"
+    (data / "archive_old").mkdir(parents=True)
+    (data / "a.xlsx").write_text("x")
+    assert archive_by_rename(str(data), "archive_new")
+    assert sorted(os.listdir(data)) == ["archive_new", "archive_old"]
+    assert os.listdir(data / "archive_new") == ["a.xlsx"]
+
+
+@pytest.mark.parametrize("fail_at", [2, 3])
+def test_archive_by_rename_rolls_back_on_failure(tmp_path, monkeypatch, fail_at):
+    data = tmp_path / "data"
+    (data / "archive_old").mkdir(parents=True)
+    (data / "a.xlsx").write_text("x")
+    real_rename = os.rename
+    calls = []
+
+    def flaky_rename(src, dst):
+        calls.append((src, dst))
+        if len(calls) == fail_at:  # 2: 移回保留条目时失败; 3: 最后一步改名时失败
+            raise PermissionError("locked")
+        real_rename(src, dst)
+
+    monkeypatch.setattr(history_compact.os, "rename", flaky_rename)
+    with pytest.raises(PermissionError):
+        archive_by_rename(str(data), "archive_new")
+    assert sorted(os.listdir(data)) == ["a.xlsx", "archive_old"]
+    assert sorted(os.listdir(tmp_path)) == ["data"]
@@ -0,0 +1,37 @@
+"""history_index: 并行读取在有其他线程运行时 (main.py 预热浏览器) 也能正常完成"""
+
+import threading
+
+import pandas as pd
+
+from history_index import HistoryIndex, PARALLEL_MIN_FILES
+from signatures import SIGNATURE_VERSION, build_candidate_signature, read_history_signatures
+
+
+def test_parallel_sync_with_live_threads(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    expected = set()
+    for i in range(PARALLEL_MIN_FILES + 1):
+        row = (f"张{i}", f"产品经理{i}", "2023.05-至今")
+        expected.add(build_candidate_signature(*row))
+        pd.DataFrame([row], columns=["姓名", "职位", "在职时间"]).to_excel(data_dir / f"{i}.xlsx", index=False)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def busy():
+        while not stop.is_set():
+            with lock:
+                pass
+
+    worker = threading.Thread(target=busy, daemon=True)
+    worker.start()
+    try:
+        with HistoryIndex(str(tmp_path / "index.sqlite3"), signature_version=SIGNATURE_VERSION) as index:
+            stats = index.sync(str(data_dir), read_history_signatures, workers=2)
+            assert stats["ingested"] == PARALLEL_MIN_FILES + 1 and stats["failed"] == 0
+            assert index.signatures() == expected
+    finally:
+        stop.set()
+        worker.join()
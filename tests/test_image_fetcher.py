@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from resume_docx import ImageFetcher
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    # /img/<n>: 1000 字节的不同内容；/big: 超出大小上限；/slow: 超过超时
+    requests = []
+
+    def do_GET(self):
+        ImageHandler.requests.append(self.path)
+        if self.path == "/slow":
+            time.sleep(1)
+        body = b"B" * 5000 if self.path == "/big" else self.path.encode().ljust(1000, b"x")
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ImageHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def blob_count(cache_dir):
+    return sum(len(files) for root, _, files in os.walk(cache_dir) if root != str(cache_dir))
+
+
+def test_prefetch_and_cache_hits(server, tmp_path):
+    urls = [f"{server}/img/{i}" for i in range(5)]
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), policy="fetch", timeout=2)
+    fetcher.prefetch(urls + urls)
+    assert fetcher.stats["downloads"] == 5
+    assert all(fetcher.get(url) for url in urls)
+    assert fetcher.stats["memory_hits"] >= 5
+    assert not os.path.exists(tmp_path / "index.json")  # 索引按批写出
+    fetcher.close()
+    with open(tmp_path / "index.json", encoding="utf-8") as f:
+        assert set(json.load(f)) == set(urls)
+
+    reopened = ImageFetcher(cache_dir=str(tmp_path), policy="cache", timeout=2)
+    assert reopened.get(urls[0]) == fetcher.get(urls[0])
+    assert reopened.stats["disk_hits"] == 1
+    assert len(ImageHandler.requests) == 5
+
+
+def test_size_cap_and_timeout(server, tmp_path):
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), policy="fetch", timeout=0.2, max_bytes=2000)
+    assert fetcher.get(f"{server}/big") is None
+    assert fetcher.get(f"{server}/slow") is None
+    assert fetcher.get(f"{server}/big") is None  # 进程内负缓存，不再请求
+    assert ImageHandler.requests.count("/big") == 1
+    assert fetcher.stats["failures"] == 2
+    fetcher.close()
+
+
+def test_evicts_only_over_limit(server, tmp_path):
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), policy="fetch", timeout=2, disk_max_bytes=3500)
+    urls = [f"{server}/img/{i}" for i in range(5)]
+    for url in urls[:3]:
+        fetcher.get(url)
+    assert fetcher.stats["evictions"] == 0 and blob_count(tmp_path) == 3
+    for url in urls[3:]:
+        fetcher.get(url)
+    assert fetcher.stats["evictions"] == 2 and blob_count(tmp_path) == 3
+    assert fetcher._disk_bytes == 3000
+    fetcher.close()
+    with open(tmp_path / "index.json", encoding="utf-8") as f:
+        assert set(json.load(f)) == set(urls[2:])
+
+
+def test_inflight_cleared_on_early_returns(server, tmp_path):
+    from concurrent.futures import Future
+
+    fetcher = ImageFetcher(cache_dir=str(tmp_path), policy="fetch", timeout=0.2, max_bytes=2000)
+    cached, failed = f"{server}/img/1", f"{server}/big"
+    fetcher.get(cached)
+    fetcher.get(failed)
+    for url in (cached, failed):
+        fetcher._inflight[url] = Future()  # 预取登记后，执行前已缓存 / 已知失败
+        fetcher._fetch(url)
+    assert fetcher._inflight == {}
+    fetcher.prefetch([cached, failed, f"{server}/img/2"])
+    assert fetcher._inflight == {}
+    fetcher.close()
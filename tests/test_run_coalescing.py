@@ -0,0 +1,20 @@
+"""ResumeHtmlToDocx: 相邻且格式相同的文本合并为同一个 run，格式变化处仍拆分"""
+
+import docx
+
+from resume_docx import ImageFetcher, ResumeHtmlToDocx
+
+
+def render_runs(html):
+    doc = docx.Document()
+    ResumeHtmlToDocx(ImageFetcher(cache_dir=None, policy="skip")).add_html_to_document(html, doc)
+    return [[(run.text, bool(run.bold), bool(run.italic)) for run in p.runs] for p in doc.paragraphs if p.runs]
+
+
+def test_same_format_text_is_one_run():
+    assert render_runs("<p>a<span>b</span>c</p>") == [[("abc", False, False)]]
+
+
+def test_bold_and_italic_boundaries_start_new_runs():
+    assert render_runs("<p>a<b>b</b>c</p>") == [[("a", False, False), ("b", True, False), ("c", False, False)]]
+    assert render_runs("<p>a<i>b</i><i>c</i>d</p>") == [[("a", False, False), ("bc", False, True), ("d", False, False)]]
@@ -0,0 +1,44 @@
+import time
+
+from shared_dedup import SharedDedup
+
+SIG = ("张", "产品经理", "2020.01-至今")
+
+
+def test_commit_blocks_other_instances_until_cleared(tmp_path):
+    db = str(tmp_path / "shared.sqlite3")
+    a = SharedDedup(db, owner="a")
+    b = SharedDedup(db, owner="b")
+    assert a.reserve(SIG)
+    assert not b.reserve(SIG)
+    a.commit(SIG)
+    assert not b.reserve(SIG)
+    assert a.clear_committed() == 1
+    assert b.reserve(SIG)
+    a.close()
+    b.close()
+
+
+def test_committed_rows_expire(tmp_path):
+    db = str(tmp_path / "shared.sqlite3")
+    a = SharedDedup(db, owner="a", committed_ttl=0.05)
+    b = SharedDedup(db, owner="b")
+    assert a.reserve(SIG)
+    a.commit(SIG)
+    assert not b.reserve(SIG)
+    time.sleep(0.1)
+    assert a.purge_expired() == 1
+    assert b.reserve(SIG)
+    a.close()
+    b.close()
+
+
+def test_release_lets_other_instance_reserve(tmp_path):
+    db = str(tmp_path / "shared.sqlite3")
+    a = SharedDedup(db, owner="a")
+    b = SharedDedup(db, owner="b")
+    assert a.reserve(SIG)
+    a.release(SIG)
+    assert b.reserve(SIG)
+    a.close()
+    b.close()
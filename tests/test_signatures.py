@@ -0,0 +1,31 @@
+"""历史签名 (按 DataFrame 计算) 必须与实时查重的 build_candidate_signature 完全一致"""
+
+import pandas as pd
+import pytest
+
+from signatures import build_candidate_signature, history_signatures_from_frame
+
+ROWS = [
+    ("张先生", "产品 经理", "2023.05 - 至今"),
+    ("李**", "C++开发", "2019.3-2021.12"),
+    ("王女士", "ＰＭ（高级）", "（２０２０．０１ － ２０２２．０６）"),
+    ("*赵*", "Senior 算法工程师 / NLP", "23/5-Present"),
+    ("Tom Li", "C#/.NET 工程师", "2018年7月 - 至今"),
+    ("", "", ""),
+]
+
+
+@pytest.mark.parametrize("dtype", [object, "str", "string"])
+def test_frame_signatures_match_live_signatures(dtype):
+    df = pd.DataFrame(ROWS, columns=["姓名", "职位", "在职时间"]).astype(dtype)
+    expected = [build_candidate_signature(*row) for row in ROWS]
+    assert history_signatures_from_frame(df) == expected
+
+
+def test_cjk_titles_survive_normalisation():
+    df = pd.DataFrame(ROWS[:2], columns=["姓名", "职位", "在职时间"])
+    assert [sig[1] for sig in history_signatures_from_frame(df)] == ["产品经理", "c++开发"]
+
+
+def test_missing_columns():
+    assert history_signatures_from_frame(pd.DataFrame({"姓名": ["张先生"]})) == []
@@ -0,0 +1,146 @@
+"""
+阶段耗时追踪
+设置 LIEPIN_TRACE=1 (或直接设为输出路径 xxx.json) 后，记录每个候选人各处理阶段的耗时，
+运行结束时导出 Chrome trace-event JSON (可在 chrome://tracing 或 https://ui.perfetto.dev 打开)，
+并输出各阶段 p50/p95/p99 统计；未开启时 span() 直接返回共享的空上下文，几乎没有开销
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from datetime import datetime
+from typing import Dict, List, Optional
+
+_TRACE_SETTING = os.getenv("LIEPIN_TRACE", "").strip()
+TRACE_ENABLED = _TRACE_SETTING.lower() not in ("", "0", "false", "no", "n")
+TRACE_DIR = "traces"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def end(self):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns() - self.start, self.args, exc_type)
+        return False
+
+    def end(self):
+        self.__exit__(None, None, None)
+
+
+class Tracer:
+    """收集 Chrome trace-event 'X' (完整事件)，时间单位为微秒"""
+
+    def __init__(self, enabled: bool = TRACE_ENABLED):
+        self.enabled = enabled
+        self.events: List[Dict] = []
+        self.durations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._tids: Dict[int, int] = {}
+
+    def span(self, name: str, **args):
+        """with tracer.span("阶段名", 可选参数): ...；未开启时返回空上下文"""
+        if not self.enabled: return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def begin(self, name: str, **args):
+        """不方便用 with 包住的阶段: s = tracer.begin(...); ...; s.end()"""
+        return self.span(name, **args).__enter__()
+
+    def _record(self, name: str, start_ns: int, dur_ns: int, args: Optional[Dict], exc_type):
+        event = {"name": name, "ph": "X", "ts": (start_ns - self._origin) / 1000, "dur": dur_ns / 1000, "pid": self._pid}
+        if args or exc_type:
+            event["args"] = dict(args or {}, **({"error": exc_type.__name__} if exc_type else {}))
+        with self._lock:
+            event["tid"] = self._tids.setdefault(threading.get_ident(), len(self._tids) + 1)
+            self.events.append(event)
+            self.durations.setdefault(name, []).append(dur_ns / 1e6)
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.durations.clear()
+            self._origin = time.perf_counter_ns()
+
+    def export_chrome(self, path: Optional[str] = None) -> str:
+        """导出 Chrome trace-event JSON，返回文件路径"""
+        if not path:
+            path = _TRACE_SETTING if _TRACE_SETTING.endswith(".json") else \
+                os.path.join(TRACE_DIR, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+    def summary(self) -> List[Dict]:
+        """各阶段统计 (毫秒)，按总耗时降序"""
+        rows = []
+        with self._lock:
+            items = [(name, sorted(values)) for name, values in self.durations.items()]
+        for name, values in items:
+            rows.append({
+                "stage": name, "count": len(values), "total": sum(values),
+                "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99),
+            })
+        return sorted(rows, key=lambda r: r["total"], reverse=True)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """线性插值百分位 (输入需已排序)"""
+    if not sorted_values: return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+tracer = Tracer()
+
+
+def span(name: str, **args):
+    return tracer.span(name, **args)
+
+
+def traced(name: Optional[str] = None):
+    """函数装饰器: 开启追踪时记录每次调用耗时；未开启时原样返回函数，没有任何额外开销"""
+    def decorator(func):
+        if not tracer.enabled: return func
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator